@@ -1,4 +0,0 @@
-import { NormalizedOptions } from '../types.js';
-export declare function iframeDirectoryHtml(url: string, opts: NormalizedOptions, stats: {
-    iframes: number;
-}): Promise<string>;
@@ -1,2 +0,0 @@
-import { InternalDirectoryParse, NormalizedOptions } from '../types.js';
-export declare function parseDirectoryHtml(baseUrl: string, html: string, opts: NormalizedOptions): InternalDirectoryParse;
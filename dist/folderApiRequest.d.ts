@@ -1,2 +0,0 @@
-import { FolderApiOptions, FolderApiResult } from './types.js';
-export declare function folderApiRequest(url: string, options?: FolderApiOptions): Promise<FolderApiResult>;
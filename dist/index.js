@@ -1,2 +0,0 @@
-export * from './types.js';
-export { folderApiRequest } from './folderApiRequest.js';
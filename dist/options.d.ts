@@ -1,2 +0,0 @@
-import { FolderApiOptions, NormalizedOptions } from './types.js';
-export declare function normalizeOptions(opts: FolderApiOptions | undefined): NormalizedOptions;
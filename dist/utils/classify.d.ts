@@ -1,2 +0,0 @@
-export declare function classifyEntry(href: string, metadataText: string): 'file' | 'folder' | 'unknown';
-export declare function detectHidden(decodedName: string): boolean;
@@ -1 +0,0 @@
-export declare function parseDateMeta(text: string, errors: string[]): string | null;
@@ -1 +0,0 @@
-export declare function safeDecodeURIComponent(segment: string, errors: string[]): string;
@@ -1 +0,0 @@
-export declare function pushError(errors: string[], prefix: string, message: string): void;
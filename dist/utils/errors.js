@@ -1,3 +0,0 @@
-export function pushError(errors, prefix, message) {
-    errors.push(`${prefix}: ${message}`);
-}
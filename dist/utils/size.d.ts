@@ -1 +0,0 @@
-export declare function parseSizeMeta(text: string): number | null;
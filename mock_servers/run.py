@@ -1,18 +1,44 @@
-"""Run multiple FastAPI apps (ports 8101-8104) serving directory listings.
+"""Run FastAPI apps (ports 8101-8104) serving directory listings from one asyncio process.
 
-Layouts + Server headers emulate Apache, Nginx, IIS, and Caddy.
+Layouts + Server headers emulate Apache, Nginx, IIS, and Caddy. Every layout renders the same
+virtual filesystem: by default the small fixed tree under /root/, or with --synthetic a seeded tree
+(fan-out / depth / files per directory, capped at --max-entries) for benchmarks. Latency, jitter,
+429 / 503 / hanging responses, ETag / Last-Modified validators and HEAD can be injected per run. With --json
+the nginx and Caddy ports answer `Accept: application/json` with their JSON listing formats.
 
 Usage (with Astral uv):
     uv run mock_servers/run.py
+    uv run mock_servers/run.py --synthetic --seed 7 --fanout 10 --depth 3 --files 50
+    uv run mock_servers/run.py --synthetic --latency 20 --jitter 10 --rate-429 0.05 --validators
+    uv run mock_servers/run.py --route-latency "/root/dir-001/*=250:50" --layouts nginx,caddy
+    uv run mock_servers/run.py --json
+
+GET /__tree on any port returns the tree's counts (directories, files, entries, seed) as JSON.
 
 The embedded PEP 723 metadata below lets uv resolve dependencies automatically.
 """
 # /// script
 # dependencies = ["fastapi>=0.110.0", "uvicorn>=0.29.0"]
 # ///
-from datetime import datetime
-from fastapi import FastAPI, Response
-from fastapi.responses import HTMLResponse
+import argparse
+import asyncio
+import contextlib
+import fnmatch
+import html
+import json
+import math
+import mimetypes
+import random
+import signal
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from functools import lru_cache
+from urllib.parse import quote
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 import uvicorn
 
 COMMON_FILES = [
@@ -28,6 +54,109 @@ SUB_FILES = [
 
 SUBDIRS = ["sub"]
 
+ROOT = "/root/"
+
+
+# ---------------------------------------------------------------------------
+# Virtual filesystem
+# ---------------------------------------------------------------------------
+
+@dataclass
+class DirInfo:
+    mtime: datetime
+    files: list = field(default_factory=list)  # (name, size, mtime)
+    subdirs: list = field(default_factory=list)  # (name, mtime)
+
+
+class VirtualFS:
+    """Directory path ('/root/a/') -> DirInfo. Immutable once built, so rendered listings can be cached."""
+
+    def __init__(self, dirs: dict, seed=None):
+        self.dirs = dirs
+        self.seed = seed
+        self.files = {}
+        for path, d in dirs.items():
+            for name, size, mtime in d.files:
+                self.files[path + name] = (size, mtime)
+
+    @classmethod
+    def static(cls):
+        sub_mtime = COMMON_FILES[0][2]
+        return cls({
+            ROOT: DirInfo(COMMON_FILES[0][2], list(COMMON_FILES), [(d, sub_mtime) for d in SUBDIRS]),
+            ROOT + "sub/": DirInfo(sub_mtime, list(SUB_FILES), []),
+        })
+
+    @classmethod
+    def synthetic(cls, seed: int, fanout: int, depth: int, files_per_dir: int, max_entries: int):
+        """Breadth-first so the entry cap trims the deepest level first. Each directory draws from its own
+        RNG (seed + path), so a directory's contents do not depend on the cap or on generation order."""
+        dirs = {}
+        entries = 0
+        queue = [(ROOT, 0, _random_mtime(random.Random(f"{seed}:{ROOT}")))]
+        head = 0
+        while head < len(queue):
+            path, level, mtime = queue[head]
+            head += 1
+            rng = random.Random(f"{seed}:{path}")
+            d = DirInfo(mtime)
+            dirs[path] = d
+            if level < depth:
+                for i in range(fanout):
+                    if entries >= max_entries:
+                        break
+                    name = _dir_name(rng, i)
+                    child_mtime = _random_mtime(rng)
+                    d.subdirs.append((name, child_mtime))
+                    queue.append((f"{path}{name}/", level + 1, child_mtime))
+                    entries += 1
+            for i in range(files_per_dir):
+                if entries >= max_entries:
+                    break
+                d.files.append((_file_name(rng, i), _random_size(rng), _random_mtime(rng)))
+                entries += 1
+        return cls(dirs, seed)
+
+    def counts(self):
+        files = len(self.files)
+        directories = len(self.dirs)
+        return {"seed": self.seed, "directories": directories, "files": files, "entries": files + directories - 1}
+
+
+WORDS = ["alpha", "report", "photo", "backup", "data", "release", "notes", "draft", "café", "build",
+         "archive", "log", "music", "video", "scan", "export", "final", "sample", "test", "image"]
+EXTENSIONS = [".txt", ".jpg", ".png", ".pdf", ".zip", ".tar.gz", ".mp3", ".mp4", ".csv", ".json",
+              ".iso", ".md", ".bin", ".html", ".7z", ""]
+DATE_BASE = datetime(2020, 1, 1)
+
+
+def _dir_name(rng: random.Random, i: int) -> str:
+    return f"{rng.choice(WORDS)}-{i:03d}"
+
+
+def _file_name(rng: random.Random, i: int) -> str:
+    word = rng.choice(WORDS)
+    roll = rng.random()
+    if roll < 0.03:
+        return f".{word}-{i}"  # hidden
+    if roll < 0.10:
+        word = f"{word} {rng.choice(WORDS)}"  # space (percent-encoded in href)
+    return f"{word}-{i:04d}{rng.choice(EXTENSIONS)}"
+
+
+def _random_size(rng: random.Random) -> int:
+    if rng.random() < 0.02:
+        return 0
+    return int(math.exp(rng.uniform(0, math.log(8 * 1024 ** 3))))  # log-uniform up to 8 GiB
+
+
+def _random_mtime(rng: random.Random) -> datetime:
+    return DATE_BASE + timedelta(minutes=rng.randrange(5 * 365 * 24 * 60))
+
+
+# ---------------------------------------------------------------------------
+# Layouts
+# ---------------------------------------------------------------------------
 
 def fmt_apache(dt: datetime) -> str:
     return dt.strftime("%d-%b-%Y %H:%M")
@@ -60,21 +189,29 @@ def size_compact(size: int) -> str:
     return f"{value:.1f}{unit}"
 
 
+def _href(name: str) -> str:
+    return html.escape(quote(name), quote=True)
+
+
+def _text(name: str) -> str:
+    return html.escape(name, quote=False)
+
+
 def apache_style_listing(files, subdirs):
     rows = ["<tr><th>Name</th><th>Last modified</th><th>Size</th></tr>"]
     for name, size, dt in files:
         rows.append(
             "<tr>"
-            f"<td><a href='{name}'>{name}</a></td>"
+            f"<td><a href='{_href(name)}'>{_text(name)}</a></td>"
             f"<td>{fmt_apache(dt)}</td>"
             f"<td>{size}</td>"
             "</tr>"
         )
-    for d in subdirs:
+    for d, dt in subdirs:
         rows.append(
             "<tr>"
-            f"<td><a href='{d}/'>{d}/</a></td>"
-            f"<td>{fmt_apache(files[0][2])}</td>"
+            f"<td><a href='{_href(d)}/'>{_text(d)}/</a></td>"
+            f"<td>{fmt_apache(dt)}</td>"
             "<td>-</td>"
             "</tr>"
         )
@@ -84,21 +221,21 @@ def apache_style_listing(files, subdirs):
 def nginx_style_listing(files, subdirs):
     lines = []
     for name, size, dt in files:
-        lines.append(f"<a href='{name}'>{name}</a> {fmt_nginx(dt)} {size_compact(size)}")
-    for d in subdirs:
-        lines.append(f"<a href='{d}/'>{d}/</a> {fmt_nginx(files[0][2])} -")
+        lines.append(f"<a href='{_href(name)}'>{_text(name)}</a> {fmt_nginx(dt)} {size_compact(size)}")
+    for d, dt in subdirs:
+        lines.append(f"<a href='{_href(d)}/'>{_text(d)}/</a> {fmt_nginx(dt)} -")
     return "<pre>" + "\n".join(lines) + "</pre>"
 
 
 def iis_style_listing(files, subdirs):
     lines = ["<A HREF=\"../\">[To Parent Directory]</A><br><br>"]
-    for d in subdirs:
+    for d, dt in subdirs:
         lines.append(
-            f"{fmt_iis(files[0][2])}        &lt;dir&gt; <A HREF=\"{d}/\">{d}</A><br>"
+            f"{fmt_iis(dt)}        &lt;dir&gt; <A HREF=\"{_href(d)}/\">{_text(d)}</A><br>"
         )
     for name, size, dt in files:
         lines.append(
-            f"{fmt_iis(dt)}          {size} <A HREF=\"{name}\">{name}</A><br>"
+            f"{fmt_iis(dt)}          {size} <A HREF=\"{_href(name)}\">{_text(name)}</A><br>"
         )
     return "<pre>" + "".join(lines) + "</pre>"
 
@@ -108,60 +245,54 @@ def caddy_style_listing(files, subdirs):
     for name, size, dt in files:
         rows.append(
             "<tr>"
-            f"<td><a href='{name}'>{name}</a></td>"
+            f"<td><a href='{_href(name)}'>{_text(name)}</a></td>"
             f"<td>{size_compact(size)}</td>"
             f"<td>{fmt_caddy(dt)}</td>"
             "</tr>"
         )
-    for d in subdirs:
+    for d, dt in subdirs:
         rows.append(
             "<tr>"
-            f"<td><a href='{d}/'>{d}/</a></td>"
+            f"<td><a href='{_href(d)}/'>{_text(d)}/</a></td>"
             "<td>-</td>"
-            f"<td>{fmt_caddy(files[0][2])}</td>"
+            f"<td>{fmt_caddy(dt)}</td>"
             "</tr>"
         )
     return "<table>" + "".join(rows) + "</table>"
 
 
-def html_page(title: str, body: str) -> str:
-    return f"<!doctype html><html><head><title>{title}</title></head><body>{body}</body></html>"
+def nginx_json_listing(files, subdirs):
+    """`autoindex_format json`: directories first, RFC 1123 mtimes, exact sizes for files only."""
+    items = [{"name": d, "type": "directory", "mtime": http_date(dt)} for d, dt in subdirs]
+    items += [{"name": name, "type": "file", "mtime": http_date(dt), "size": size} for name, size, dt in files]
+    return items
 
 
-def build_app(layout_func, server_header: str):
-    app = FastAPI()
+def caddy_json_listing(files, subdirs):
+    """`file_server browse` JSON: folder names end in '/', relative escaped urls, RFC 3339 mod_time."""
+    def item(name, size, dt, is_dir):
+        return {
+            "name": name + "/" if is_dir else name,
+            "size": size,
+            "url": "./" + quote(name) + ("/" if is_dir else ""),
+            "mod_time": dt.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "mode": 2147484141 if is_dir else 420,
+            "is_dir": is_dir,
+            "is_symlink": False,
+        }
+    return [item(d, 4096, dt, True) for d, dt in subdirs] + [item(name, size, dt, False) for name, size, dt in files]
 
-    @app.get("/root/")
-    def root():
-        body = layout_func(COMMON_FILES, SUBDIRS)
-        html = html_page("Index of /root/", body)
-        return HTMLResponse(html, headers={"Server": server_header})
-
-    @app.get("/root/sub/")
-    def sub():
-        body = layout_func(SUB_FILES, [])
-        html = html_page("Index of /root/sub/", body)
-        return HTMLResponse(html, headers={"Server": server_header})
-
-    @app.head("/root/{path:path}")
-    def head_root(path: str):
-        return Response(
-            status_code=200,
-            headers={
-                "Server": server_header,
-                "Content-Type": "text/plain",
-                "Content-Length": "12",
-            },
-        )
 
-    return app
+def html_page(title: str, body: str) -> str:
+    return f"<!doctype html><html><head><title>{_text(title)}</title></head><body>{body}</body></html>"
 
 
+# label -> (HTML layout, Server header, JSON listing or None)
 LAYOUTS = {
-    "apache": (apache_style_listing, "Apache/2.4.57"),
-    "nginx": (nginx_style_listing, "nginx/1.25.3"),
-    "iis": (iis_style_listing, "Microsoft-IIS/10.0"),
-    "caddy": (caddy_style_listing, "Caddy"),
+    "apache": (apache_style_listing, "Apache/2.4.57", None),
+    "nginx": (nginx_style_listing, "nginx/1.25.3", nginx_json_listing),
+    "iis": (iis_style_listing, "Microsoft-IIS/10.0", None),
+    "caddy": (caddy_style_listing, "Caddy", caddy_json_listing),
 }
 
 APPS = [
@@ -172,24 +303,242 @@ APPS = [
 ]
 
 
-def _run(port: int, label: str):
-    layout_func, server_header = LAYOUTS[label]
-    app = build_app(layout_func, server_header)
-    print(f"[mock_servers] starting {label} on http://127.0.0.1:{port}/root/")
-    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+# ---------------------------------------------------------------------------
+# Fault injection
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Faults:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    routes: list = field(default_factory=list)  # (glob, latency_ms, jitter_ms); first match wins
+    rate_429: float = 0.0
+    rate_503: float = 0.0
+    rate_timeout: float = 0.0
+    retry_after: str = ""  # Retry-After value sent with 429 / 503 ('' = none)
+    hang_ms: float = 60000.0  # how long an injected timeout holds the response
+    rng: random.Random = field(default_factory=random.Random)
+
+    def delay(self, path: str) -> float:
+        latency, jitter = self.latency_ms, self.jitter_ms
+        for pattern, route_latency, route_jitter in self.routes:
+            if fnmatch.fnmatchcase(path, pattern):
+                latency, jitter = route_latency, route_jitter
+                break
+        return max(0.0, latency + self.rng.uniform(-jitter, jitter)) / 1000.0
+
+    def outcome(self):
+        """None, 429, 503 or 'timeout' for one request."""
+        roll = self.rng.random()
+        if roll < self.rate_429:
+            return 429
+        roll -= self.rate_429
+        if roll < self.rate_503:
+            return 503
+        roll -= self.rate_503
+        if roll < self.rate_timeout:
+            return "timeout"
+        return None
+
+
+def parse_route_latency(spec: str):
+    """'GLOB=MS' or 'GLOB=MS:JITTER'."""
+    pattern, _, value = spec.rpartition("=")
+    if not pattern:
+        raise argparse.ArgumentTypeError(f"expected GLOB=MS[:JITTER], got {spec!r}")
+    latency, _, jitter = value.partition(":")
+    return pattern, float(latency), float(jitter or 0)
+
+
+# ---------------------------------------------------------------------------
+# App
+# ---------------------------------------------------------------------------
+
+def http_date(dt: datetime) -> str:
+    return format_datetime(dt.replace(tzinfo=timezone.utc), usegmt=True)
+
+
+def not_modified(request: Request, etag: str, mtime: datetime) -> bool:
+    inm = request.headers.get("if-none-match")
+    if inm is not None:
+        return etag in [t.strip() for t in inm.split(",")] or inm.strip() == "*"
+    ims = request.headers.get("if-modified-since")
+    if ims:
+        try:
+            return mtime.replace(tzinfo=timezone.utc) <= parsedate_to_datetime(ims)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def wants_json(request: Request) -> bool:
+    """Caddy's test: the Accept header mentions application/json."""
+    return "application/json" in request.headers.get("accept", "")
+
+
+def build_app(layout_func, server_header: str, vfs: VirtualFS, faults: Faults, validators: bool, json_func=None):
+    """json_func: JSON listing served to JSON-preferring requests (None = HTML only)."""
+    app = FastAPI()
 
+    @lru_cache(maxsize=4096)
+    def render(path: str) -> str:
+        d = vfs.dirs[path]
+        return html_page(f"Index of {path}", layout_func(d.files, d.subdirs))
+
+    @lru_cache(maxsize=4096)
+    def render_json(path: str) -> str:
+        d = vfs.dirs[path]
+        return json.dumps(json_func(d.files, d.subdirs), ensure_ascii=False)
+
+    @app.get("/__tree")
+    def tree():
+        return JSONResponse(vfs.counts())
+
+    @app.api_route("/{path:path}", methods=["GET", "HEAD"])
+    async def serve(path: str, request: Request):
+        path = "/" + path
+        await asyncio.sleep(faults.delay(path))
+        outcome = faults.outcome()
+        if outcome == "timeout":
+            await asyncio.sleep(faults.hang_ms / 1000.0)
+            return Response(status_code=504, headers={"Server": server_header})
+        if outcome is not None:
+            headers = {"Server": server_header}
+            if faults.retry_after:
+                headers["Retry-After"] = faults.retry_after
+            return Response(status_code=outcome, headers=headers)
+
+        # the path parameter arrives percent-decoded
+        if path in vfs.dirs:
+            d = vfs.dirs[path]
+            headers = {"Server": server_header}
+            as_json = json_func is not None and wants_json(request)
+            body = render_json(path) if as_json else render(path)
+            ctype = "application/json" if as_json else "text/html; charset=utf-8"
+            if json_func is not None:
+                headers["Vary"] = "Accept"
+            if validators:
+                etag = f'"{zlib.crc32(body.encode()):08x}"'  # per representation
+                headers["ETag"] = etag
+                headers["Last-Modified"] = http_date(d.mtime)
+                if not_modified(request, etag, d.mtime):
+                    return Response(status_code=304, headers=headers)
+            if request.method == "HEAD":
+                length = str(len(body.encode()))
+                return Response(status_code=200, headers={**headers, "Content-Type": ctype, "Content-Length": length})
+            if as_json:
+                return Response(body, headers=headers, media_type=ctype)
+            return HTMLResponse(body, headers=headers)
+        if path + "/" in vfs.dirs:
+            return RedirectResponse(quote(path) + "/", status_code=301, headers={"Server": server_header})
+        if path in vfs.files:
+            size, mtime = vfs.files[path]
+            ctype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+            headers = {"Server": server_header, "Content-Type": ctype, "Content-Length": str(size)}
+            if validators:
+                headers["Last-Modified"] = http_date(mtime)
+            if request.method == "HEAD":
+                return Response(status_code=200, headers=headers)
+            # bodies are not synthesized (sizes reach GiBs); listings and HEAD are what the crawler needs
+            return Response(status_code=501, headers={"Server": server_header})
+        return Response(status_code=404, headers={"Server": server_header})
 
-if __name__ == "__main__":
+    return app
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+class _Server(uvicorn.Server):
+    """Leaves signal handling to main() so one Ctrl+C stops every port."""
+
+    def install_signal_handlers(self):  # uvicorn < 0.29
+        pass
+
+    @contextlib.contextmanager
+    def capture_signals(self):  # uvicorn >= 0.29
+        yield
+
+
+async def serve_all(apps, host: str):
+    servers = []
+    for port, label, app in apps:
+        servers.append(_Server(uvicorn.Config(app, host=host, port=port, log_level="warning", lifespan="off", server_header=False)))
+        print(f"[mock_servers] starting {label} on http://{host}:{port}{ROOT}")
+
+    def stop():
+        for s in servers:
+            s.should_exit = True
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        with contextlib.suppress(NotImplementedError, RuntimeError, AttributeError):
+            loop.add_signal_handler(sig, stop)
+    tasks = [asyncio.create_task(s.serve()) for s in servers]
+    while not all(s.started for s in servers):
+        if any(t.done() for t in tasks):
+            break
+        await asyncio.sleep(0.01)
+    else:
+        print("[mock_servers] all mock listing servers ready (Ctrl+C to stop)", flush=True)
+    await asyncio.gather(*tasks)
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--layouts", default=",".join(label for _, label in APPS),
+                   help="comma-separated subset of " + ", ".join(LAYOUTS))
+    p.add_argument("--port-offset", type=int, default=0, help="added to every default port")
+    tree = p.add_argument_group("synthetic tree")
+    tree.add_argument("--synthetic", action="store_true", help="serve a generated tree instead of the fixed one")
+    tree.add_argument("--seed", type=int, default=1)
+    tree.add_argument("--fanout", type=int, default=8, help="subdirectories per directory")
+    tree.add_argument("--depth", type=int, default=2, help="levels of subdirectories below /root/")
+    tree.add_argument("--files", type=int, default=20, help="files per directory")
+    tree.add_argument("--max-entries", type=int, default=100_000)
+    net = p.add_argument_group("latency / faults")
+    net.add_argument("--latency", type=float, default=0.0, help="ms added to every response")
+    net.add_argument("--jitter", type=float, default=0.0, help="± ms uniform jitter")
+    net.add_argument("--route-latency", type=parse_route_latency, action="append", default=[],
+                     metavar="GLOB=MS[:JITTER]", help="per-route latency (first match wins), e.g. '/root/big/*=250:50'")
+    net.add_argument("--rate-429", type=float, default=0.0, help="fraction of requests answered 429")
+    net.add_argument("--rate-503", type=float, default=0.0, help="fraction of requests answered 503")
+    net.add_argument("--rate-timeout", type=float, default=0.0, help="fraction of requests held for --hang-ms")
+    net.add_argument("--retry-after", default="", help="Retry-After value for injected 429 / 503")
+    net.add_argument("--hang-ms", type=float, default=60000.0)
+    net.add_argument("--validators", action="store_true", help="send ETag / Last-Modified and answer 304")
+    p.add_argument("--json", action="store_true",
+                   help="nginx / caddy ports answer Accept: application/json with JSON listings (Vary: Accept)")
+    return p.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.synthetic:
+        vfs = VirtualFS.synthetic(args.seed, args.fanout, args.depth, args.files, args.max_entries)
+    else:
+        vfs = VirtualFS.static()
+    print(f"[mock_servers] tree: {vfs.counts()}")
+    selected = [label.strip() for label in args.layouts.split(",") if label.strip()]
+    apps = []
+    for port, label in APPS:
+        if label not in selected:
+            continue
+        layout_func, server_header, json_func = LAYOUTS[label]
+        # one RNG per app keeps each port's fault sequence reproducible for a given seed
+        faults = Faults(args.latency, args.jitter, args.route_latency, args.rate_429, args.rate_503,
+                        args.rate_timeout, args.retry_after, args.hang_ms, random.Random(f"{args.seed}:{label}"))
+        apps.append((port + args.port_offset, label, build_app(layout_func, server_header, vfs, faults, args.validators,
+                                                            json_func if args.json else None)))
     try:
-        from multiprocessing import Process
-
-        procs = []
-        for port, label in APPS:
-            p = Process(target=_run, args=(port, label), daemon=True)
-            p.start()
-            procs.append(p)
-        print("[mock_servers] all mock listing servers launched (Ctrl+C to stop)")
-        for p in procs:
-            p.join()
+        asyncio.run(serve_all(apps, args.host))
     except KeyboardInterrupt:
+        pass
+    with contextlib.suppress(BrokenPipeError):  # parent (e.g. a benchmark) may have closed stdout
         print("\n[mock_servers] shutdown requested")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,26 +8,44 @@
 
 Usage (Astral uv):
   uv run scripts/collect_listings.py
+  uv run scripts/collect_listings.py --concurrency 16 --only nginx,caddy
 
-Servers probed (skip if unreachable) – default ports (override via env, e.g. FOLDERAPI_PORT_CADDY=18080):
+Servers probed in parallel (skip if unreachable) – default ports (override via env, e.g. FOLDERAPI_PORT_CADDY=18080):
         caddy  : http://localhost:8080/
         nginx  : http://localhost:8081/
         apache : http://localhost:8082/
         iis    : http://localhost:8083/
+Not probed: the compose service nginx-json (http://localhost:8084/) serves the same tree as nginx, with JSON
+listings for `Accept: application/json`; its HTML would only duplicate the nginx fixtures.
+
+Every reachable server is collected at the same time, each through its own keep-alive connection pool
+with up to --concurrency requests in flight.
 
 Writes to listings/<server>/<relative path>/listing.html
 Existing files overwritten.
+With --corpus PATH the listings go into a single content-addressed corpus file instead (see corpus.py); an
+existing corpus is updated in place and only listings whose content changed are written.
+Per-request timings and a per-server summary go to listings/_timings.json (--report to change), so a run
+doubles as a rough cross-server latency comparison.
 """
 from __future__ import annotations
 
+import argparse
+import json
+import math
 import os
 import sys
+import threading
 import time
 import urllib.parse as up
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 import requests
+from requests.adapters import HTTPAdapter
+
+from corpus import CorpusWriter
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 OUT_ROOT = REPO_ROOT / "listings"
@@ -41,6 +59,9 @@ DEFAULT_PORTS = {
     "iis": 8083,
 }
 
+DEFAULT_CONCURRENCY = 8
+DEFAULT_TIMEOUT = 5.0
+
 def resolve_ports() -> dict[str, int]:
     ports: dict[str, int] = {}
     for name, port in DEFAULT_PORTS.items():
@@ -72,6 +93,16 @@ def build_servers() -> List[Server]:
 SERVERS: List[Server] = build_servers()
 
 
+@dataclass
+class Timing:
+    server: str
+    path: str
+    status: Optional[int]
+    bytes: int
+    ms: float
+    error: Optional[str] = None
+
+
 def enumerate_dirs(root: Path) -> List[Path]:
     dirs: List[Path] = [Path("")]
     for current_root, subdirs, _files in os.walk(root):
@@ -91,38 +122,179 @@ def encode_rel(rel: Path) -> str:
     return "/".join(parts) + "/"
 
 
-def fetch(url: str, timeout: float = 5.0):
+def make_session(concurrency: int) -> requests.Session:
+    """One keep-alive pool per server, sized so every worker can hold a connection."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def fetch(session: requests.Session, url: str, timeout: float = DEFAULT_TIMEOUT):
+    """Returns (ok, text or error message, status, elapsed ms)."""
+    started = time.perf_counter()
+    status: Optional[int] = None
     try:
-        r = requests.get(url, timeout=timeout)
+        r = session.get(url, timeout=timeout)
+        status = r.status_code
         r.raise_for_status()
-        return True, r.text
+        return True, r.text, status, (time.perf_counter() - started) * 1000
     except Exception as e:  # noqa: BLE001
-        return False, str(e)
-
+        return False, str(e), status, (time.perf_counter() - started) * 1000
 
-def main() -> int:
-    start = time.time()
-    dirs = enumerate_dirs(REPO_ROOT)
-    print(f"[collector] enumerated {len(dirs)} directories")
-    OUT_ROOT.mkdir(exist_ok=True)
 
-    for server in SERVERS:
-        print(f"[collector] server {server.name} ({server.base})")
-        ok, _ = fetch(server.base)
+def probe(servers: List[Server], timeout: float) -> List[Server]:
+    """Checks every server at once; returns the reachable ones in their original order."""
+    def reachable(server: Server) -> bool:
+        with requests.Session() as session:
+            ok, _, _, _ = fetch(session, server.base, timeout)
         if not ok:
             print(f"[collector] skipping {server.name}: unreachable", file=sys.stderr)
-            continue
-        for rel in dirs:
-            encoded = encode_rel(rel)
-            url = server.base + encoded
-            success, payload = fetch(url)
+        return ok
+
+    with ThreadPoolExecutor(max_workers=max(1, len(servers))) as pool:
+        flags = list(pool.map(reachable, servers))
+    return [s for s, ok in zip(servers, flags) if ok]
+
+
+def corpus_path(rel: Path) -> str:
+    return "" if rel == Path("") else rel.as_posix() + "/"
+
+
+def collect_server(server: Server, dirs: List[Path], concurrency: int, timeout: float, progress: "Progress",
+                   corpus: Optional[CorpusWriter] = None) -> List[Timing]:
+    session = make_session(concurrency)
+
+    def one(rel: Path) -> Timing:
+        encoded = encode_rel(rel)
+        success, payload, status, ms = fetch(session, server.base + encoded, timeout)
+        if corpus is not None:
+            corpus.put(server.name, corpus_path(rel), payload, "html" if success else "error")
+        else:
             target_dir = OUT_ROOT / server.name / rel
             target_dir.mkdir(parents=True, exist_ok=True)
             if success:
                 (target_dir / "listing.html").write_text(payload, encoding="utf-8")
             else:
                 (target_dir / "listing.error.txt").write_text(payload, encoding="utf-8")
-    elapsed = (time.time() - start) * 1000
+        progress.tick()
+        return Timing(server.name, "/" + encoded, status, len(payload.encode("utf-8")) if success else 0, round(ms, 2),
+                      None if success else payload)
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f"collect-{server.name}") as pool:
+            return list(pool.map(one, dirs))
+    finally:
+        session.close()
+
+
+class Progress:
+    """Prints a line every `every` finished requests (across all servers)."""
+
+    def __init__(self, total: int, every: int = 500):
+        self.total = total
+        self.every = every
+        self.done = 0
+        self.lock = threading.Lock()
+
+    def tick(self):
+        with self.lock:
+            self.done += 1
+            if self.done % self.every == 0:
+                print(f"[collector] {self.done}/{self.total} requests")
+
+
+def percentile(sorted_ms: List[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_ms:
+        return 0.0
+    return sorted_ms[min(len(sorted_ms) - 1, max(0, math.ceil(p * len(sorted_ms)) - 1))]
+
+
+def summarize(timings: List[Timing], wall_ms: float) -> dict:
+    ms = sorted(t.ms for t in timings)
+    ok = [t for t in timings if t.error is None]
+    return {
+        "requests": len(timings),
+        "ok": len(ok),
+        "failed": len(timings) - len(ok),
+        "bytes": sum(t.bytes for t in ok),
+        "wallMs": round(wall_ms, 1),
+        "meanMs": round(sum(ms) / len(ms), 2) if ms else 0.0,
+        "p50Ms": percentile(ms, 0.50),
+        "p95Ms": percentile(ms, 0.95),
+        "maxMs": ms[-1] if ms else 0.0,
+        "requestsPerSecond": round(len(timings) / (wall_ms / 1000), 1) if wall_ms > 0 else 0.0,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Collect directory listing HTML from local servers.")
+    p.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                   help=f"in-flight requests per server (default {DEFAULT_CONCURRENCY})")
+    p.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="seconds per request")
+    p.add_argument("--only", default="", help="comma-separated server names (default: all)")
+    p.add_argument("--report", type=Path, default=None, help="timing report path (default listings/_timings.json)")
+    p.add_argument("--corpus", type=Path, default=None, help="write into this corpus file instead of listing.html files")
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    concurrency = max(1, args.concurrency)
+    start = time.perf_counter()
+    dirs = enumerate_dirs(REPO_ROOT)
+    print(f"[collector] enumerated {len(dirs)} directories")
+
+    only = {n.strip() for n in args.only.split(",") if n.strip()}
+    candidates = [s for s in SERVERS if not only or s.name in only]
+    servers = probe(candidates, args.timeout)
+    for server in servers:
+        print(f"[collector] server {server.name} ({server.base})")
+
+    progress = Progress(len(dirs) * len(servers))
+    summaries: dict[str, dict] = {}
+    timings: List[Timing] = []
+
+    corpus = CorpusWriter(args.corpus) if args.corpus else None
+
+    def run(server: Server):
+        began = time.perf_counter()
+        result = collect_server(server, dirs, concurrency, args.timeout, progress, corpus)
+        return server, result, (time.perf_counter() - began) * 1000
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, len(servers))) as pool:
+            for server, result, wall_ms in pool.map(run, servers):
+                summaries[server.name] = summarize(result, wall_ms)
+                timings.extend(result)
+    finally:
+        if corpus is not None:
+            # directories that no longer exist would otherwise linger from an earlier run
+            current = {corpus_path(rel) for rel in dirs}
+            for server_name, path in list(corpus.entries):
+                if server_name in summaries and path not in current:
+                    corpus.remove(server_name, path)
+            corpus.close()
+            print(f"[collector] corpus {args.corpus}: {corpus.added} new blobs, {corpus.unchanged} unchanged listings")
+
+    elapsed = (time.perf_counter() - start) * 1000
+    if summaries:
+        print(f"[collector] {'server':<8} {'ok':>6} {'fail':>5} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'req/s':>8}")
+        for name, s in summaries.items():
+            print(f"[collector] {name:<8} {s['ok']:>6} {s['failed']:>5} {s['p50Ms']:>8.1f} {s['p95Ms']:>8.1f} {s['maxMs']:>8.1f} {s['requestsPerSecond']:>8.1f}")
+    report = args.report or OUT_ROOT / "_timings.json"
+    report.parent.mkdir(parents=True, exist_ok=True)
+    report.write_text(json.dumps({
+        "concurrency": concurrency,
+        "timeout": args.timeout,
+        "directories": len(dirs),
+        "elapsedMs": round(elapsed, 1),
+        "servers": summaries,
+        "requests": [asdict(t) for t in timings],
+    }, indent=2), encoding="utf-8")
+    print(f"[collector] timings written to {report}")
     print(f"[collector] done in {elapsed:.0f} ms")
     return 0
 
@@ -0,0 +1,319 @@
+# /// script
+# dependencies = []
+# ///
+
+"""Single-file, content-addressed corpus of collected directory listings.
+
+Usage (Astral uv):
+  uv run scripts/corpus.py pack listings/ listings.corpus     # import a listings/ tree (incremental)
+  uv run scripts/corpus.py ls listings.corpus [server]
+  uv run scripts/corpus.py cat listings.corpus nginx src/core/
+  uv run scripts/corpus.py compact listings.corpus             # drop blobs no entry references
+
+collect_listings.py --corpus listings.corpus writes straight into a corpus instead of listing.html files.
+
+File layout (little-endian):
+
+  header   b"FLDRCORP" | u32 version (1) | u32 flags (0)                                   16 bytes
+  blobs    zlib streams, one per distinct listing body (sha256 of the uncompressed bytes)
+  index    zlib-compressed UTF-8 JSON:
+             {"version": 1,
+              "blobs":   [[offset, length, rawLength, sha256], ...],
+              "entries": [[server, path, blob, kind], ...]}       kind: "html" | "error"
+  trailer  u64 index offset | u32 index length | u32 crc32(index) | b"FLDRCEND"                24 bytes
+
+Paths are relative to the server root with a trailing slash ("" for the root, "src/core/").
+Readers need only the trailer and the index up front; a blob is read (or mmap-sliced) when asked for.
+Updates reuse blobs whose hash is already present, append the new ones after the old trailer and write
+a fresh index + trailer, so unchanged listings are never rewritten and the previous index stays intact
+until the new one is complete. An update that never reached its trailer (crash, Ctrl+C) leaves the file
+ending in partial blobs; readers then use the last complete trailer, and the next update appends there.
+Superseded indexes and blobs left unreferenced by an update stay in the file until `compact`.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b"FLDRCORP"
+END_MAGIC = b"FLDRCEND"
+VERSION = 1
+HEADER = struct.Struct("<8sII")
+TRAILER = struct.Struct("<QII8s")
+KINDS = ("html", "error")
+
+
+class CorpusError(Exception):
+    pass
+
+
+@dataclass
+class Blob:
+    offset: int
+    length: int
+    raw_length: int
+    sha256: str
+
+
+@dataclass
+class Entry:
+    server: str
+    path: str
+    blob: int
+    kind: str
+
+
+def _read_index(buf) -> Tuple[List[Blob], Dict[Tuple[str, str], Entry], int, int]:
+    """Parses the last complete trailer + index of a corpus held in `buf` (bytes or mmap).
+
+    Returns (blobs, entries, index offset, end of the trailer); bytes after it are an interrupted update.
+    """
+    if len(buf) < HEADER.size + TRAILER.size:
+        raise CorpusError("corpus: file too short")
+    magic, version, _flags = HEADER.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise CorpusError("corpus: not a listing corpus")
+    if version != VERSION:
+        raise CorpusError(f"corpus: unsupported version {version}")
+    pos = buf.rfind(END_MAGIC, HEADER.size)
+    while pos >= 0:
+        end = pos + len(END_MAGIC)
+        offset = _index_at(buf, end)
+        if offset is not None:
+            index = json.loads(zlib.decompress(buf[offset:end - TRAILER.size]))
+            blobs = [Blob(*b) for b in index["blobs"]]
+            entries = {(s, p): Entry(s, p, b, k) for s, p, b, k in index["entries"]}
+            return blobs, entries, offset, end
+        pos = buf.rfind(END_MAGIC, HEADER.size, pos)
+    raise CorpusError("corpus: missing trailer")
+
+
+def _index_at(buf, end: int) -> Optional[int]:
+    """Offset of the index described by a trailer ending at `end`, or None when no valid trailer ends there."""
+    if end < HEADER.size + TRAILER.size:
+        return None
+    offset, length, crc, magic = TRAILER.unpack_from(buf, end - TRAILER.size)
+    if magic != END_MAGIC or offset < HEADER.size or offset + length != end - TRAILER.size:
+        return None
+    return offset if zlib.crc32(buf[offset:offset + length]) == crc else None
+
+
+class CorpusReader:
+    """Memory-maps a corpus; blobs are decompressed on access."""
+
+    def __init__(self, path: Path):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.blobs, self._entries, _, _ = _read_index(self._map)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def entries(self, server: Optional[str] = None) -> List[Entry]:
+        return [e for e in self._entries.values() if server is None or e.server == server]
+
+    def get(self, server: str, path: str) -> Optional[Tuple[str, str]]:
+        """Returns (kind, text) or None."""
+        entry = self._entries.get((server, path))
+        if entry is None:
+            return None
+        blob = self.blobs[entry.blob]
+        return entry.kind, zlib.decompress(self._map[blob.offset:blob.offset + blob.length]).decode("utf-8")
+
+
+class CorpusWriter:
+    """Opens (or creates) a corpus for update. Thread-safe `put`; `close` writes the index.
+
+    Compression and hashing happen outside the lock, so collector threads only serialize on the append.
+    """
+
+    def __init__(self, path: Path, level: int = 9):
+        self.path = Path(path)
+        self.level = level
+        self._lock = threading.Lock()
+        self.added = 0  # blobs appended by this session
+        self.reused = 0  # puts satisfied by an existing blob
+        self.unchanged = 0  # puts whose entry already pointed at the same content
+        self._changed = False  # close() leaves the file as it is when nothing changed
+        if self.path.exists() and self.path.stat().st_size > 0:
+            with open(self.path, "rb") as f:
+                self.blobs, self.entries, index_offset, end = _read_index(f.read())
+            self._file = open(self.path, "r+b")
+        else:
+            self.blobs, self.entries, index_offset, end = [], {}, HEADER.size, HEADER.size
+            self._file = open(self.path, "w+b")
+            self._file.write(HEADER.pack(MAGIC, VERSION, 0))
+            self._changed = True
+        self._by_hash = {b.sha256: i for i, b in enumerate(self.blobs)}
+        # Everything before `end` that is not a blob: earlier indexes / trailers, and the current one, which is
+        # superseded once close() writes a new one.
+        self._stale = end - HEADER.size - sum(b.length for b in self.blobs)
+        self._index_bytes = end - index_offset
+        # New blobs go after the last complete trailer, so the file stays readable until close() writes the
+        # new one. Only the leftovers of an interrupted update are cut here.
+        self._file.seek(end)
+        self._file.truncate()
+        self._end = end
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def put(self, server: str, path: str, data: bytes | str, kind: str = "html") -> None:
+        if kind not in KINDS:
+            raise ValueError(f"kind must be one of {KINDS}")
+        raw = data.encode("utf-8") if isinstance(data, str) else data
+        digest = hashlib.sha256(raw).hexdigest()
+        with self._lock:
+            index = self._by_hash.get(digest)
+        if index is None:
+            packed = zlib.compress(raw, self.level)
+            with self._lock:
+                index = self._by_hash.get(digest)  # another thread may have stored it meanwhile
+                if index is None:
+                    self._file.write(packed)
+                    index = len(self.blobs)
+                    self.blobs.append(Blob(self._end, len(packed), len(raw), digest))
+                    self._by_hash[digest] = index
+                    self._end += len(packed)
+                    self.added += 1
+                    self._changed = True
+                else:
+                    self.reused += 1
+        else:
+            with self._lock:
+                self.reused += 1
+        with self._lock:
+            previous = self.entries.get((server, path))
+            if previous is not None and previous.blob == index and previous.kind == kind:
+                self.unchanged += 1
+            else:
+                self._changed = True
+            self.entries[(server, path)] = Entry(server, path, index, kind)
+
+    def remove(self, server: str, path: str) -> bool:
+        with self._lock:
+            removed = self.entries.pop((server, path), None) is not None
+            self._changed = self._changed or removed
+            return removed
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        with self._lock:
+            if not self._changed:
+                self._file.close()
+                return
+            blobs = [[b.offset, b.length, b.raw_length, b.sha256] for b in self.blobs]
+            entries = [[e.server, e.path, e.blob, e.kind] for e in sorted(self.entries.values(), key=lambda e: (e.server, e.path))]
+            packed = zlib.compress(json.dumps({"version": VERSION, "blobs": blobs, "entries": entries},
+                                              separators=(",", ":")).encode("utf-8"), self.level)
+            self._file.write(packed)
+            self._file.write(TRAILER.pack(self._end, len(packed), zlib.crc32(packed), END_MAGIC))
+            self._file.truncate()
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+    def dead_bytes(self) -> int:
+        """Bytes `compact` would reclaim: unreferenced blobs and superseded indexes."""
+        referenced = {e.blob for e in self.entries.values()}
+        stale = self._stale if self._changed else self._stale - self._index_bytes
+        return stale + sum(b.length for i, b in enumerate(self.blobs) if i not in referenced)
+
+
+def compact(path: Path, level: int = 9) -> Tuple[int, int]:
+    """Rewrites the corpus keeping only referenced blobs (in entry order). Returns (bytes before, bytes after)."""
+    path = Path(path)
+    before = path.stat().st_size
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.unlink(missing_ok=True)
+    with CorpusReader(path) as reader, CorpusWriter(tmp, level) as writer:
+        for entry in sorted(reader.entries(), key=lambda e: (e.server, e.path)):
+            blob = reader.blobs[entry.blob]
+            raw = zlib.decompress(reader._map[blob.offset:blob.offset + blob.length])
+            writer.put(entry.server, entry.path, raw, entry.kind)
+    os.replace(tmp, path)
+    return before, path.stat().st_size
+
+
+def iter_listing_tree(root: Path) -> Iterator[Tuple[str, str, Path, str]]:
+    """Yields (server, path, file, kind) for a listings/<server>/<rel>/listing.{html,error.txt} tree."""
+    for server_dir in sorted(p for p in root.iterdir() if p.is_dir()):
+        for current, _dirs, files in os.walk(server_dir):
+            rel = Path(current).relative_to(server_dir).as_posix()
+            rel = "" if rel == "." else rel + "/"
+            for name, kind in (("listing.html", "html"), ("listing.error.txt", "error")):
+                if name in files:
+                    yield server_dir.name, rel, Path(current) / name, kind
+
+
+def _main(argv: List[str]) -> int:
+    import argparse
+
+    p = argparse.ArgumentParser(description="Pack, inspect and compact listing corpora.")
+    sub = p.add_subparsers(dest="command", required=True)
+    pack = sub.add_parser("pack", help="import a listings/ tree (updates an existing corpus in place)")
+    pack.add_argument("tree", type=Path)
+    pack.add_argument("corpus", type=Path)
+    pack.add_argument("--prune", action="store_true", help="drop entries missing from the tree")
+    ls = sub.add_parser("ls", help="list entries")
+    ls.add_argument("corpus", type=Path)
+    ls.add_argument("server", nargs="?")
+    cat = sub.add_parser("cat", help="print one listing")
+    cat.add_argument("corpus", type=Path)
+    cat.add_argument("server")
+    cat.add_argument("path")
+    comp = sub.add_parser("compact", help="rewrite without unreferenced blobs")
+    comp.add_argument("corpus", type=Path)
+    args = p.parse_args(argv)
+
+    if args.command == "pack":
+        seen = set()
+        with CorpusWriter(args.corpus) as writer:
+            for server, rel, file, kind in iter_listing_tree(args.tree):
+                writer.put(server, rel, file.read_bytes(), kind)
+                seen.add((server, rel))
+            pruned = [k for k in list(writer.entries) if k not in seen] if args.prune else []
+            for server, rel in pruned:
+                writer.remove(server, rel)
+        print(f"[corpus] {len(seen)} listings: {writer.added} new blobs, {writer.reused} deduplicated, "
+              f"{writer.unchanged} unchanged, {len(pruned)} pruned; {writer.dead_bytes()} unreferenced bytes")
+    elif args.command == "ls":
+        with CorpusReader(args.corpus) as reader:
+            for e in sorted(reader.entries(args.server), key=lambda e: (e.server, e.path)):
+                blob = reader.blobs[e.blob]
+                print(f"{e.server}\t/{e.path}\t{e.kind}\t{blob.raw_length}\t{blob.sha256[:12]}")
+    elif args.command == "cat":
+        with CorpusReader(args.corpus) as reader:
+            found = reader.get(args.server, args.path)
+            if found is None:
+                print(f"[corpus] no entry {args.server} /{args.path}", file=sys.stderr)
+                return 1
+            sys.stdout.write(found[1])
+    elif args.command == "compact":
+        before, after = compact(args.corpus)
+        print(f"[corpus] {before} -> {after} bytes")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(_main(sys.argv[1:]))
@@ -0,0 +1,309 @@
+import { CompactEntryStore, EntryKind, FileEntry, FolderApiResult, FolderEntry, FolderNode, FolderRole, NormalizedOptions } from '../types.js';
+import { claimStart, walk, WalkState } from './recursion.js';
+import { normalizeDirectoryUrl } from '../utils/url.js';
+
+// resultFormat: 'compact'. Entries are stored once, column-wise: a URL is an interned directory prefix plus
+// its last segment (the segments of one listing are joined into a single string, so the parser's URL strings
+// are not kept alive through substrings), dates are epoch milliseconds, and rawName / name / date are only kept per entry when
+// they cannot be derived (see `exceptions`). The result's root / folders / files / entries are getters that
+// build plain objects on first access, so a caller that only reads `compact` never materializes 50k objects.
+
+const ROLES: FolderRole[] = ['self', 'child', 'root', 'parent'];
+const NO_ROLE = 255;
+const MIME_ABSENT = -1; // entry has no `mime` property (includeMime off)
+
+interface Exception {
+  rawName?: string;
+  name?: string;
+  date?: string | null;
+}
+
+export class CompactEntries implements CompactEntryStore {
+  count = 0;
+  readonly directoryPrefixes: string[] = [];
+  private readonly prefixIndex = new Map<string, number>();
+  private readonly mimeTable: Array<string | null> = [null];
+  private readonly mimeIndex = new Map<string | null, number>([[null, 0]]);
+  private capacity = 0;
+  private kinds = new Uint8Array(0); // 0 folder, 1 file
+  private roles = new Uint8Array(0);
+  private hiddenFlags = new Uint8Array(0);
+  private depths = new Int32Array(0);
+  private prefixes = new Int32Array(0);
+  private mimes = new Int32Array(0);
+  private sizes = new Float64Array(0); // NaN = null
+  private dates = new Float64Array(0); // epoch ms, NaN = null
+  private tailChunk = new Int32Array(0); // url after its prefix = tailChunks[tailChunk[i]].slice(tailStart[i], tailEnd[i])
+  private tailStart = new Int32Array(0);
+  private tailEnd = new Int32Array(0);
+  private readonly tailChunks: string[] = [];
+  private pendingTails: string[] = []; // tails added since the last flush()
+  private pendingFrom = 0;
+  private pendingLength = 0;
+  private readonly exceptions = new Map<number, Exception>();
+  private readonly listings = new Map<number, [start: number, end: number]>(); // directory entry -> its listing's entries
+  private folderOrder: number[] = [];
+  private fileOrder: number[] = [];
+  private readonly nodes = new Map<number, FolderNode>();
+
+  add(entry: FolderEntry | FileEntry, flat: boolean): number {
+    if (this.count === this.capacity) this.grow();
+    const i = this.count++;
+    const url = entry.url;
+    let cut = url.lastIndexOf('/', url.length - 2) + 1;
+    if (cut <= url.indexOf('//') + 2) cut = url.length; // origin root: the whole URL is the prefix
+    const prefix = url.slice(0, cut);
+    let p = this.prefixIndex.get(prefix);
+    if (p === undefined) {
+      p = this.directoryPrefixes.push(prefix) - 1;
+      this.prefixIndex.set(prefix, p);
+    }
+    const tail = url.slice(cut);
+    this.prefixes[i] = p;
+    if (this.pendingTails.length === 0) this.pendingFrom = i;
+    this.pendingTails.push(tail);
+    this.tailChunk[i] = this.tailChunks.length;
+    this.tailStart[i] = this.pendingLength;
+    this.pendingLength += tail.length;
+    this.tailEnd[i] = this.pendingLength;
+    this.kinds[i] = entry.kind === 'file' ? 1 : 0;
+    this.roles[i] = entry.kind === 'folder' ? ROLES.indexOf(entry.role) : NO_ROLE;
+    this.depths[i] = entry.kind === 'folder' ? entry.depth : 0;
+    this.hiddenFlags[i] = entry.hidden ? 1 : 0;
+    this.sizes[i] = entry.size ?? NaN;
+    this.mimes[i] = entry.mime === undefined ? MIME_ABSENT : this.internMime(entry.mime);
+    let exception: Exception | null = null;
+    if (entry.rawName !== segmentOf(tail)) (exception ??= {}).rawName = entry.rawName;
+    if (entry.name !== entry.rawName) (exception ??= {}).name = entry.name;
+    const ms = entry.date == null ? NaN : canonicalIsoMs(entry.date);
+    if (entry.date != null && Number.isNaN(ms)) (exception ??= {}).date = entry.date;
+    this.dates[i] = ms;
+    if (exception) this.exceptions.set(i, exception);
+    if (flat) (entry.kind === 'file' ? this.fileOrder : this.folderOrder).push(i);
+    return i;
+  }
+
+  // HEAD enrichment finishes after a listing was stored: copy the MIME type / size it filled in.
+  update(i: number, file: FileEntry) {
+    this.sizes[i] = file.size ?? NaN;
+    this.mimes[i] = file.mime === undefined ? MIME_ABSENT : this.internMime(file.mime);
+  }
+
+  setListing(directory: number, start: number, end: number) {
+    this.listings.set(directory, [start, end]);
+    this.flush();
+  }
+
+  // Copies the tails added since the last flush into one flat string.
+  flush() {
+    if (this.pendingTails.length === 0) return;
+    this.tailChunks.push(this.pendingTails.join(''));
+    this.pendingTails = [];
+    this.pendingLength = 0;
+  }
+
+  // Drops growth slack once the crawl is done.
+  seal() {
+    this.flush();
+    const n = this.count;
+    this.tailChunk = this.tailChunk.slice(0, n);
+    this.tailStart = this.tailStart.slice(0, n);
+    this.tailEnd = this.tailEnd.slice(0, n);
+    this.kinds = this.kinds.slice(0, n);
+    this.roles = this.roles.slice(0, n);
+    this.hiddenFlags = this.hiddenFlags.slice(0, n);
+    this.depths = this.depths.slice(0, n);
+    this.prefixes = this.prefixes.slice(0, n);
+    this.mimes = this.mimes.slice(0, n);
+    this.sizes = this.sizes.slice(0, n);
+    this.dates = this.dates.slice(0, n);
+    this.capacity = n;
+  }
+
+  kindAt(i: number): EntryKind {
+    return this.kinds[i] === 1 ? 'file' : 'folder';
+  }
+
+  urlAt(i: number): string {
+    return this.directoryPrefixes[this.prefixes[i]] + this.tailAt(i);
+  }
+
+  nameAt(i: number): string {
+    const e = this.exceptions.get(i);
+    return e?.name ?? e?.rawName ?? segmentOf(this.tailAt(i));
+  }
+
+  sizeAt(i: number): number | null {
+    const size = this.sizes[i];
+    return Number.isNaN(size) ? null : size;
+  }
+
+  dateAt(i: number): string | null {
+    const e = this.exceptions.get(i);
+    if (e && e.date !== undefined) return e.date;
+    const ms = this.dates[i];
+    return Number.isNaN(ms) ? null : new Date(ms).toISOString();
+  }
+
+  folderIndexes(): Int32Array {
+    return Int32Array.from(this.folderOrder);
+  }
+
+  fileIndexes(): Int32Array {
+    return Int32Array.from(this.fileOrder);
+  }
+
+  // Builds the same object folderApiRequest returns in the default format (a fresh object per call).
+  entryAt(i: number): FolderEntry | FileEntry {
+    const e = this.exceptions.get(i);
+    const raw = e?.rawName ?? segmentOf(this.tailAt(i));
+    const base = {
+      url: this.urlAt(i),
+      rawName: raw,
+      name: e?.name ?? raw,
+      hidden: this.hiddenFlags[i] === 1,
+      size: this.sizeAt(i),
+      date: this.dateAt(i)
+    };
+    if (this.kinds[i] === 0) {
+      return { kind: 'folder', ...base, role: ROLES[this.roles[i]], depth: this.depths[i] };
+    }
+    const mime = this.mimes[i];
+    return mime === MIME_ABSENT ? { kind: 'file', ...base } : { kind: 'file', ...base, mime: this.mimeTable[mime] };
+  }
+
+  // Tree node whose children / files are materialized on first access; one object per directory.
+  nodeAt(i: number): FolderNode {
+    let node = this.nodes.get(i);
+    if (node) return node;
+    node = this.entryAt(i) as FolderNode;
+    const listing = this.listings.get(i);
+    lazy(node, 'children', () => {
+      const out: FolderNode[] = [];
+      if (listing) for (let j = listing[0]; j < listing[1]; j++) if (this.kinds[j] === 0 && ROLES[this.roles[j]] === 'child') out.push(this.nodeAt(j));
+      return out;
+    });
+    lazy(node, 'files', () => {
+      const out: FileEntry[] = [];
+      if (listing) for (let j = listing[0]; j < listing[1]; j++) if (this.kinds[j] === 1) out.push(this.entryAt(j) as FileEntry);
+      return out;
+    });
+    this.nodes.set(i, node);
+    return node;
+  }
+
+  private tailAt(i: number): string {
+    const chunk = this.tailChunk[i];
+    if (chunk === this.tailChunks.length) return this.pendingTails[i - this.pendingFrom];
+    return this.tailChunks[chunk].slice(this.tailStart[i], this.tailEnd[i]);
+  }
+
+  private internMime(mime: string | null): number {
+    let m = this.mimeIndex.get(mime);
+    if (m === undefined) {
+      m = this.mimeTable.push(mime) - 1;
+      this.mimeIndex.set(mime, m);
+    }
+    return m;
+  }
+
+  private grow() {
+    const capacity = Math.max(256, this.capacity * 2);
+    const copy = <T extends Uint8Array | Int32Array | Float64Array>(from: T, make: new (n: number) => T): T => {
+      const to = new make(capacity);
+      to.set(from as any);
+      return to;
+    };
+    this.kinds = copy(this.kinds, Uint8Array);
+    this.roles = copy(this.roles, Uint8Array);
+    this.hiddenFlags = copy(this.hiddenFlags, Uint8Array);
+    this.depths = copy(this.depths, Int32Array);
+    this.prefixes = copy(this.prefixes, Int32Array);
+    this.tailChunk = copy(this.tailChunk, Int32Array);
+    this.tailStart = copy(this.tailStart, Int32Array);
+    this.tailEnd = copy(this.tailEnd, Int32Array);
+    this.mimes = copy(this.mimes, Int32Array);
+    this.sizes = copy(this.sizes, Float64Array);
+    this.dates = copy(this.dates, Float64Array);
+    this.capacity = capacity;
+  }
+}
+
+const ISO = /^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{3}Z$/;
+
+// Epoch ms of a date that toISOString() reproduces exactly, else NaN (kept verbatim). Cheaper than a round
+// trip: Date.parse rejects out-of-range months / minutes and rolls day overflow (Feb 30, 24:00) into the
+// next day, which the day-of-month check catches.
+function canonicalIsoMs(date: string): number {
+  if (!ISO.test(date)) return NaN;
+  const ms = Date.parse(date);
+  return new Date(ms).getUTCDate() === Number(date.slice(8, 10)) ? ms : NaN;
+}
+
+// Last path segment as parseDirectory derives rawName (no trailing slash).
+function segmentOf(tail: string): string {
+  return tail.endsWith('/') ? tail.slice(0, -1) : tail;
+}
+
+// traverse() for the compact format: batches from walk() are copied into the store and then dropped.
+// onBatch gets each listing's files and the store index of the first one (files are stored contiguously).
+export async function traverseCompact(
+  startUrl: string,
+  opts: NormalizedOptions,
+  state: WalkState,
+  store: CompactEntries,
+  onBatch?: (files: FileEntry[], first: number) => void
+): Promise<void> {
+  const start = claimStart(startUrl, state);
+  if (!start) {
+    const url = normalizeDirectoryUrl(startUrl);
+    const seg = new URL(url).pathname.split('/').filter(Boolean).pop() || '';
+    store.add({ kind: 'folder', url, rawName: seg, name: seg, hidden: seg.startsWith('.') && seg !== '.' && seg !== '..', size: null, date: null, role: 'self', depth: 0 }, true);
+    return;
+  }
+  const seen = new Set<string>([`self ${start.url}`]);
+  const pending = new Map<FolderEntry, number>([[start, store.add(start, true)]]);
+  store.flush();
+  for await (const batch of walk(start, opts, state)) {
+    const directory = pending.get(batch.directory)!;
+    pending.delete(batch.directory);
+    const begin = store.count;
+    for (const f of batch.folders) {
+      const key = `${f.role} ${f.url}`;
+      const i = store.add(f, !seen.has(key));
+      seen.add(key);
+      if (f.role === 'child') pending.set(f, i);
+    }
+    const first = store.count;
+    for (const fi of batch.files) store.add(fi, true);
+    store.setListing(directory, begin, store.count);
+    onBatch?.(batch.files, first);
+  }
+  store.seal();
+}
+
+// Result object whose entry arrays and tree are built on first access (then cached as plain properties).
+export function compactResult(store: CompactEntries, rest: Omit<FolderApiResult, 'url' | 'root' | 'folders' | 'files' | 'entries' | 'compact'>): FolderApiResult {
+  const result = { url: store.urlAt(0) } as FolderApiResult;
+  lazy(result, 'root', () => store.nodeAt(0));
+  // folders[0] is the root node itself, as in the default format
+  lazy(result, 'folders', () => Array.from(store.folderIndexes(), i => (i === 0 ? result.root : store.entryAt(i)) as FolderEntry));
+  lazy(result, 'files', () => Array.from(store.fileIndexes(), i => store.entryAt(i) as FileEntry));
+  lazy(result, 'entries', () => [...result.folders, ...result.files]);
+  Object.assign(result, rest);
+  result.compact = store;
+  return result;
+}
+
+function lazy(target: object, key: string, compute: () => unknown) {
+  const settle = (value: unknown) => {
+    Object.defineProperty(target, key, { value, enumerable: true, configurable: true, writable: true });
+    return value;
+  };
+  Object.defineProperty(target, key, {
+    enumerable: true,
+    configurable: true,
+    get: () => settle(compute()),
+    set: settle
+  });
+}
@@ -1,27 +1,151 @@
-import { NormalizedOptions } from '../types.js';
+import { ListingValidators, NormalizedOptions } from '../types.js';
+import { OverloadError, parseRetryAfter } from '../utils/scheduler.js';
+import { linkSignal } from '../utils/abort.js';
+import { timeoutError } from '../utils/errors.js';
 
-export async function fetchDirectoryHtml(url: string, opts: NormalizedOptions, stats: { fetches: number }): Promise<string> {
+export type ListingFormat = 'html' | 'json';
+
+// Which budget cut a listing body short (maxListingBytes / maxEntriesPerDirectory).
+export type ListingTruncation = 'bytes' | 'entries';
+
+// html (the body: HTML, or JSON when format is 'json') and format are null when the server answered
+// 304 Not Modified to the supplied validators.
+export interface ListingResponse extends ListingValidators {
+  html: string | null;
+  format: ListingFormat | null;
+  status: number;
+  bytes: number; // Content-Length, else bytes read (0 for 304; bytes read when truncated)
+  truncated: ListingTruncation | null; // body cancelled at a budget; `html` then ends at a row boundary
+}
+
+// Instrumentation summary of a response (see Instrumentation.timeFetch).
+export function describeResponse(res: ListingResponse) {
+  return { bytes: res.bytes, status: res.status, notModified: res.html == null };
+}
+
+// GET with optional conditional headers; 304 is only accepted when validators were sent. With `json`, the
+// request prefers a JSON listing (nginx autoindex_format json, Caddy browse) and accepts either format back;
+// a 406 to that request is retried once asking for HTML. 429 / 503 throw OverloadError; a timeout throws
+// timeoutError(), so auto mode falls back to the iframe instead of waiting it out again.
+export async function fetchDirectoryResponse(url: string, opts: NormalizedOptions, stats: { fetches: number }, validators?: ListingValidators | null, json = opts.preferJson): Promise<ListingResponse> {
   const controller = new AbortController();
-  const timer = setTimeout(() => controller.abort(), opts.timeoutMs);
-  if (opts.signal) {
-    const onAbort = () => controller.abort();
-    if (opts.signal.aborted) controller.abort();
-    opts.signal.addEventListener('abort', onAbort, { once: true });
-  }
+  let timedOut = false;
+  const timer = setTimeout(() => {
+    timedOut = true;
+    controller.abort();
+  }, opts.timeoutMs);
+  const unlink = linkSignal(opts.signal, controller);
+  const headers: Record<string, string> = {
+    'Accept': json ? 'application/json,text/html;q=0.9,*/*;q=0.8' : 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8'
+  };
+  if (validators?.etag) headers['If-None-Match'] = validators.etag;
+  if (validators?.lastModified) headers['If-Modified-Since'] = validators.lastModified;
   try {
-    const res = await fetch(url, {
-      redirect: 'follow',
-      signal: controller.signal,
-      headers: {
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8'
-      }
-    });
+    let res: Response;
+    try {
+      res = await fetch(url, {
+        redirect: 'follow',
+        signal: controller.signal,
+        headers
+      });
+    } catch (e) {
+      if (timedOut) throw timeoutError();
+      throw e;
+    }
     stats.fetches++;
+    if (res.status === 429 || res.status === 503) {
+      throw new OverloadError(`http ${res.status}${res.statusText ? ' ' + res.statusText : ''}`, parseRetryAfter(res.headers.get('retry-after')));
+    }
+    const etag = res.headers.get('etag');
+    const lastModified = res.headers.get('last-modified');
+    if (res.status === 304 && validators) return { html: null, format: null, etag: etag ?? validators.etag, lastModified: lastModified ?? validators.lastModified, status: 304, bytes: 0, truncated: null };
+    if (res.status === 406 && json) {
+      clearTimeout(timer);
+      return fetchDirectoryResponse(url, opts, stats, validators, false);
+    }
     if (res.status !== 200) throw new Error(`http ${res.status}${res.statusText ? ' ' + res.statusText : ''}`);
     const ctype = res.headers.get('content-type') || '';
-    if (!/text\/html/i.test(ctype)) throw new Error(`not html content-type: ${ctype}`);
-    return await res.text();
+    const format: ListingFormat | null = /text\/html/i.test(ctype) ? 'html' : json && /[/+]json\b/i.test(ctype) ? 'json' : null;
+    if (!format) throw new Error(`not html content-type: ${ctype}`);
+    let body: ListingBody;
+    try {
+      body = await readListingBody(res, format, opts);
+    } catch (e) {
+      if (timedOut) throw timeoutError();
+      throw e;
+    }
+    const bytes = body.truncated ? body.bytes : Number(res.headers.get('content-length')) || body.bytes;
+    return { html: body.text, format, etag, lastModified, status: res.status, bytes, truncated: body.truncated };
   } finally {
     clearTimeout(timer);
+    unlink();
+  }
+}
+
+interface ListingBody {
+  text: string;
+  bytes: number;
+  truncated: ListingTruncation | null;
+}
+
+// Rows are counted as the body arrives (anchors in HTML, "name" keys in JSON). HTML pages carry a few anchors
+// that are not entries (parent, column sorting), so reading stops this far past maxEntriesPerDirectory.
+const EXTRA_ANCHORS = 32;
+const ROW_START: Record<ListingFormat, RegExp> = { html: /<a[\s>]/gi, json: /"name":/g };
+const ROW_START_LENGTH: Record<ListingFormat, number> = { html: 3, json: 7 };
+
+// Streams the body through a TextDecoder so at most maxListingBytes of a listing is ever held, and cancels the
+// download once a budget is reached. A cut body is trimmed back to the last complete row.
+async function readListingBody(res: Response, format: ListingFormat, opts: NormalizedOptions): Promise<ListingBody> {
+  // Without a body stream the whole response is already downloaded; it still goes through the same reader, so
+  // both budgets and the byte count are measured in bytes either way.
+  const body = res.body ?? new Blob([await res.arrayBuffer()]).stream();
+  const reader = body.getReader();
+  const decoder = new TextDecoder();
+  const chunks: string[] = [];
+  const rowStart = ROW_START[format];
+  const maxRows = opts.maxEntriesPerDirectory + (format === 'html' ? EXTRA_ANCHORS : 0);
+  let bytes = 0;
+  let rows = 0;
+  let tail = ''; // end of the previous chunk (shorter than a marker), so a marker split across chunks is counted once
+  let truncated: ListingTruncation | null = null;
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    let bytesNow = value;
+    if (bytes + value.byteLength > opts.maxListingBytes) {
+      bytesNow = value.subarray(0, opts.maxListingBytes - bytes);
+      truncated = 'bytes';
+    }
+    bytes += bytesNow.byteLength;
+    const text = decoder.decode(bytesNow, { stream: true });
+    chunks.push(text);
+    const scanned = tail + text;
+    rows += scanned.match(rowStart)?.length ?? 0;
+    tail = scanned.slice(1 - ROW_START_LENGTH[format]);
+    if (rows > maxRows) truncated = 'entries';
+    if (truncated) {
+      reader.cancel().catch(() => {});
+      break;
+    }
+  }
+  if (!truncated) chunks.push(decoder.decode());
+  const text = chunks.join('');
+  return { text: truncated ? completeRows(text, format) : text, bytes, truncated };
+}
+
+// Drops the row the budget cut through: HTML up to the last anchor (every earlier row's text is complete
+// by then), a JSON array up to its last complete item.
+function completeRows(text: string, format: ListingFormat): string {
+  if (format === 'html') {
+    for (let i = text.lastIndexOf('<'); i > 0; i = text.lastIndexOf('<', i - 1)) {
+      if (/^<a[\s>]/i.test(text.slice(i, i + 3))) return text.slice(0, i);
+    }
+    return text;
   }
+  // items are flat objects, so the last '}' closes the last complete one
+  const wrapped = text.trimStart().startsWith('{'); // { "items": [...] }
+  const lastItem = text.lastIndexOf('}');
+  if (lastItem < 0) return wrapped ? '{"items":[]}' : '[]';
+  return text.slice(0, lastItem + 1) + (wrapped ? ']}' : ']');
 }
@@ -0,0 +1,119 @@
+import { CachedListing, IndexedDbListingCacheOptions, ListingCacheStore } from '../types.js';
+
+interface IdbRecord {
+  key: string;
+  value: CachedListing;
+  accessedAt: number;
+}
+
+// Persistent LRU store for browsers. Recency is an indexed access timestamp; limits are enforced after each set().
+export class IndexedDbListingCache implements ListingCacheStore {
+  readonly maxEntries: number;
+  readonly maxBytes: number;
+  private readonly dbName: string;
+  private readonly storeName: string;
+  private db: Promise<IDBDatabase> | null = null;
+  private clock = 0;
+
+  constructor(options?: IndexedDbListingCacheOptions) {
+    this.maxEntries = Math.max(1, options?.maxEntries ?? 500);
+    this.maxBytes = Math.max(1, options?.maxBytes ?? 32 * 1024 * 1024);
+    this.dbName = options?.dbName ?? 'folder-api';
+    this.storeName = options?.storeName ?? 'listings';
+  }
+
+  async get(key: string): Promise<CachedListing | undefined> {
+    const store = await this.objectStore('readwrite');
+    const record = await promisify<IdbRecord | undefined>(store.get(key));
+    if (!record) return undefined;
+    record.accessedAt = this.now();
+    store.put(record);
+    await done(store.transaction);
+    return record.value;
+  }
+
+  async set(key: string, value: CachedListing): Promise<void> {
+    const store = await this.objectStore('readwrite');
+    if (value.bytes > this.maxBytes) {
+      store.delete(key);
+    } else {
+      const record: IdbRecord = { key, value, accessedAt: this.now() };
+      store.put(record);
+      // Newest first: keep records while both budgets allow, delete the rest.
+      let count = 0;
+      let bytes = 0;
+      const cursors = store.index('accessedAt').openCursor(null, 'prev');
+      await new Promise<void>((resolve, reject) => {
+        cursors.onerror = () => reject(cursors.error);
+        cursors.onsuccess = () => {
+          const cursor = cursors.result;
+          if (!cursor) return resolve();
+          const existing = cursor.value as IdbRecord;
+          count++;
+          bytes += existing.value.bytes;
+          if (count > this.maxEntries || bytes > this.maxBytes) {
+            cursor.delete();
+            count--;
+            bytes -= existing.value.bytes;
+          }
+          cursor.continue();
+        };
+      });
+    }
+    await done(store.transaction);
+  }
+
+  async delete(key: string): Promise<void> {
+    const store = await this.objectStore('readwrite');
+    store.delete(key);
+    await done(store.transaction);
+  }
+
+  async clear(): Promise<void> {
+    const store = await this.objectStore('readwrite');
+    store.clear();
+    await done(store.transaction);
+  }
+
+  close(): void {
+    const db = this.db;
+    this.db = null;
+    db?.then(d => d.close(), () => {});
+  }
+
+  // Date.now() can repeat within a millisecond; keep access order strict.
+  private now(): number {
+    this.clock = Math.max(this.clock + 1, Date.now());
+    return this.clock;
+  }
+
+  private async objectStore(mode: IDBTransactionMode): Promise<IDBObjectStore> {
+    if (!this.db) {
+      if (typeof indexedDB === 'undefined') throw new Error('indexedDB not available');
+      const request = indexedDB.open(this.dbName, 1);
+      request.onupgradeneeded = () => {
+        const store = request.result.createObjectStore(this.storeName, { keyPath: 'key' });
+        store.createIndex('accessedAt', 'accessedAt');
+      };
+      this.db = promisify(request);
+      this.db.catch(() => { this.db = null; });
+    }
+    const db = await this.db;
+    return db.transaction(this.storeName, mode).objectStore(this.storeName);
+  }
+}
+
+function promisify<T>(request: IDBRequest): Promise<T> {
+  return new Promise<T>((resolve, reject) => {
+    request.onsuccess = () => resolve(request.result as T);
+    request.onerror = () => reject(request.error);
+  });
+}
+
+function done(tx: IDBTransaction): Promise<void> {
+  return new Promise<void>((resolve, reject) => {
+    tx.oncomplete = () => resolve();
+    tx.onerror = () => reject(tx.error);
+    tx.onabort = () => reject(tx.error ?? new Error('transaction aborted'));
+  });
+}
@@ -1,48 +1,226 @@
 import { NormalizedOptions } from '../types.js';
+import { abortReason } from '../utils/abort.js';
+import { timeoutError } from '../utils/errors.js';
 
-export async function iframeDirectoryHtml(url: string, opts: NormalizedOptions, stats: { iframes: number }): Promise<string> {
-  if (typeof document === 'undefined') {
-    throw new Error('iframe mode not supported in this environment');
-  }
-  const iframe = document.createElement('iframe');
-  iframe.setAttribute('sandbox', 'allow-same-origin');
-  iframe.style.position = 'absolute';
-  iframe.style.width = '0';
-  iframe.style.height = '0';
-  iframe.style.border = '0';
-  iframe.style.visibility = 'hidden';
-  document.body.appendChild(iframe);
-  stats.iframes++;
-  const timeout = opts.timeoutMs;
-  return await new Promise<string>((resolve, reject) => {
-    const timer = setTimeout(() => {
-      cleanup();
-      reject(new Error('timeout'));
-    }, timeout);
-    function cleanup() {
+// A listing document loaded in a pooled frame. Read it (parseDirectoryHtml accepts the Document), then
+// release() the frame for the next load; the document is not usable afterwards.
+export interface IframeListing {
+  document: Document;
+  bytes(): number; // decoded body size from the frame's navigation timing (0 when unavailable)
+  release(): void;
+}
+
+interface PooledFrame {
+  iframe: HTMLIFrameElement;
+  busy: boolean;
+  navigated: boolean; // has left its initial document (later navigations use location.replace)
+}
+
+const IDLE_MS = 30000; // idle frames are removed after this long without a load
+
+// Hidden sandboxed iframes (allow-same-origin, no scripts) reused across listing loads instead of one
+// appended and removed per directory. At most `size` frames exist; further loads wait for a free one.
+// Released frames are reset to about:blank, and a frame whose load failed, timed out or was aborted is
+// removed rather than reused.
+export class IframePool {
+  private readonly frames: PooledFrame[] = [];
+  private readonly waiting: Array<(frame: PooledFrame) => void> = [];
+  private idleTimer: ReturnType<typeof setTimeout> | null = null;
+  private closed = false;
+  created = 0; // frames ever appended
+
+  constructor(public size: number, readonly doc: Document) {}
+
+  get frameCount(): number {
+    return this.frames.length;
+  }
+
+  async load(url: string, timeoutMs: number, signal?: AbortSignal): Promise<IframeListing> {
+    const frame = await this.acquire(signal);
+    let document: Document;
+    try {
+      document = await navigate(frame, url, timeoutMs, signal);
+    } catch (e) {
+      this.discard(frame);
+      throw e;
+    }
+    let released = false;
+    return {
+      document,
+      bytes: () => documentBytes(frame.iframe),
+      release: () => {
+        if (released) return;
+        released = true;
+        this.release(frame);
+      }
+    };
+  }
+
+  // Removes idle frames now and busy ones when released; waiting loads still get a frame.
+  close() {
+    this.closed = true;
+    this.trim();
+  }
+
+  // Removes idle frames.
+  trim() {
+    this.clearIdleTimer();
+    for (const frame of this.frames.filter(f => !f.busy)) this.remove(frame);
+  }
+
+  private acquire(signal?: AbortSignal): Promise<PooledFrame> {
+    if (signal?.aborted) return Promise.reject(abortReason(signal));
+    this.clearIdleTimer();
+    const idle = this.frames.find(f => !f.busy);
+    if (idle) {
+      idle.busy = true;
+      return Promise.resolve(idle);
+    }
+    if (this.frames.length < this.size) return Promise.resolve(this.create());
+    return new Promise<PooledFrame>((resolve, reject) => {
+      const waiter = (frame: PooledFrame) => {
+        signal?.removeEventListener('abort', onAbort);
+        resolve(frame);
+      };
+      const onAbort = () => {
+        const index = this.waiting.indexOf(waiter);
+        if (index >= 0) this.waiting.splice(index, 1);
+        reject(abortReason(signal!));
+      };
+      signal?.addEventListener('abort', onAbort, { once: true });
+      this.waiting.push(waiter);
+    });
+  }
+
+  private create(): PooledFrame {
+    const iframe = this.doc.createElement('iframe');
+    iframe.setAttribute('sandbox', 'allow-same-origin');
+    iframe.setAttribute('aria-hidden', 'true');
+    iframe.tabIndex = -1;
+    iframe.style.position = 'absolute';
+    iframe.style.width = '0';
+    iframe.style.height = '0';
+    iframe.style.border = '0';
+    iframe.style.visibility = 'hidden';
+    this.doc.body.appendChild(iframe);
+    this.created++;
+    const frame: PooledFrame = { iframe, busy: true, navigated: false };
+    this.frames.push(frame);
+    return frame;
+  }
+
+  private release(frame: PooledFrame) {
+    if (this.closed) {
+      this.discard(frame);
+      return;
+    }
+    try {
+      frame.iframe.contentWindow!.location.replace('about:blank'); // drop the listing document
+    } catch {
+      this.discard(frame);
+      return;
+    }
+    const waiter = this.waiting.shift();
+    if (waiter) {
+      waiter(frame);
+      return;
+    }
+    frame.busy = false;
+    if (this.frames.every(f => !f.busy)) this.idleTimer = setTimeout(() => this.trim(), IDLE_MS);
+  }
+
+  // Drops a frame in an unknown state; a waiting load gets a fresh one in its place.
+  private discard(frame: PooledFrame) {
+    this.remove(frame);
+    const waiter = this.waiting.shift();
+    if (waiter) waiter(this.create());
+  }
+
+  private remove(frame: PooledFrame) {
+    const index = this.frames.indexOf(frame);
+    if (index >= 0) this.frames.splice(index, 1);
+    frame.iframe.remove();
+  }
+
+  private clearIdleTimer() {
+    if (this.idleTimer != null) clearTimeout(this.idleTimer);
+    this.idleTimer = null;
+  }
+}
+
+// Navigates the frame and resolves with the listing document once it has loaded.
+function navigate(frame: PooledFrame, url: string, timeoutMs: number, signal?: AbortSignal): Promise<Document> {
+  const { iframe } = frame;
+  return new Promise<Document>((resolve, reject) => {
+    const timer = setTimeout(() => finish(timeoutError()), timeoutMs);
+    function finish(error: unknown, doc?: Document) {
       clearTimeout(timer);
       iframe.removeEventListener('load', onLoad);
       iframe.removeEventListener('error', onError);
-      if (iframe.parentElement) iframe.parentElement.removeChild(iframe);
+      signal?.removeEventListener('abort', onAbort);
+      if (doc) resolve(doc);
+      else reject(error);
     }
     function onLoad() {
+      let doc: Document | null = null;
       try {
-        const doc = iframe.contentDocument;
-        if (!doc) throw new Error('no document');
-        const html = doc.documentElement?.outerHTML || '';
-        cleanup();
-        resolve(html);
-      } catch (e) {
-        cleanup();
-        reject(e);
+        doc = iframe.contentDocument;
+      } catch {
+        // cross-origin
       }
+      if (doc?.URL === 'about:blank') return; // the initial / reset document; the listing is still loading
+      if (doc) finish(null, doc);
+      else finish(new Error('no document'));
+    }
+    function onError() {
+      finish(new Error('iframe error'));
     }
-    function onError(ev: any) {
-      cleanup();
-      reject(new Error('iframe error'));
+    function onAbort() {
+      finish(abortReason(signal!));
     }
-    iframe.addEventListener('load', onLoad, { once: true });
-    iframe.addEventListener('error', onError, { once: true });
-    iframe.src = url;
+    iframe.addEventListener('load', onLoad);
+    iframe.addEventListener('error', onError);
+    signal?.addEventListener('abort', onAbort, { once: true });
+    // replace() keeps reused frames out of the host page's session history
+    const win = frame.navigated ? iframe.contentWindow : null;
+    frame.navigated = true;
+    if (win) win.location.replace(url);
+    else iframe.src = url;
   });
 }
+
+function documentBytes(iframe: HTMLIFrameElement): number {
+  try {
+    const nav = iframe.contentWindow?.performance.getEntriesByType('navigation')[0] as PerformanceNavigationTiming | undefined;
+    return nav?.decodedBodySize ?? 0;
+  } catch {
+    return 0;
+  }
+}
+
+let sharedPool: IframePool | null = null;
+
+// One pool per document, grown to the largest size any call asked for.
+export function iframePool(size: number): IframePool {
+  if (!sharedPool || sharedPool.doc !== document) sharedPool = new IframePool(size, document);
+  sharedPool.size = Math.max(sharedPool.size, size);
+  return sharedPool;
+}
+
+// Removes the pooled iframes (frames still loading go when their load ends). The next iframe load starts a new pool.
+export function releaseIframes(): void {
+  sharedPool?.close();
+  sharedPool = null;
+}
+
+// Loads a listing in a pooled iframe (options.iframeConcurrency frames at most). signal: the load's own signal
+// (a walk's or a handle's, see DirectoryLoader.load), not options.signal; aborting it frees the frame or the
+// place in the queue for one.
+export function iframeDirectoryDocument(url: string, opts: NormalizedOptions, stats: { iframes: number }, signal: AbortSignal | undefined): Promise<IframeListing> {
+  if (typeof document === 'undefined') {
+    return Promise.reject(new Error('iframe mode not supported in this environment'));
+  }
+  const pool = iframePool(opts.iframeConcurrency);
+  stats.iframes++;
+  return pool.load(url, opts.timeoutMs, signal);
+}
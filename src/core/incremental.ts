@@ -0,0 +1,74 @@
+import { FileEntry, FolderApiDiff, FolderApiSnapshot, FolderEntry, ListingCacheStore, PreviousCrawl, PreviousListing } from '../types.js';
+import { normalizeDirectoryUrl } from '../utils/url.js';
+
+// Rebuilds each previously listed directory's entries from the flat arrays (entries are grouped by URL parent).
+// Only directories recorded in `previous.directories` were actually listed; anything else is unknown.
+export function indexPrevious(previous: FolderApiSnapshot): PreviousCrawl {
+  const listings = new Map<string, PreviousListing>();
+  for (const [url, validators] of Object.entries(previous.directories ?? {})) {
+    listings.set(normalizeDirectoryUrl(url), { date: null, validators, parsed: { folders: [], files: [], errors: [] } });
+  }
+  const start = normalizeDirectoryUrl(previous.url);
+  for (const f of previous.folders) {
+    if (f.role === 'self') continue;
+    if (f.role === 'child') {
+      const own = listings.get(normalizeDirectoryUrl(f.url));
+      if (own) own.date = f.date;
+    }
+    // root / parent entries only ever come from the start directory's listing
+    const dir = f.role === 'child' ? normalizeDirectoryUrl(new URL('../', f.url).toString()) : start;
+    listings.get(dir)?.parsed.folders.push(f);
+  }
+  for (const fi of previous.files) {
+    listings.get(normalizeDirectoryUrl(new URL('./', fi.url).toString()))?.parsed.files.push(fi);
+  }
+  return { listings, folders: previous.folders, files: previous.files };
+}
+
+// Serves previous listings (with their validators) as revalidation candidates behind an optional real cache.
+export function previousListingStore(previous: PreviousCrawl, variant: string, primary: ListingCacheStore | null): ListingCacheStore {
+  return {
+    async get(key) {
+      try {
+        const hit = primary ? await primary.get(key) : undefined;
+        if (hit) return hit;
+      } catch {
+        // fall through to the previous result
+      }
+      const listing = previous.listings.get(key);
+      if (!listing || (!listing.validators.etag && !listing.validators.lastModified)) return undefined;
+      return { ...listing.validators, variant, parsed: listing.parsed, bytes: 0 };
+    },
+    set: (key, value) => primary?.set(key, value),
+    delete: key => primary?.delete(key)
+  };
+}
+
+// Entries are matched by kind + url; a match whose date or size differs is modified.
+// Structural folders (self / root / parent) are not part of the diff.
+export function diffEntries(previous: PreviousCrawl, folders: FolderEntry[], files: FileEntry[], reusedDirectories: number): FolderApiDiff {
+  const before = new Map<string, FolderEntry | FileEntry>();
+  for (const e of diffable(previous.folders, previous.files)) before.set(entryKey(e), e);
+  const added: Array<FolderEntry | FileEntry> = [];
+  const modified: FolderApiDiff['modified'] = [];
+  for (const e of diffable(folders, files)) {
+    const key = entryKey(e);
+    const old = before.get(key);
+    if (!old) {
+      added.push(e);
+      continue;
+    }
+    before.delete(key);
+    if (old.date !== e.date || old.size !== e.size) modified.push({ before: old, after: e });
+  }
+  return { added, removed: [...before.values()], modified, reusedDirectories };
+}
+
+function* diffable(folders: FolderEntry[], files: FileEntry[]): Generator<FolderEntry | FileEntry> {
+  for (const f of folders) if (f.role === 'child') yield f;
+  yield* files;
+}
+
+function entryKey(e: FolderEntry | FileEntry): string {
+  return `${e.kind} ${e.url}`;
+}
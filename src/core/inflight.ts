@@ -0,0 +1,90 @@
+import { abortReason } from '../utils/abort.js';
+
+interface Inflight<T> {
+  promise: Promise<T>;
+  controller: AbortController; // handed to the load
+  waiters: number; // callers with a signal still waiting
+  pinned: boolean; // a caller without a signal joined: never aborted for cancellation
+  settled: boolean;
+}
+
+// Loads keyed by e.g. directory URL: a caller asking for a key that is already loading shares its promise.
+// The load runs under its own AbortSignal, aborted once every caller that passed a signal has aborted (a
+// caller without one keeps it alive). Settled loads are dropped, or with `retain` kept until delete().
+// Failed loads are always dropped so the next caller retries.
+export class InflightLoads<T> {
+  private readonly entries = new Map<string, Inflight<T>>();
+
+  constructor(private readonly retain = false) {}
+
+  get size(): number { return this.entries.size; }
+
+  has(key: string): boolean {
+    return this.entries.has(key);
+  }
+
+  delete(key: string) {
+    this.entries.delete(key);
+  }
+
+  // joined: the load was already running (or retained) for another caller.
+  run(key: string, signal: AbortSignal | undefined, start: (signal: AbortSignal) => Promise<T>): { promise: Promise<T>; joined: boolean } {
+    if (signal?.aborted) return { promise: Promise.reject(abortReason(signal)), joined: false };
+    let entry = this.entries.get(key);
+    const joined = entry != null;
+    if (!entry) {
+      const controller = new AbortController();
+      const created: Inflight<T> = { promise: start(controller.signal), controller, waiters: 0, pinned: false, settled: false };
+      created.promise.then(() => {
+        created.settled = true;
+        if (!this.retain) this.drop(key, created);
+      }, () => {
+        created.settled = true;
+        this.drop(key, created);
+      });
+      this.entries.set(key, entry = created);
+    }
+    return { promise: this.join(key, entry, signal), joined };
+  }
+
+  abortAll() {
+    for (const entry of this.entries.values()) if (!entry.settled) entry.controller.abort();
+    this.entries.clear();
+  }
+
+  private join(key: string, entry: Inflight<T>, signal: AbortSignal | undefined): Promise<T> {
+    if (!signal) {
+      entry.pinned = true;
+      return entry.promise;
+    }
+    entry.waiters++;
+    return new Promise<T>((resolve, reject) => {
+      const leave = () => {
+        signal.removeEventListener('abort', onAbort);
+        entry.waiters--;
+      };
+      const onAbort = () => {
+        leave();
+        if (entry.waiters === 0 && !entry.pinned && !entry.settled) {
+          entry.controller.abort(abortReason(signal));
+          this.drop(key, entry);
+        }
+        reject(abortReason(signal));
+      };
+      signal.addEventListener('abort', onAbort, { once: true });
+      entry.promise.then(value => {
+        if (signal.aborted) return;
+        leave();
+        resolve(value);
+      }, e => {
+        if (signal.aborted) return;
+        leave();
+        reject(e);
+      });
+    });
+  }
+
+  private drop(key: string, entry: Inflight<T>) {
+    if (this.entries.get(key) === entry) this.entries.delete(key);
+  }
+}
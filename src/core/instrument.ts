@@ -0,0 +1,159 @@
+import { FolderApiHooks, FolderApiTimings, InternalDirectoryParse, NormalizedOptions } from '../types.js';
+import { parseDirectoryHtml, ParsePhases } from './parseDirectory.js';
+import { parseJsonListing } from './parseJson.js';
+import type { ListingFormat } from './fetchDirectory.js';
+
+export interface FetchInfo {
+  bytes: number;
+  status: number | null;
+  notModified: boolean;
+}
+
+let crawlIds = 0;
+
+// Per-request timing collector; only created when hooks, timings or performance marks were requested,
+// so call sites pay a single null check otherwise.
+export class Instrumentation {
+  private networkMs = 0;
+  private parseMs = 0;
+  private documentMs = 0;
+  private heuristicsMs = 0;
+  private headMs = 0;
+  private bytes = 0;
+  private readonly directoryMs: number[] = [];
+  private readonly started = now();
+  private readonly prefix: string;
+
+  constructor(private readonly hooks: FolderApiHooks, private readonly marks: boolean, startUrl: string) {
+    this.prefix = `folder-api#${++crawlIds}`;
+    if (this.marks) mark(`${this.prefix} start ${startUrl}`);
+  }
+
+  directoryStart(url: string, depth: number): number {
+    call(this.hooks.onDirectoryStart, { url, depth });
+    return now();
+  }
+
+  directoryEnd(url: string, started: number) {
+    const end = now();
+    this.directoryMs.push(end - started);
+    if (this.marks) measure(`${this.prefix} directory ${url}`, started, end);
+  }
+
+  async timeFetch<T>(url: string, via: 'fetch' | 'iframe', run: () => Promise<T>, describe: (result: T) => FetchInfo): Promise<T> {
+    const started = now();
+    let info: FetchInfo = { bytes: 0, status: null, notModified: false };
+    try {
+      const result = await run();
+      info = describe(result);
+      return result;
+    } finally {
+      const end = now();
+      const ms = end - started;
+      this.networkMs += ms;
+      this.bytes += info.bytes;
+      if (this.marks) measure(`${this.prefix} ${via} ${url}`, started, end);
+      call(this.hooks.onFetchEnd, { url, via, ms, ...info });
+    }
+  }
+
+  parse(url: string, html: string | Document, opts: NormalizedOptions, format: ListingFormat = 'html'): InternalDirectoryParse {
+    const started = now();
+    const phases: ParsePhases = { documentMs: 0, heuristicsMs: 0 };
+    const parsed = format === 'json' ? parseJsonListing(url, html as string, opts, phases) : parseDirectoryHtml(url, html, opts, phases);
+    return this.parsed(url, started, phases, parsed);
+  }
+
+  // Worker parses: ms includes the round trip, the phases are the worker's.
+  async parseAsync(url: string, run: (phases: ParsePhases) => Promise<InternalDirectoryParse>): Promise<InternalDirectoryParse> {
+    const started = now();
+    const phases: ParsePhases = { documentMs: 0, heuristicsMs: 0 };
+    return this.parsed(url, started, phases, await run(phases));
+  }
+
+  private parsed(url: string, started: number, phases: ParsePhases, parsed: InternalDirectoryParse): InternalDirectoryParse {
+    const end = now();
+    const ms = end - started;
+    this.parseMs += ms;
+    this.documentMs += phases.documentMs;
+    this.heuristicsMs += phases.heuristicsMs;
+    if (this.marks) measure(`${this.prefix} parse ${url}`, started, end);
+    call(this.hooks.onParseEnd, { url, ms, ...phases, folders: parsed.folders.length, files: parsed.files.length });
+    return parsed;
+  }
+
+  async timeHead(url: string, run: () => Promise<number>): Promise<number> {
+    const started = now();
+    let status: number | null = null;
+    try {
+      status = await run();
+      return status;
+    } finally {
+      const end = now();
+      const ms = end - started;
+      this.headMs += ms;
+      if (this.marks) measure(`${this.prefix} head ${url}`, started, end);
+      call(this.hooks.onHeadEnd, { url, ms, status });
+    }
+  }
+
+  finish(): FolderApiTimings {
+    if (this.marks) measure(`${this.prefix} crawl`, this.started, now());
+    const sorted = [...this.directoryMs].sort((a, b) => a - b);
+    return {
+      networkMs: this.networkMs,
+      parseMs: this.parseMs,
+      documentMs: this.documentMs,
+      heuristicsMs: this.heuristicsMs,
+      headMs: this.headMs,
+      bytes: this.bytes,
+      directories: {
+        count: sorted.length,
+        p50Ms: percentile(sorted, 0.5),
+        p95Ms: percentile(sorted, 0.95),
+        maxMs: sorted.length ? sorted[sorted.length - 1] : 0
+      }
+    };
+  }
+}
+
+export function createInstrumentation(opts: NormalizedOptions, startUrl: string): Instrumentation | null {
+  if (!opts.hooks && !opts.timings && !opts.performanceMarks) return null;
+  return new Instrumentation(opts.hooks ?? {}, opts.performanceMarks, startUrl);
+}
+
+// Nearest-rank percentile over an ascending array.
+function percentile(sorted: number[], p: number): number {
+  if (sorted.length === 0) return 0;
+  return sorted[Math.min(sorted.length - 1, Math.ceil(p * sorted.length) - 1)];
+}
+
+// A throwing hook must not break the crawl.
+function call<E>(hook: ((event: E) => void) | undefined, event: E) {
+  if (!hook) return;
+  try {
+    hook(event);
+  } catch {
+    // ignore
+  }
+}
+
+function now(): number {
+  return performance.now?.() ?? Date.now();
+}
+
+function mark(name: string) {
+  try {
+    performance.mark?.(name);
+  } catch {
+    // User Timing unavailable
+  }
+}
+
+function measure(name: string, start: number, end: number) {
+  try {
+    performance.measure?.(name, { start, end });
+  } catch {
+    // User Timing L3 (start / end options) unavailable
+  }
+}
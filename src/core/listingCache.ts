@@ -0,0 +1,130 @@
+import { CachedListing, InternalDirectoryParse, ListingCacheLimits, ListingCacheStore, ListingValidators, NormalizedOptions } from '../types.js';
+import { describeResponse, fetchDirectoryResponse, ListingFormat, ListingTruncation } from './fetchDirectory.js';
+import { Instrumentation } from './instrument.js';
+import { parseListing } from './parseWorkers.js';
+import { normalizeDirectoryUrl } from '../utils/url.js';
+
+// In-memory LRU: Map insertion order is recency order (get re-inserts).
+export class MemoryListingCache implements ListingCacheStore {
+  private readonly entries = new Map<string, CachedListing>();
+  private totalBytes = 0;
+  readonly maxEntries: number;
+  readonly maxBytes: number;
+
+  constructor(limits?: ListingCacheLimits) {
+    this.maxEntries = Math.max(1, limits?.maxEntries ?? 500);
+    this.maxBytes = Math.max(1, limits?.maxBytes ?? 32 * 1024 * 1024);
+  }
+
+  get size(): number { return this.entries.size; }
+  get bytes(): number { return this.totalBytes; }
+
+  get(key: string): CachedListing | undefined {
+    const value = this.entries.get(key);
+    if (value) {
+      this.entries.delete(key);
+      this.entries.set(key, value);
+    }
+    return value;
+  }
+
+  set(key: string, value: CachedListing): void {
+    this.delete(key);
+    if (value.bytes > this.maxBytes) return; // would evict everything else and still not fit
+    this.entries.set(key, value);
+    this.totalBytes += value.bytes;
+    for (const [oldest, entry] of this.entries) {
+      if (this.entries.size <= this.maxEntries && this.totalBytes <= this.maxBytes) break;
+      this.entries.delete(oldest);
+      this.totalBytes -= entry.bytes;
+    }
+  }
+
+  delete(key: string): void {
+    const existing = this.entries.get(key);
+    if (!existing) return;
+    this.entries.delete(key);
+    this.totalBytes -= existing.bytes;
+  }
+
+  clear(): void {
+    this.entries.clear();
+    this.totalBytes = 0;
+  }
+}
+
+let sharedCache: MemoryListingCache | null = null;
+
+// Store used for `cache: true`; shared by every call in this realm.
+export function defaultListingCache(): MemoryListingCache {
+  if (!sharedCache) sharedCache = new MemoryListingCache();
+  return sharedCache;
+}
+
+// Rough UTF-16 footprint of the strings plus a fixed per-entry overhead; cheap enough to run per listing.
+export function estimateListingBytes(parsed: InternalDirectoryParse): number {
+  let bytes = 64;
+  for (const list of [parsed.folders, parsed.files]) {
+    for (const e of list) {
+      bytes += 96 + 2 * (e.url.length + (e.name?.length ?? 0) + (e.rawName?.length ?? 0) + (e.date?.length ?? 0));
+    }
+  }
+  for (const err of parsed.errors) bytes += 2 * err.length;
+  return bytes;
+}
+
+// Parsing depends on these options, so entries produced under different settings are not reused.
+export function cacheVariant(opts: NormalizedOptions): string {
+  const origins = opts.sameOriginOnly ? 'same-origin' : 'any-origin';
+  return opts.preferJson ? `${origins} json` : origins;
+}
+
+export interface CachedListingResult {
+  parsed: InternalDirectoryParse;
+  validators: ListingValidators; // of the response (or the stored entry on 304)
+  notModified: boolean;
+  format: ListingFormat | null; // of the downloaded listing; null on 304
+  truncated: ListingTruncation | null; // see ListingResponse.truncated
+}
+
+// Conditional GET against the cached validators; a 304 returns the stored parse without downloading or parsing.
+// Store failures degrade to an uncached fetch.
+export async function fetchCachedListing(
+  url: string,
+  opts: NormalizedOptions,
+  store: ListingCacheStore,
+  stats: { fetches: number; cacheHits: number; cacheMisses: number },
+  instrument: Instrumentation | null = null,
+  json = opts.preferJson
+): Promise<CachedListingResult> {
+  const key = normalizeDirectoryUrl(url);
+  const variant = cacheVariant(opts);
+  let cached: CachedListing | undefined;
+  try {
+    cached = await store.get(key);
+  } catch {
+    cached = undefined;
+  }
+  if (cached && cached.variant !== variant) cached = undefined;
+  const res = instrument
+    ? await instrument.timeFetch(url, 'fetch', () => fetchDirectoryResponse(url, opts, stats, cached, json), describeResponse)
+    : await fetchDirectoryResponse(url, opts, stats, cached, json);
+  const validators = { etag: res.etag, lastModified: res.lastModified };
+  if (res.html == null && cached) {
+    stats.cacheHits++;
+    return { parsed: cached.parsed, validators, notModified: true, format: null, truncated: null };
+  }
+  stats.cacheMisses++;
+  const parsed = await parseListing(url, res.html!, opts, instrument, res.format ?? 'html');
+  try {
+    // a partial listing would answer later 304s with the same partial entries
+    if ((res.etag || res.lastModified) && !res.truncated) {
+      await store.set(key, { etag: res.etag, lastModified: res.lastModified, variant, parsed, bytes: estimateListingBytes(parsed) });
+    } else if (cached) {
+      await store.delete(key);
+    }
+  } catch {
+    // cache is best effort
+  }
+  return { parsed, validators, notModified: false, format: res.format, truncated: res.truncated };
+}
@@ -1,32 +1,77 @@
 import { FileEntry, NormalizedOptions } from '../types.js';
-import { Semaphore } from '../utils/semaphore.js';
-import { pushError } from '../utils/errors.js';
+import { OverloadError, RequestScheduler, parseRetryAfter } from '../utils/scheduler.js';
+import { pushError, timeoutError } from '../utils/errors.js';
+import { inferMime } from '../utils/mimeTypes.js';
+import { Instrumentation } from './instrument.js';
+import { linkSignal } from '../utils/abort.js';
 
-export async function enrichMime(files: FileEntry[], opts: NormalizedOptions, stats: { heads: number }, errors: string[]) {
+// HEADs go through the shared scheduler, so they interleave with listing loads under one per-origin budget.
+// Aborting opts.signal drops queued HEADs and cancels the ones in flight; the files keep what they had.
+export async function enrichMime(files: FileEntry[], opts: NormalizedOptions, stats: { heads: number; headsAvoided: number }, errors: string[], scheduler: RequestScheduler, instrument: Instrumentation | null = null) {
   if (!opts.includeMime || files.length === 0) return;
-  const sem = new Semaphore(opts.headConcurrency);
-  await Promise.all(files.map(async f => {
-    const release = await sem.acquire();
+  const needHead = selectHeadTargets(files, opts);
+  stats.headsAvoided += files.length - needHead.length;
+  await Promise.all(needHead.map(async f => {
     try {
-      const controller = new AbortController();
-      const timer = setTimeout(() => controller.abort(), opts.timeoutMs);
-      const res = await fetch(f.url, { method: 'HEAD', signal: controller.signal });
-      stats.heads++;
-      clearTimeout(timer);
-      if (res.ok) {
-        if (!f.mime) f.mime = res.headers.get('content-type');
-        const len = res.headers.get('content-length');
-        if (len && !f.size) {
-          const n = Number(len);
-          if (!isNaN(n)) f.size = n;
-        }
-      } else if (res.status === 405 || res.status === 501) {
-        pushError(errors, 'mime', 'HEAD not supported');
-      }
+      await scheduler.run(f.url, 'head', instrument
+        ? () => instrument.timeHead(f.url, () => headOnce(f, opts, stats, errors))
+        : () => headOnce(f, opts, stats, errors), opts.signal);
     } catch (e: any) {
-      pushError(errors, 'mime', `failed HEAD for ${f.url}`);
-    } finally {
-      release();
+      if (!opts.signal?.aborted) pushError(errors, 'mime', `failed HEAD for ${f.url}`);
     }
   }));
 }
+
+// One HEAD attempt; 429 / 503 throw OverloadError so the scheduler backs off and retries. A timeout is not retried.
+async function headOnce(f: FileEntry, opts: NormalizedOptions, stats: { heads: number }, errors: string[]): Promise<number> {
+  const controller = new AbortController();
+  let timedOut = false;
+  const timer = setTimeout(() => {
+    timedOut = true;
+    controller.abort();
+  }, opts.timeoutMs);
+  const unlink = linkSignal(opts.signal, controller);
+  try {
+    let res: Response;
+    try {
+      res = await fetch(f.url, { method: 'HEAD', signal: controller.signal });
+    } catch (e) {
+      if (timedOut) throw timeoutError();
+      throw e;
+    }
+    stats.heads++;
+    if (res.status === 429 || res.status === 503) {
+      throw new OverloadError(`http ${res.status}`, parseRetryAfter(res.headers.get('retry-after')));
+    }
+    if (res.ok) {
+      if (!f.mime) f.mime = res.headers.get('content-type');
+      const len = res.headers.get('content-length');
+      if (len && !f.size) {
+        const n = Number(len);
+        if (!isNaN(n)) f.size = n;
+      }
+    } else if (res.status === 405 || res.status === 501) {
+      pushError(errors, 'mime', 'HEAD not supported');
+    }
+    return res.status;
+  } finally {
+    clearTimeout(timer);
+    unlink();
+  }
+}
+
+// Applies mimeStrategy: inferred types are assigned in place (null when the extension is unknown);
+// returns the files that still need a HEAD. Files that already carry a mime (reused results) are skipped.
+function selectHeadTargets(files: FileEntry[], opts: NormalizedOptions): FileEntry[] {
+  const out: FileEntry[] = [];
+  for (const f of files) {
+    if (f.mime !== undefined) continue;
+    if (opts.mimeStrategy !== 'head') {
+      f.mime = inferMime(f.name, opts.mimeTypes);
+      if (opts.mimeStrategy === 'infer') continue;
+      if (f.mime && f.size != null) continue; // infer-then-head: known type and size
+    }
+    out.push(f);
+  }
+  return out;
+}
@@ -1,14 +1,35 @@
-import { InternalDirectoryParse, NormalizedOptions } from '../types.js';
+import { InternalDirectoryParse, ListingAnchor, NormalizedOptions } from '../types.js';
 import { classifyEntry, detectHidden } from '../utils/classify.js';
-import { parseDateMeta } from '../utils/date.js';
-import { parseSizeMeta } from '../utils/size.js';
 import { safeDecodeURIComponent } from '../utils/decode.js';
 import { pushError } from '../utils/errors.js';
+import { parseRowMeta } from './rowSchema.js';
+import { tokenizeListingAnchors } from './tokenizeDirectory.js';
 
-export function parseDirectoryHtml(baseUrl: string, html: string, opts: NormalizedOptions): InternalDirectoryParse {
-  const errors: string[] = [];
-  const parser = new DOMParser();
-  const doc = parser.parseFromString(html, 'text/html');
+// Time split of one parse, filled only when requested (instrumentation).
+export interface ParsePhases {
+  documentMs: number; // building the anchor list (DOMParser / tokenizer)
+  heuristicsMs: number; // metadata text, classification, date / size parsing
+}
+
+// `html` may also be a Document that is already loaded (an iframe listing); it is read in place with the DOM
+// engine instead of being serialized and parsed again.
+export function parseDirectoryHtml(baseUrl: string, html: string | Document, opts: NormalizedOptions, phases?: ParsePhases): InternalDirectoryParse {
+  const useTokenizer = typeof html === 'string' && (opts.parser === 'tokenizer' || (opts.parser === 'auto' && typeof DOMParser === 'undefined'));
+  if (!phases) {
+    const anchors = useTokenizer ? tokenizeListingAnchors(html as string) : domListingAnchors(html);
+    return entriesFromAnchors(baseUrl, anchors, opts);
+  }
+  const t0 = performance.now();
+  const anchors = useTokenizer ? tokenizeListingAnchors(html as string) : domListingAnchors(html);
+  const t1 = performance.now();
+  const parsed = entriesFromAnchors(baseUrl, anchors, opts);
+  phases.documentMs += t1 - t0;
+  phases.heuristicsMs += performance.now() - t1;
+  return parsed;
+}
+
+function domListingAnchors(html: string | Document): ListingAnchor[] {
+  const doc = typeof html === 'string' ? new DOMParser().parseFromString(html, 'text/html') : html;
   const anchorSets: HTMLAnchorElement[] = [];
   // Candidate anchor selection heuristics
   const selectors = ['pre a[href]', 'table a[href]', 'ul a[href]', 'ol a[href]'];
@@ -20,61 +41,59 @@ export function parseDirectoryHtml(baseUrl: string, html: string, opts: Normaliz
     const all = Array.from(doc.querySelectorAll('a[href]')) as HTMLAnchorElement[];
     for (const a of all) anchorSets.push(a);
   }
-  const unique = dedupeAnchors(anchorSets);
-  const folders: any[] = [];
-  const files: any[] = [];
+  const preLines = new Map<Element, Map<Element, string>>();
+  return anchorSets.map(a => ({ href: a.getAttribute('href')!, metadata: () => deriveMetadataText(a, preLines) }));
+}
+
+// Shared by both parser engines: anchors (in candidate order) -> folder / file entries.
+function entriesFromAnchors(baseUrl: string, anchors: ListingAnchor[], opts: NormalizedOptions): InternalDirectoryParse {
+  const errors: string[] = [];
+  const unique = dedupeAnchors(anchors);
+  const base = new URL(baseUrl);
+  const rows: Array<{ kind: 'folder' | 'file'; url: string; rawName: string; name: string; hidden: boolean }> = [];
+  const texts: string[] = [];
   for (const a of unique) {
-    const resolved = new URL(a.getAttribute('href')!, baseUrl).toString();
-    if (!acceptHref(resolved, baseUrl, opts)) continue;
-    const metadataContext = deriveMetadataText(a).trim();
+    const url = new URL(a.href, base);
+    const resolved = url.toString();
+    if (!acceptHref(resolved, url, base, opts)) continue;
+    const metadataContext = a.metadata().trim();
     const kind = classifyEntry(resolved, metadataContext);
-    const segRaw = lastPathSegmentRaw(resolved);
+    if (kind !== 'folder' && kind !== 'file') continue;
+    const segRaw = lastPathSegmentRaw(url);
     const nameDecoded = safeDecodeURIComponent(segRaw, errors);
-    const hidden = detectHidden(nameDecoded);
-    const date = parseDateMeta(metadataContext, errors);
-    const size = parseSizeMeta(metadataContext);
+    rows.push({ kind, url: kind === 'folder' ? normalizeFolderUrl(resolved) : resolved, rawName: segRaw, name: nameDecoded, hidden: detectHidden(nameDecoded) });
+    texts.push(metadataContext);
+  }
+  // Dates and sizes are read per listing, with one inferred row layout (core/rowSchema.ts).
+  const meta = parseRowMeta(texts, errors);
+  const folders: any[] = [];
+  const files: any[] = [];
+  rows.forEach(({ kind, url, rawName, name, hidden }, i) => {
+    const { date, size } = meta[i];
     if (kind === 'folder') {
-      folders.push({
-        kind: 'folder',
-        url: normalizeFolderUrl(resolved),
-        rawName: segRaw,
-        name: nameDecoded,
-        hidden,
-        size: null,
-        date,
-      });
-    } else if (kind === 'file') {
-      files.push({
-        kind: 'file',
-        url: resolved,
-        rawName: segRaw,
-        name: nameDecoded,
-        hidden,
-        size: size ?? null,
-        date,
-      });
+      folders.push({ kind, url, rawName, name, hidden, size: null, date });
+    } else {
+      files.push({ kind, url, rawName, name, hidden, size: size ?? null, date });
     }
-  }
+  });
   return { folders, files, errors };
 }
 
-function acceptHref(resolved: string, base: string, opts: NormalizedOptions): boolean {
+function acceptHref(resolved: string, url: URL, base: URL, opts: NormalizedOptions): boolean {
   if (/^javascript:/i.test(resolved)) return false;
   if (/^mailto:/i.test(resolved)) return false;
   if (/#[^#]*$/.test(resolved)) return false;
   if (opts.sameOriginOnly) {
-    const a = new URL(resolved);
-    const b = new URL(base);
-    if (a.origin !== b.origin) return false;
+    if (url.origin !== base.origin) return false;
   }
   return true;
 }
 
-function dedupeAnchors(as: HTMLAnchorElement[]): HTMLAnchorElement[] {
+function dedupeAnchors(as: ListingAnchor[]): ListingAnchor[] {
   const seen = new Set<string>();
-  const out: HTMLAnchorElement[] = [];
+  const out: ListingAnchor[] = [];
   for (const a of as) {
-    const h = a.getAttribute('href');
+    const h = a.href;
     if (!h) continue;
     if (seen.has(h)) continue;
     seen.add(h);
@@ -83,7 +102,7 @@ function dedupeAnchors(as: HTMLAnchorElement[]): HTMLAnchorElement[] {
   return out;
 }
 
-function deriveMetadataText(a: HTMLAnchorElement): string {
+function deriveMetadataText(a: HTMLAnchorElement, preLines: Map<Element, Map<Element, string>>): string {
   const tr = a.closest('tr');
   if (tr) {
     const cells = Array.from(tr.querySelectorAll('th,td'));
@@ -94,19 +113,48 @@ function deriveMetadataText(a: HTMLAnchorElement): string {
   if (li) return li.textContent || '';
   const pre = a.closest('pre');
   if (pre) {
-    // approximate: find line containing anchor text
-    const lines = pre.textContent?.split(/\n/) || [];
-    const at = a.textContent?.trim();
-    const line = lines.find(l => at && l.includes(at));
-    return line || a.textContent || '';
+    let lines = preLines.get(pre);
+    if (!lines) {
+      lines = indexPreLines(pre);
+      preLines.set(pre, lines);
+    }
+    return lines.get(a) || a.textContent || '';
   }
   return a.parentElement?.textContent || a.textContent || '';
 }
 
-function lastPathSegmentRaw(u: string): string {
-  const url = new URL(u);
+// One pass over a <pre>: maps every anchor inside it to the full text of the line it starts on.
+// <br> ends a line too (IIS emits all rows on one source line separated by <br>).
+function indexPreLines(pre: Element): Map<Element, string> {
+  const out = new Map<Element, string>();
+  let line = '';
+  let waiting: Element[] = [];
+  const endLine = () => {
+    for (const a of waiting) out.set(a, line);
+    waiting = [];
+    line = '';
+  };
+  const walker = pre.ownerDocument.createTreeWalker(pre, 5 /* SHOW_ELEMENT | SHOW_TEXT */);
+  for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+    if (node.nodeType === 3) {
+      const parts = (node.nodeValue || '').split('\n');
+      line += parts[0];
+      for (let i = 1; i < parts.length; i++) {
+        endLine();
+        line = parts[i];
+      }
+    } else if (node.nodeName === 'BR') {
+      endLine();
+    } else if (node.nodeName === 'A') {
+      waiting.push(node as Element);
+    }
+  }
+  endLine();
+  return out;
+}
+
+function lastPathSegmentRaw(url: URL): string {
   const parts = url.pathname.split('/').filter(Boolean);
-  if (u.endsWith('/') ) return parts[parts.length -1] || '';
   return parts[parts.length -1] || '';
 }
 
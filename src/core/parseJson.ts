@@ -0,0 +1,67 @@
+import { InternalDirectoryParse, NormalizedOptions } from '../types.js';
+import { detectHidden } from '../utils/classify.js';
+import { pushError } from '../utils/errors.js';
+import type { ParsePhases } from './parseDirectory.js';
+
+// Machine-readable listings (option preferJson), mapped to the same entries parseDirectoryHtml produces but
+// with exact byte sizes and timestamps:
+// - nginx `autoindex_format json`: [{ name, type: 'directory' | 'file' | 'other', mtime: RFC 1123, size? }]
+// - Caddy `file_server browse` (Accept: application/json): [{ name (folders end in '/'), size, url, mod_time: RFC 3339, is_dir }]
+// An object with an `items` array is accepted too. Anything else throws, like an unusable HTML response.
+export function parseJsonListing(baseUrl: string, text: string, opts: NormalizedOptions, phases?: ParsePhases): InternalDirectoryParse {
+  const t0 = phases ? performance.now() : 0;
+  let data: any;
+  try {
+    data = JSON.parse(text);
+  } catch {
+    throw new Error('invalid JSON listing');
+  }
+  const items: any[] | null = Array.isArray(data) ? data : Array.isArray(data?.items) ? data.items : null;
+  if (!items) throw new Error('unrecognized JSON listing');
+  const t1 = phases ? performance.now() : 0;
+  const base = new URL(baseUrl);
+  const errors: string[] = [];
+  const folders: InternalDirectoryParse['folders'] = [];
+  const files: InternalDirectoryParse['files'] = [];
+  const seen = new Set<string>();
+  for (const item of items) {
+    if (item == null || typeof item.name !== 'string' || item.type === 'other') continue;
+    const folder = item.type === 'directory' || item.is_dir === true || item.name.endsWith('/');
+    const name = folder ? item.name.replace(/\/+$/, '') : item.name;
+    if (!name || name === '.' || name === '..') continue;
+    const href = typeof item.url === 'string' && item.url ? item.url : encodeURIComponent(name) + (folder ? '/' : '');
+    let url: URL;
+    try {
+      url = new URL(href, base);
+    } catch {
+      continue;
+    }
+    if (opts.sameOriginOnly && url.origin !== base.origin) continue;
+    url.hash = '';
+    let resolved = url.toString();
+    if (folder && !resolved.endsWith('/')) resolved += '/';
+    if (seen.has(resolved)) continue;
+    seen.add(resolved);
+    const rawName = url.pathname.split('/').filter(Boolean).pop() ?? '';
+    const date = jsonDate(item.mtime ?? item.mod_time, errors);
+    const entry = { url: resolved, rawName, name, hidden: detectHidden(name), date };
+    if (folder) folders.push({ kind: 'folder', ...entry, size: null });
+    else files.push({ kind: 'file', ...entry, size: Number.isFinite(item.size) && item.size >= 0 ? item.size : null });
+  }
+  if (phases) {
+    phases.documentMs += t1 - t0;
+    phases.heuristicsMs += performance.now() - t1;
+  }
+  return { folders, files, errors };
+}
+
+function jsonDate(value: unknown, errors: string[]): string | null {
+  if (typeof value !== 'string' || !value) return null;
+  // RFC 3339 may carry nanoseconds; Date.parse only promises milliseconds
+  const ms = Date.parse(value.replace(/(\.\d{3})\d+/, '$1'));
+  if (Number.isNaN(ms)) {
+    pushError(errors, 'date', `unrecognized JSON listing date ${value}`);
+    return null;
+  }
+  return new Date(ms).toISOString();
+}
@@ -0,0 +1,21 @@
+import { handleParseMessage, ParseRequest, responseTransfer } from './parseWorkers.js';
+
+// Entry point of a parse worker (see parseWorkers.ts): a dedicated Web Worker or a Node worker_threads worker.
+declare const WorkerGlobalScope: unknown;
+
+const NODE_WORKERS = 'node:worker_threads';
+
+if (typeof WorkerGlobalScope !== 'undefined') {
+  const scope = self as any;
+  scope.onmessage = (ev: MessageEvent<ParseRequest>) => {
+    const res = handleParseMessage(ev.data);
+    scope.postMessage(res, responseTransfer(res));
+  };
+} else {
+  import(NODE_WORKERS).then(({ parentPort }) => {
+    parentPort?.on('message', (req: ParseRequest) => {
+      const res = handleParseMessage(req);
+      parentPort.postMessage(res, responseTransfer(res));
+    });
+  });
+}
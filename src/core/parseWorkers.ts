@@ -0,0 +1,302 @@
+import { InternalDirectoryParse, NormalizedOptions } from '../types.js';
+import { normalizeOptions } from '../options.js';
+import { Instrumentation } from './instrument.js';
+import { parseDirectoryHtml, ParsePhases } from './parseDirectory.js';
+import { parseJsonListing } from './parseJson.js';
+import type { ListingFormat } from './fetchDirectory.js';
+
+// Off-main-thread parsing (options.parseInWorker). Listing HTML is posted to a lazily grown pool of
+// module workers (Web Workers, or worker_threads under Node) running src/core/parseWorker.ts, which parse
+// with the tokenizer (no DOMParser in workers). The HTML crosses the thread boundary as one structured-clone
+// string copy; entries come back packed into columns (string arrays plus transferred typed arrays), which
+// the calling thread deserializes several times faster than an array of objects. Anything that prevents a worker parse (no worker
+// support, the worker script failing to load, a crashed or terminated worker) falls back to parsing on the
+// calling thread, so results never depend on whether a worker was used.
+
+// Only structured-clonable, parse-affecting fields cross into the worker.
+export interface ParseRequest {
+  id: number;
+  url: string;
+  html: string;
+  sameOriginOnly: boolean;
+}
+
+export interface ParseResponse {
+  id: number;
+  parsed?: PackedParse;
+  phases?: ParsePhases;
+  error?: string;
+}
+
+// Column-wise InternalDirectoryParse entries (every field parseDirectoryHtml emits); size NaN = null.
+export interface PackedEntries {
+  url: string[];
+  rawName: string[];
+  name: string[];
+  date: Array<string | null>;
+  hidden: Uint8Array;
+  size: Float64Array;
+}
+
+export interface PackedParse {
+  folders: PackedEntries;
+  files: PackedEntries;
+  errors: string[];
+}
+
+const workerOptions = new Map<boolean, NormalizedOptions>();
+
+// Runs inside the worker.
+export function handleParseMessage(req: ParseRequest): ParseResponse {
+  let opts = workerOptions.get(req.sameOriginOnly);
+  if (!opts) {
+    opts = normalizeOptions({ parser: 'tokenizer', sameOriginOnly: req.sameOriginOnly });
+    workerOptions.set(req.sameOriginOnly, opts);
+  }
+  try {
+    const phases: ParsePhases = { documentMs: 0, heuristicsMs: 0 };
+    const parsed = parseDirectoryHtml(req.url, req.html, opts, phases);
+    return { id: req.id, parsed: { folders: packEntries(parsed.folders), files: packEntries(parsed.files), errors: parsed.errors }, phases };
+  } catch (e: any) {
+    return { id: req.id, error: String(e?.message ?? e) };
+  }
+}
+
+// Typed-array buffers of a response, for the postMessage transfer list.
+export function responseTransfer(res: ParseResponse): ArrayBuffer[] {
+  if (!res.parsed) return [];
+  const { folders, files } = res.parsed;
+  return [folders.hidden.buffer, folders.size.buffer, files.hidden.buffer, files.size.buffer] as ArrayBuffer[];
+}
+
+function packEntries(entries: Array<InternalDirectoryParse['folders'][number] | InternalDirectoryParse['files'][number]>): PackedEntries {
+  const n = entries.length;
+  const packed: PackedEntries = { url: new Array(n), rawName: new Array(n), name: new Array(n), date: new Array(n), hidden: new Uint8Array(n), size: new Float64Array(n) };
+  for (let i = 0; i < n; i++) {
+    const e = entries[i];
+    packed.url[i] = e.url;
+    packed.rawName[i] = e.rawName ?? '';
+    packed.name[i] = e.name ?? '';
+    packed.date[i] = e.date ?? null;
+    packed.hidden[i] = e.hidden ? 1 : 0;
+    packed.size[i] = e.size ?? NaN;
+  }
+  return packed;
+}
+
+function unpackEntries<K extends 'folder' | 'file'>(kind: K, packed: PackedEntries) {
+  const out = new Array(packed.url.length);
+  for (let i = 0; i < out.length; i++) {
+    const size = packed.size[i];
+    out[i] = {
+      kind,
+      url: packed.url[i],
+      rawName: packed.rawName[i],
+      name: packed.name[i],
+      hidden: packed.hidden[i] === 1,
+      size: Number.isNaN(size) ? null : size,
+      date: packed.date[i]
+    };
+  }
+  return out;
+}
+
+export function unpackParse(packed: PackedParse): InternalDirectoryParse {
+  return { folders: unpackEntries('folder', packed.folders), files: unpackEntries('file', packed.files), errors: packed.errors };
+}
+
+interface ParseTask {
+  req: ParseRequest;
+  resolve(res: ParseResponse): void;
+  reject(error: Error): void;
+}
+
+interface PooledWorker {
+  post(req: ParseRequest): void;
+  terminate(): void;
+  task: ParseTask | null;
+  handled: number;
+}
+
+// Hidden from bundlers: only loaded under Node, where there is no global Worker.
+const NODE_WORKERS = 'node:worker_threads';
+
+function workerScript(): URL {
+  return new URL('./parseWorker.js', import.meta.url);
+}
+
+export class ParseWorkerPool {
+  private readonly workers: PooledWorker[] = [];
+  private readonly queue: ParseTask[] = [];
+  private nextId = 0;
+  broken = false; // set when a worker fails before answering once; callers then parse inline
+
+  constructor(public size: number) {}
+
+  get workerCount(): number {
+    return this.workers.length;
+  }
+
+  parse(url: string, html: string, sameOriginOnly: boolean): Promise<ParseResponse> {
+    if (this.broken) return Promise.reject(new Error('parse workers unavailable'));
+    return new Promise((resolve, reject) => {
+      this.queue.push({ req: { id: ++this.nextId, url, html, sameOriginOnly }, resolve, reject });
+      this.pump();
+    });
+  }
+
+  terminate() {
+    for (const w of this.workers.splice(0)) {
+      w.terminate();
+      w.task?.reject(new Error('parse worker terminated'));
+    }
+    for (const task of this.queue.splice(0)) task.reject(new Error('parse worker terminated'));
+  }
+
+  private pump() {
+    while (this.queue.length > 0) {
+      let worker = this.workers.find(w => !w.task);
+      if (!worker) {
+        if (this.workers.length >= this.size) return;
+        const spawned = this.spawn();
+        if (!spawned) {
+          this.fail(null, new Error('parse workers unavailable'));
+          return;
+        }
+        worker = spawned;
+      }
+      const task = this.queue.shift()!;
+      worker.task = task;
+      try {
+        worker.post(task.req);
+      } catch (e: any) {
+        this.fail(worker, e);
+      }
+    }
+  }
+
+  private spawn(): PooledWorker | null {
+    const pooled: PooledWorker = { post: () => {}, terminate: () => {}, task: null, handled: 0 };
+    const onMessage = (res: ParseResponse) => {
+      const task = pooled.task;
+      if (!task || task.req.id !== res.id) return;
+      pooled.task = null;
+      pooled.handled++;
+      task.resolve(res);
+      this.pump();
+    };
+    const onError = (error: any) => this.fail(pooled, error instanceof Error ? error : new Error(String(error?.message ?? error)));
+    try {
+      if (typeof (globalThis as any).Worker === 'function') {
+        const w = new (globalThis as any).Worker(workerScript(), { type: 'module' });
+        w.onmessage = (ev: MessageEvent) => onMessage(ev.data);
+        w.onerror = (ev: ErrorEvent) => {
+          ev.preventDefault?.();
+          onError(ev.error ?? ev.message ?? 'worker error');
+        };
+        pooled.post = req => w.postMessage(req);
+        pooled.terminate = () => w.terminate();
+      } else if ((globalThis as any).process?.versions?.node) {
+        // worker_threads loads asynchronously; posts wait for it. Idle workers are unref'd so they
+        // never keep the process alive.
+        let worker: any = null;
+        let terminated = false;
+        const ready = import(NODE_WORKERS).then(({ Worker }) => {
+          if (terminated) return;
+          worker = new Worker(workerScript());
+          worker.unref();
+          worker.on('message', (res: ParseResponse) => {
+            worker.unref();
+            onMessage(res);
+          });
+          worker.on('error', onError);
+          worker.on('exit', (code: number) => {
+            if (!terminated) onError(new Error(`parse worker exited (${code})`));
+          });
+        });
+        pooled.post = req => {
+          ready.then(() => {
+            if (!worker) return;
+            worker.ref();
+            worker.postMessage(req);
+          }).catch(onError);
+        };
+        pooled.terminate = () => {
+          terminated = true;
+          worker?.terminate();
+        };
+      } else {
+        return null;
+      }
+    } catch {
+      return null;
+    }
+    this.workers.push(pooled);
+    return pooled;
+  }
+
+  // A failing worker is dropped; its task (and, when workers cannot start at all, every queued task) is
+  // rejected so the caller parses inline.
+  private fail(worker: PooledWorker | null, error: Error) {
+    if (worker) {
+      const index = this.workers.indexOf(worker);
+      if (index < 0) return; // already failed / terminated
+      this.workers.splice(index, 1);
+      try {
+        worker.terminate();
+      } catch {
+        // already gone
+      }
+      worker.task?.reject(error);
+      worker.task = null;
+    }
+    if (!worker || worker.handled === 0) {
+      this.broken = true;
+      this.terminate();
+    } else {
+      this.pump();
+    }
+  }
+}
+
+let sharedPool: ParseWorkerPool | null = null;
+
+// One pool per realm, grown to the largest size any call asked for.
+export function parseWorkerPool(size: number): ParseWorkerPool | null {
+  if (!sharedPool) sharedPool = new ParseWorkerPool(size);
+  if (sharedPool.broken) return null;
+  sharedPool.size = Math.max(sharedPool.size, size);
+  return sharedPool;
+}
+
+// Stops every parse worker (in-flight parses finish on the calling thread). The next parseInWorker call starts a new pool.
+export function terminateParseWorkers(): void {
+  sharedPool?.terminate();
+  sharedPool = null;
+}
+
+// Parses a listing on a worker when options.parseInWorker is set (and the DOM engine was not forced), else inline.
+// A Document (iframe listing) is always parsed inline, before the promise is returned, and so is a JSON listing.
+export function parseListing(url: string, html: string | Document, opts: NormalizedOptions, instrument: Instrumentation | null, format: ListingFormat = 'html'): Promise<InternalDirectoryParse> {
+  if (format === 'json') return Promise.resolve(instrument ? instrument.parse(url, html, opts, 'json') : parseJsonListing(url, html as string, opts));
+  const pool = opts.parseInWorker > 0 && opts.parser !== 'dom' && typeof html === 'string' ? parseWorkerPool(opts.parseInWorker) : null;
+  if (!pool || typeof html !== 'string') return Promise.resolve(instrument ? instrument.parse(url, html, opts) : parseDirectoryHtml(url, html, opts));
+  const text = html;
+  const run = async (phases?: ParsePhases): Promise<InternalDirectoryParse> => {
+    try {
+      const res = await pool.parse(url, text, opts.sameOriginOnly);
+      if (res.parsed) {
+        if (phases && res.phases) {
+          phases.documentMs += res.phases.documentMs;
+          phases.heuristicsMs += res.phases.heuristicsMs;
+        }
+        return unpackParse(res.parsed);
+      }
+    } catch {
+      // worker unavailable or lost: parse here
+    }
+    // also rethrows a worker-side parse error the same way an inline parse would
+    return parseDirectoryHtml(url, text, opts, phases);
+  };
+  return instrument ? instrument.parseAsync(url, run) : run();
+}
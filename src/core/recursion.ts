@@ -1,89 +1,378 @@
-import { FolderNode, FolderEntry, FileEntry, NormalizedOptions } from '../types.js';
-import { fetchDirectoryHtml } from './fetchDirectory.js';
-import { iframeDirectoryHtml } from './iframeDirectory.js';
-import { parseDirectoryHtml } from './parseDirectory.js';
+import { FolderNode, FolderEntry, FolderRole, FileEntry, InternalDirectoryParse, ListingValidators, NormalizedOptions } from '../types.js';
+import { describeResponse, fetchDirectoryResponse, ListingFormat, ListingTruncation } from './fetchDirectory.js';
+import { iframeDirectoryDocument } from './iframeDirectory.js';
+import { Instrumentation } from './instrument.js';
+import { parseListing } from './parseWorkers.js';
+import { cacheVariant, fetchCachedListing } from './listingCache.js';
+import { previousListingStore } from './incremental.js';
 import { normalizeDirectoryUrl, keyForVisited, parentDirectory, rootDirectory } from '../utils/url.js';
 import { pushError } from '../utils/errors.js';
+import { OverloadError, RequestScheduler } from '../utils/scheduler.js';
+import { FolderApiSession, LoadedListing } from './session.js';
+import { abortReason, anySignal, CrawlScope } from '../utils/abort.js';
+import { relativeGlobPath } from '../utils/glob.js';
 
-interface RecursionState {
+export interface RecursionState {
   visited: Set<string>;
-  allFolders: FolderEntry[];
-  allFiles: FileEntry[];
+  allFolders: FolderEntry[]; // insertion-ordered output
+  allFiles: FileEntry[]; // insertion-ordered output
+  folderKeys: Set<string>; // folderKey(url, role) for every entry in allFolders
   errors: string[];
-  stats: { fetches: number; iframes: number; heads: number; };
+  pruned: number; // folders dropped by filters (skipHidden / globs / filter), never listed
+  stats: { fetches: number; iframes: number; heads: number; headsAvoided: number; cacheHits: number; cacheMisses: number; coalesced: number; };
+  directories: Record<string, ListingValidators>; // every loaded listing
+  reusedDirectories: number; // listings taken from a cache / previous result instead of parsed
   safetyCount: number;
   maxDepthEncountered: number;
+  session: FolderApiSession; // options.session, else one for this request only
+  scheduler: RequestScheduler; // session.scheduler: shared by listing loads and HEADs
+  instrument: Instrumentation | null; // null unless hooks / timings / performance marks were requested
+  scope: CrawlScope | null; // totalTimeoutMs: once expired, walk() stops instead of failing
 }
 
-export async function traverse(startUrl: string, opts: NormalizedOptions, state: RecursionState): Promise<FolderNode> {
+export function createRecursionState(opts: NormalizedOptions, instrument: Instrumentation | null = null, scope: CrawlScope | null = null): RecursionState {
+  const session = opts.session ?? new FolderApiSession({
+    originConcurrency: opts.originConcurrency,
+    directoryConcurrency: opts.directoryConcurrency,
+    headConcurrency: opts.headConcurrency,
+    adaptiveConcurrency: opts.adaptiveConcurrency,
+    retries: opts.retries
+  });
+  return {
+    visited: new Set<string>(),
+    allFolders: [],
+    allFiles: [],
+    folderKeys: new Set<string>(),
+    errors: [],
+    pruned: 0,
+    stats: { fetches: 0, iframes: 0, heads: 0, headsAvoided: 0, cacheHits: 0, cacheMisses: 0, coalesced: 0 },
+    directories: {},
+    reusedDirectories: 0,
+    safetyCount: 0,
+    maxDepthEncountered: 0,
+    session,
+    scheduler: session.scheduler,
+    instrument,
+    scope
+  };
+}
+
+// Per-directory output of walk(): the listing's entries with roles/depth assigned.
+export interface DirectoryBatch {
+  directory: FolderEntry; // the directory that was listed (same object as in its parent's batch.folders)
+  depth: number; // traversal depth of `directory` (0 = start)
+  folders: FolderEntry[]; // listing folders, plus synthesized root/parent entries for the start directory
+  files: FileEntry[];
+}
+
+// Subset of RecursionState the walk itself needs; output arrays are owned by the consumer.
+export type WalkState = Pick<RecursionState, 'visited' | 'errors' | 'pruned' | 'stats' | 'directories' | 'reusedDirectories' | 'safetyCount' | 'maxDepthEncountered' | 'session' | 'scheduler' | 'instrument' | 'scope'>;
+
+// Normalizes the start URL and claims it in `visited`; returns null (and records a loop error) when already claimed.
+export function claimStart(startUrl: string, state: WalkState): FolderNode | null {
   const normalized = normalizeDirectoryUrl(startUrl);
   const u = new URL(normalized);
   const key = keyForVisited(u);
   if (state.visited.has(key)) {
     pushError(state.errors, 'loop', `already visited ${normalized}`);
-    return createEmptyNode(normalized, u, 0, 'self');
+    return null;
   }
   state.visited.add(key);
-  const rootDir = rootDirectory(u);
-  const parentDir = parentDirectory(u);
+  return createEmptyNode(normalized, u, 0, 'self');
+}
 
-  const node: FolderNode = createEmptyNode(normalized, u, 0, 'self');
-  state.allFolders.push(node);
+// onBatch sees each directory's new files as soon as they are collected (used to pipeline HEAD enrichment).
+export async function traverse(startUrl: string, opts: NormalizedOptions, state: RecursionState, onBatch?: (files: FileEntry[]) => void): Promise<FolderNode> {
+  const node = claimStart(startUrl, state);
+  if (!node) {
+    const normalized = normalizeDirectoryUrl(startUrl);
+    return createEmptyNode(normalized, new URL(normalized), 0, 'self');
+  }
+  addFolder(state, node);
+  // walk() hands out entries; the tree holds copies, keyed back to the entry the walk will later list.
+  const childNodes = new Map<FolderEntry, FolderNode>();
+  for await (const batch of walk(node, opts, state)) {
+    const current = batch.directory === node ? node : childNodes.get(batch.directory)!;
+    childNodes.delete(batch.directory);
+    for (const folderEntry of batch.folders) {
+      if (!state.folderKeys.has(folderKey(folderEntry.url, folderEntry.role))) {
+        addFolder(state, folderEntry);
+      }
+      if (folderEntry.role === 'child') {
+        const childNode: FolderNode = { ...folderEntry, children: [], files: [] };
+        current.children.push(childNode);
+        childNodes.set(folderEntry, childNode);
+      }
+    }
+    for (const fileEntry of batch.files) {
+      state.allFiles.push(fileEntry);
+      current.files.push(fileEntry);
+    }
+    onBatch?.(batch.files);
+  }
+  return node;
+}
 
-  async function loadDirectory(current: FolderNode) {
+// Depth-first walk yielding one batch per loaded directory, in the same order a sequential crawl loads them.
+// Prefetching (directoryConcurrency > 1) only schedules new listings while the consumer is pulling.
+// Once maxResults files were yielded (or the consumer stops early) outstanding loads are cancelled.
+export async function* walk(start: FolderEntry, opts: NormalizedOptions, state: WalkState): AsyncGenerator<DirectoryBatch> {
+  const loader = createDirectoryLoader(start, opts, state);
+  const stop = new AbortController();
+  const signal = anySignal(opts.signal, stop.signal);
+  let remaining = opts.maxResults;
+
+  // Listings are fetched + parsed through this map so a directory requested ahead of time
+  // (prefetch) and later claimed by the depth-first walk is only loaded once.
+  const listings = new Map<string, Promise<InternalDirectoryParse>>();
+  let suspended = false;
+  const deferred: Array<() => void> = [];
+
+  function scheduleListing(url: string, depth: number, date: string | null): Promise<InternalDirectoryParse> {
+    const listingKey = keyForVisited(new URL(url));
+    let pending = listings.get(listingKey);
+    if (!pending) {
+      pending = loader.load(url, depth, date, signal);
+      listings.set(listingKey, pending);
+      // Failures are surfaced when the walk awaits this listing; swallow here to avoid unhandled rejections
+      // (a prefetched listing the walk stops before claiming is only ever aborted).
+      pending.then(parsed => {
+        if (opts.directoryConcurrency <= 1 || depth >= opts.maxDepth) return;
+        if (suspended) deferred.push(() => prefetchChildren(url, parsed, depth));
+        else prefetchChildren(url, parsed, depth);
+      }, () => {});
+    }
+    return pending;
+  }
+
+  // Only folders directly inside the listing are prefetched. One linked from elsewhere (an absolute link into
+  // another branch) is reached by the walk through its own parent, at another depth, and skipped here as
+  // visited; loading it ahead of time would also prefetch children the walk may never list.
+  function prefetchChildren(url: string, parsed: InternalDirectoryParse, depth: number) {
+    if (state.safetyCount > 50000 || stop.signal.aborted) return;
+    const listingKey = keyForVisited(new URL(url));
+    for (const f of parsed.folders) {
+      const childU = new URL(f.url);
+      const childKey = keyForVisited(childU);
+      if (state.visited.has(childKey) || listings.has(childKey)) continue; // claimed, or already loading
+      const parent = parentDirectory(childU);
+      if (!parent || keyForVisited(new URL(parent)) !== listingKey) continue;
+      if (!loader.listsChild(url, f)) continue;
+      scheduleListing(f.url, depth + 1, f.date ?? null);
+    }
+  }
+
+  async function loadDirectory(current: FolderEntry, currentDepth: number): Promise<DirectoryBatch | null> {
     if (state.safetyCount > 50000) {
       pushError(state.errors, 'limit', 'entry limit exceeded');
-      return;
+      return null;
+    }
+    let parsed: InternalDirectoryParse;
+    try {
+      parsed = await scheduleListing(current.url, currentDepth, current.date);
+    } catch (e) {
+      if (state.scope?.expired) return null; // crawl deadline: keep what was collected
+      throw e;
+    }
+    listings.delete(keyForVisited(new URL(current.url)));
+    return loader.toBatch(current, currentDepth, parsed);
+  }
+
+  async function* expand(current: FolderEntry, currentDepth: number): AsyncGenerator<DirectoryBatch> {
+    const batch = await loadDirectory(current, currentDepth);
+    state.maxDepthEncountered = Math.max(state.maxDepthEncountered, currentDepth);
+    if (!batch) return;
+    if (batch.files.length > remaining) batch.files.length = remaining;
+    remaining -= batch.files.length;
+    suspended = true;
+    yield batch;
+    suspended = false;
+    for (const run of deferred.splice(0)) run();
+    if (currentDepth >= opts.maxDepth) return; // stop
+    for (const child of batch.folders) {
+      if (remaining <= 0 || state.scope?.expired) return; // maxResults reached / crawl deadline
+      // role child ensures depth computation
+      if (child.role !== 'child') continue;
+      const childU = new URL(child.url);
+      const childKey = keyForVisited(childU);
+      if (state.visited.has(childKey)) continue;
+      state.visited.add(childKey);
+      yield* expand(child, currentDepth + 1);
     }
+  }
+
+  try {
+    yield* expand(start, 0);
+  } finally {
+    stop.abort(); // prefetched listings nobody will claim
+  }
+}
+
+// maxEntriesPerDirectory, applied to every load (iframe documents and cached parses too): folders are kept
+// before files. Parses may be shared (cache, coalesced loads), so a cut listing is a new object.
+function limitListing(url: string, parsed: InternalDirectoryParse, truncated: ListingTruncation | null, opts: NormalizedOptions): InternalDirectoryParse {
+  const max = opts.maxEntriesPerDirectory;
+  const over = parsed.folders.length + parsed.files.length > max;
+  if (!over && !truncated) return parsed;
+  const folders = parsed.folders.slice(0, max);
+  const files = parsed.files.slice(0, max - folders.length);
+  const errors = parsed.errors.slice();
+  const reason = truncated === 'bytes' ? `maxListingBytes (${opts.maxListingBytes})` : `maxEntriesPerDirectory (${max})`;
+  pushError(errors, 'limit', `listing truncated at ${reason}: ${url}`);
+  return { folders, files, errors };
+}
+
+// Loads single listings (through the scheduler) and shapes them into batches: roles are assigned relative
+// to `start`, depth relative to the listed directory. Used by walk() and by folderApiOpen() handles.
+export interface DirectoryLoader {
+  load(url: string, depth: number, date: string | null, signal?: AbortSignal): Promise<InternalDirectoryParse>;
+  toBatch(current: FolderEntry, depth: number, parsed: InternalDirectoryParse): DirectoryBatch;
+  listsChild(listingUrl: string, folder: InternalDirectoryParse['folders'][number]): boolean; // child that passes the filters
+}
+
+export function createDirectoryLoader(start: FolderEntry, opts: NormalizedOptions, state: WalkState): DirectoryLoader {
+  const normalized = start.url;
+  const u = new URL(normalized);
+  const rootDir = rootDirectory(u);
+  const parentDir = parentDirectory(u);
+  // Revalidation source: the caller's cache, with listings from options.previous behind it.
+  const store = opts.previous ? previousListingStore(opts.previous, cacheVariant(opts), opts.cache) : opts.cache;
+  const filtering = opts.skipHidden || opts.includeGlobs != null || opts.excludeGlobs != null || opts.filter != null;
+  const kept = new WeakMap<object, boolean>(); // parsed folder -> filter verdict (prefetch and toBatch ask)
+
+  // Calls in one session share in-flight loads of the same listing; `subtree` refreshes do not, since they
+  // may answer from their own previous result.
+  const variant = `${cacheVariant(opts)} ${opts.mode}`;
+  const shared = !(opts.previous && opts.incremental === 'subtree');
+
+  // signal: used instead of opts.signal for this load (callers fold opts.signal into it); a load still
+  // waiting for a slot when it aborts is skipped.
+  function load(url: string, depth: number, date: string | null, signal: AbortSignal | undefined = opts.signal): Promise<InternalDirectoryParse> {
+    const start = (s: AbortSignal | undefined) => state.scheduler.run(url, 'listing', () => s?.aborted
+      ? Promise.reject(abortReason(s))
+      : fetchListing(url, depth, date, s === opts.signal ? opts : { ...opts, signal: s }), s);
+    let loaded: Promise<LoadedListing>;
+    let joined = false;
+    if (shared) ({ promise: loaded, joined } = state.session.listings.run(`${variant} ${keyForVisited(new URL(url))}`, signal, start));
+    else loaded = start(signal);
+    return loaded.then(listing => {
+      state.directories[url] = listing.validators;
+      if (joined) state.stats.coalesced++;
+      return listing.parsed;
+    });
+  }
+
+  async function fetchListing(url: string, depth: number, date: string | null, opts: NormalizedOptions): Promise<LoadedListing> {
+    const inst = state.instrument;
+    if (!inst) return loadListing(url, date, null, opts);
+    const started = inst.directoryStart(url, depth);
+    try {
+      return await loadListing(url, date, inst, opts);
+    } finally {
+      inst.directoryEnd(url, started);
+    }
+  }
+
+  async function loadListing(url: string, date: string | null, inst: Instrumentation | null, opts: NormalizedOptions): Promise<LoadedListing> {
+    const previous = opts.previous?.listings.get(normalizeDirectoryUrl(url));
+    if (previous && opts.incremental === 'subtree' && date != null && previous.date === date) {
+      // folder mtime unchanged: trust the previous listing (and, through the same check, its subtree)
+      state.reusedDirectories++;
+      return { parsed: previous.parsed, validators: previous.validators };
+    }
+    const origin = new URL(url).origin;
+    // preferJson: ask for JSON until the origin has answered such a request with HTML
+    const json = opts.preferJson && state.session.jsonListings.get(origin) !== false;
+    const answered = (format: ListingFormat | null) => {
+      if (json && format) state.session.jsonListings.set(origin, format === 'json');
+    };
     let html: string | null = null;
+    let format: ListingFormat = 'html';
+    let truncated: ListingTruncation | null = null;
+    let validators: ListingValidators = { etag: null, lastModified: null };
+    const fetchHtml = async () => {
+      const res = inst
+        ? await inst.timeFetch(url, 'fetch', () => fetchDirectoryResponse(url, opts, state.stats, null, json), describeResponse)
+        : await fetchDirectoryResponse(url, opts, state.stats, null, json);
+      // a partial listing must not be revalidated into a 304 later (incremental refresh)
+      if (!res.truncated) validators = { etag: res.etag, lastModified: res.lastModified };
+      answered(res.format);
+      format = res.format ?? 'html';
+      truncated = res.truncated;
+      return res.html;
+    };
     const mode = opts.mode;
-    if (mode === 'fetch') {
+    // fetch() failed here before while the iframe worked: go straight to the iframe
+    const iframeOnly = mode === 'iframe' || (mode === 'auto' && state.session.fetchBlocked.has(origin));
+    const fallback = async (e: unknown): Promise<LoadedListing> => {
+      if (opts.signal?.aborted) throw e; // cancelled, not blocked: no iframe
+      const parsed = limitListing(url, await iframeListing(url, inst, opts), null, opts);
+      // fetch() itself rejected (CORS, mixed content, network) but the frame loaded: remember for the origin
+      if (e instanceof TypeError) state.session.fetchBlocked.add(origin);
+      return { parsed, validators };
+    };
+    if (iframeOnly) {
+      return { parsed: limitListing(url, await iframeListing(url, inst, opts), null, opts), validators };
+    } else if (store) {
+      // revalidating fetch; iframe loads cannot send validators, so the fallback stays uncached
+      try {
+        const res = await fetchCachedListing(url, opts, store, state.stats, inst, json);
+        answered(res.format);
+        if (res.notModified) state.reusedDirectories++;
+        const partial = res.truncated != null;
+        return { parsed: limitListing(url, res.parsed, res.truncated, opts), validators: partial ? validators : res.validators };
+      } catch (e) {
+        // overload is retried by the scheduler; an iframe would only load the error page
+        if (mode === 'fetch' || e instanceof OverloadError) throw e;
+        return fallback(e);
+      }
+    } else if (mode === 'fetch') {
       // fetch only
-      html = await fetchDirectoryHtml(current.url, opts, state.stats);
-    } else if (mode === 'iframe') {
-      // iframe only
-      html = await iframeDirectoryHtml(current.url, opts, state.stats);
+      html = await fetchHtml();
     } else { // auto
       try {
-        html = await fetchDirectoryHtml(current.url, opts, state.stats);
+        html = await fetchHtml();
       } catch (e) {
-        // fallback to iframe
-        html = await iframeDirectoryHtml(current.url, opts, state.stats);
+        if (e instanceof OverloadError) throw e;
+        return fallback(e);
       }
     }
     if (html == null) throw new Error('failed to load directory');
-    const parsed = parseDirectoryHtml(current.url, html, opts);
+    return { parsed: limitListing(url, await parseListing(url, html, opts, inst, format), truncated, opts), validators };
+  }
+
+  // Loads the listing in a pooled iframe and parses the frame's document in place. opts.signal is this load's
+  // own (load() passes it down in place of options.signal), so a cancelled prefetch or a stopped walk frees
+  // its frame or its place in the pool's queue.
+  async function iframeListing(url: string, inst: Instrumentation | null, opts: NormalizedOptions): Promise<InternalDirectoryParse> {
+    const frame = inst
+      ? await inst.timeFetch(url, 'iframe', () => iframeDirectoryDocument(url, opts, state.stats, opts.signal), f => ({ bytes: f.bytes(), status: null, notModified: false }))
+      : await iframeDirectoryDocument(url, opts, state.stats, opts.signal);
+    try {
+      return await parseListing(url, frame.document, opts, inst);
+    } finally {
+      frame.release();
+    }
+  }
+
+  function toBatch(current: FolderEntry, currentDepth: number, parsed: InternalDirectoryParse): DirectoryBatch {
     for (const e of parsed.errors) state.errors.push(e);
 
     // Assign roles & depth for folders
     const currentUrl = new URL(current.url);
+    const folders: FolderEntry[] = [];
     for (const f of parsed.folders) {
-      const folderUrl = f.url;
-      const folderU = new URL(folderUrl);
-      const depth = depthFrom(currentUrl, folderU);
-      const role = determineRole(folderUrl, normalized, rootDir, parentDir);
-      const folderEntry: FolderEntry = {
-        kind: 'folder',
-        url: folderUrl,
-        rawName: f.rawName || folderUrl.split('/').filter(Boolean).pop() || '',
-        name: f.name || f.rawName || '',
-        hidden: f.hidden || false,
-        size: null,
-        date: f.date ?? null,
-        role,
-        depth,
-      };
-      if (!state.allFolders.find(x => x.url === folderEntry.url && x.role === folderEntry.role)) {
-        state.allFolders.push(folderEntry);
+      const entry = toFolder(currentUrl, f);
+      if (filtering && entry.role === 'child' && !keepFolder(entry, f)) {
+        state.pruned++;
+        continue;
       }
-      if (role === 'child') {
-        const childNode: FolderNode = { ...folderEntry, children: [], files: [] };
-        current.children.push(childNode);
-      }
-  state.safetyCount++;
+      folders.push(entry);
+      state.safetyCount++;
     }
+    const files: FileEntry[] = [];
     for (const fi of parsed.files) {
-      const fileEntry: FileEntry = {
+      const entry: FileEntry = {
         kind: 'file',
         url: fi.url,
         rawName: fi.rawName || fi.url.split('/').filter(Boolean).pop() || '',
@@ -91,46 +380,78 @@ export async function traverse(startUrl: string, opts: NormalizedOptions, state:
         hidden: fi.hidden || false,
         size: fi.size ?? null,
         date: fi.date ?? null,
+        ...(opts.includeMime && fi.mime !== undefined ? { mime: fi.mime } : {}), // reused from a previous result
       };
-      state.allFiles.push(fileEntry);
-      current.files.push(fileEntry);
+      if (filtering && !keep(entry)) continue;
+      files.push(entry);
       state.safetyCount++;
     }
 
     // Ensure parent & root entries exist (not traversed) even if absent in listing
     if (current.role === 'self') {
-      if (rootDir && !state.allFolders.find(f => f.url === rootDir)) {
-        const rootNode = createEmptyNode(rootDir, new URL(rootDir), 0, 'root');
-        state.allFolders.push(rootNode);
+      const listed = new Set<string>([current.url, ...folders.map(f => f.url)]);
+      if (rootDir && !listed.has(rootDir)) {
+        folders.push(createEmptyNode(rootDir, new URL(rootDir), 0, 'root'));
+        listed.add(rootDir);
         state.safetyCount++;
       }
-      if (parentDir && !state.allFolders.find(f => f.url === parentDir)) {
-        const parentNode = createEmptyNode(parentDir, new URL(parentDir), 0, 'parent');
-        state.allFolders.push(parentNode);
+      if (parentDir && !listed.has(parentDir)) {
+        folders.push(createEmptyNode(parentDir, new URL(parentDir), 0, 'parent'));
         state.safetyCount++;
       }
     }
+    return { directory: current, depth: currentDepth, folders, files };
   }
 
-  await loadDirectory(node);
+  // Assign role & depth (relative to the listed directory)
+  function toFolder(listingUrl: URL, f: InternalDirectoryParse['folders'][number]): FolderEntry {
+    const folderUrl = f.url;
+    return {
+      kind: 'folder',
+      url: folderUrl,
+      rawName: f.rawName || folderUrl.split('/').filter(Boolean).pop() || '',
+      name: f.name || f.rawName || '',
+      hidden: f.hidden || false,
+      size: null,
+      date: f.date ?? null,
+      role: determineRole(folderUrl, normalized, rootDir, parentDir),
+      depth: depthFrom(listingUrl, new URL(folderUrl)),
+    };
+  }
 
-  async function dfs(current: FolderNode, currentDepth: number) {
-    state.maxDepthEncountered = Math.max(state.maxDepthEncountered, currentDepth);
-    if (currentDepth >= opts.maxDepth) return; // stop
-    for (const child of current.children) {
-      // role child ensures depth computation
-      if (child.role !== 'child') continue;
-      const childU = new URL(child.url);
-      const childKey = keyForVisited(childU);
-      if (state.visited.has(childKey)) continue;
-      state.visited.add(childKey);
-      await loadDirectory(child);
-      await dfs(child, currentDepth + 1);
+  function keepFolder(entry: FolderEntry, f: object): boolean {
+    let verdict = kept.get(f);
+    if (verdict === undefined) kept.set(f, verdict = keep(entry));
+    return verdict;
+  }
+
+  // Filters pushed into traversal; checked before a folder is listed.
+  function keep(entry: FolderEntry | FileEntry): boolean {
+    if (opts.skipHidden && entry.hidden) return false;
+    if (opts.includeGlobs || opts.excludeGlobs) {
+      const folder = entry.kind === 'folder';
+      const path = relativeGlobPath(entry.url, u.pathname);
+      if (opts.excludeGlobs?.some(g => g.matches(path, folder))) return false;
+      if (opts.includeGlobs && !opts.includeGlobs.some(g => g.matches(path, folder) || (folder && g.matchesBelow(path)))) return false;
     }
+    return !opts.filter || opts.filter(entry) !== false;
   }
 
-  await dfs(node, 0);
-  return node;
+  function listsChild(listingUrl: string, f: InternalDirectoryParse['folders'][number]): boolean {
+    if (determineRole(f.url, normalized, rootDir, parentDir) !== 'child') return false;
+    return !filtering || keepFolder(toFolder(new URL(listingUrl), f), f);
+  }
+
+  return { load, toBatch, listsChild };
+}
+
+function folderKey(url: string, role: FolderRole): string {
+  return `${role} ${url}`;
+}
+
+function addFolder(state: RecursionState, entry: FolderEntry) {
+  state.allFolders.push(entry);
+  state.folderKeys.add(folderKey(entry.url, entry.role));
 }
 
 function createEmptyNode(url: string, u: URL, depth: number, role: 'self'|'child'|'root'|'parent'): FolderNode {
@@ -0,0 +1,105 @@
+import { DATE_FORMATS, DateFormat, NumericDateOrder, numericDateOrder, parseDateMeta } from '../utils/date.js';
+import { parseSizeMeta, sizeTokenBytes } from '../utils/size.js';
+
+// Every row of a listing is printed by the same template, so its layout is inferred once per listing from the
+// first rows: which date format the rows use, whether the size sits just before or just after the date, and
+// whether sizes are plain byte counts. Each row is then read with one regex and one token lookup; a row that
+// does not fit falls back to the generic per-row heuristics (parseDateMeta / parseSizeMeta).
+export interface RowSchema {
+  date: DateFormat | null;
+  size: 'before' | 'after' | null; // the size cell is the token adjacent to the date on this side
+  units: 'bytes' | 'suffixed'; // 'bytes': only plain counts (`931`); 'suffixed': `1.2M`, `4KB`, ... as well
+}
+
+export interface RowMeta {
+  date: string | null;
+  size: number | null;
+}
+
+const SAMPLE_ROWS = 16;
+const NO_SIZE = /^(?:-|<dir>)$/i; // folder rows
+const TOKEN_AFTER = /\s*(\S*)/y;
+
+export function inferRowSchema(sample: string[]): RowSchema {
+  let date: DateFormat | null = null;
+  let best = 0;
+  for (const format of DATE_FORMATS) {
+    let hits = 0;
+    for (const text of sample) if (format.re.test(text)) hits++;
+    if (hits > best) {
+      best = hits;
+      date = format;
+    }
+  }
+  if (!date) return { date: null, size: null, units: 'suffixed' };
+  // Rows without a date (headers, the parent link) say nothing about the columns.
+  const after: string[] = [];
+  const before: string[] = [];
+  for (const text of sample) {
+    const m = date.re.exec(text);
+    if (!m) continue;
+    after.push(tokenAfter(text, m));
+    before.push(tokenBefore(text, m));
+  }
+  const size = mostlySizes(after) ? 'after' : mostlySizes(before) ? 'before' : null;
+  const sized = (size === 'after' ? after : size === 'before' ? before : []).filter(t => isSizeCell(t) && !NO_SIZE.test(t));
+  const units = sized.length > 0 && sized.every(t => /^\d+$/.test(t)) ? 'bytes' : 'suffixed';
+  return { date, size, units };
+}
+
+// Date and size of every row's metadata text, in order. Numeric dates (`03/04/2024`) are read with one day /
+// month order for the whole listing, taken from any row where it is unambiguous (a number above 12).
+export function parseRowMeta(texts: string[], errors: string[]): RowMeta[] {
+  const schema = inferRowSchema(texts.slice(0, SAMPLE_ROWS));
+  const format = schema.date;
+  if (!format) return texts.map(text => ({ date: parseDateMeta(text, errors), size: parseSizeMeta(text) }));
+  const matches = texts.map(text => format.re.exec(text));
+  const order = format.name === 'numeric' ? listingDateOrder(matches) : null;
+  return texts.map((text, i) => {
+    const m = matches[i];
+    if (!m) return { date: parseDateMeta(text, errors, order), size: parseSizeMeta(text) };
+    const date = format.toIso(m, order) ?? parseDateMeta(text, errors, order);
+    const size = schema.size ? sizeCell(schema.size === 'after' ? tokenAfter(text, m) : tokenBefore(text, m), schema.units) : undefined;
+    return { date, size: size === undefined ? parseSizeMeta(text) : size };
+  });
+}
+
+function listingDateOrder(matches: Array<RegExpExecArray | null>): NumericDateOrder | null {
+  let order: NumericDateOrder | null = null;
+  for (const m of matches) {
+    const seen = m && numericDateOrder(m);
+    if (!seen) continue;
+    if (order && seen !== order) return null; // rows disagree: leave each to its own AM / PM
+    order = seen;
+  }
+  return order;
+}
+
+// undefined = the cell does not look like this listing's sizes, so the row is read generically.
+function sizeCell(token: string, units: RowSchema['units']): number | null | undefined {
+  if (NO_SIZE.test(token)) return null;
+  if (units === 'bytes') return /^\d+$/.test(token) ? Number(token) : undefined;
+  return sizeTokenBytes(token) ?? undefined;
+}
+
+// A stray row (a symlink, a note) among the sampled ones should not cost the rest of the listing its fast path.
+function mostlySizes(cells: string[]): boolean {
+  return cells.filter(isSizeCell).length * 4 >= cells.length * 3;
+}
+
+function isSizeCell(token: string): boolean {
+  return NO_SIZE.test(token) || sizeTokenBytes(token) !== null;
+}
+
+function tokenAfter(text: string, m: RegExpExecArray): string {
+  TOKEN_AFTER.lastIndex = m.index + m[0].length;
+  return TOKEN_AFTER.exec(text)![1];
+}
+
+function tokenBefore(text: string, m: RegExpExecArray): string {
+  let end = m.index;
+  while (end > 0 && /\s/.test(text[end - 1])) end--;
+  let start = end;
+  while (start > 0 && !/\s/.test(text[start - 1])) start--;
+  return text.slice(start, end);
+}
@@ -0,0 +1,40 @@
+import { FolderApiSessionOptions, InternalDirectoryParse, ListingCacheStore, ListingValidators } from '../types.js';
+import { RequestScheduler, SchedulerLimits } from '../utils/scheduler.js';
+import { defaultListingCache } from './listingCache.js';
+import { InflightLoads } from './inflight.js';
+
+// A listing as loaded for one call: the parse plus the validators of its response.
+export interface LoadedListing {
+  parsed: InternalDirectoryParse;
+  validators: ListingValidators;
+}
+
+// State shared by every call given this session (option `session`): one RequestScheduler (per-origin
+// budgets, adaptive limits, backoff), one listing cache, and the listings currently loading, which
+// concurrent calls join instead of fetching and parsing the same directory again. Calls without a
+// session get a fresh one each, built from their own options.
+export class FolderApiSession {
+  readonly scheduler: RequestScheduler;
+  readonly limits: Readonly<SchedulerLimits>;
+  readonly cache: ListingCacheStore | null;
+  readonly listings = new InflightLoads<LoadedListing>(); // keyed by parse variant + mode + directory
+  readonly jsonListings = new Map<string, boolean>(); // origin -> answered a JSON-preferring request with JSON (preferJson)
+  readonly fetchBlocked = new Set<string>(); // origins where fetch() failed but the iframe loaded (auto mode skips fetch)
+
+  constructor(options?: FolderApiSessionOptions) {
+    this.limits = {
+      perOrigin: Math.max(1, options?.originConcurrency ?? 6),
+      listing: Math.max(1, options?.directoryConcurrency ?? 1),
+      head: Math.max(1, options?.headConcurrency ?? 4),
+      adaptive: options?.adaptiveConcurrency ?? true,
+      retries: Math.max(0, options?.retries ?? 2)
+    };
+    this.scheduler = new RequestScheduler(this.limits);
+    this.cache = options?.cache === true ? defaultListingCache() : options?.cache || null;
+  }
+
+  // Listing loads in flight (across all calls).
+  get inFlight(): number {
+    return this.listings.size;
+  }
+}
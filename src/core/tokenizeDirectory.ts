@@ -0,0 +1,297 @@
+import { ListingAnchor } from '../types.js';
+
+// DOM-free listing scanner: one pass over the HTML, no document is built.
+// Every character of text is appended once to a flat buffer; elements only remember their
+// [start, end) offsets into it, which is exactly their textContent. Anchors are grouped and
+// given metadata text with the same rules as the DOMParser path (see parseDirectory.ts).
+
+interface OpenElement {
+  tag: string;
+  start: number;
+  end: number; // -1 while open
+  cells?: OpenElement[]; // <tr> only: descendant th/td in document order
+  lineStart?: number; // <pre> only: offset where the current line began
+  waiting?: ScannedAnchor[]; // <pre> only: anchors on the current line
+}
+
+interface ScannedAnchor {
+  href: string;
+  el: OpenElement;
+  parent?: OpenElement;
+  tr?: OpenElement;
+  li?: OpenElement;
+  pre?: OpenElement;
+  lineStart?: number; // line (within `pre`) the anchor starts on
+  lineEnd?: number;
+}
+
+const VOID_TAGS = new Set(['area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source', 'track', 'wbr']);
+const RAW_TEXT_TAGS = new Set(['script', 'style', 'textarea', 'title']);
+const NAMED_ENTITIES: Record<string, string> = {
+  amp: '&', lt: '<', gt: '>', quot: '"', apos: "'", nbsp: '\u00a0', copy: '©', reg: '®',
+  hellip: '…', ndash: '–', mdash: '—', laquo: '«', raquo: '»', middot: '·'
+};
+const LEGACY_ENTITIES = new Set(['amp', 'lt', 'gt', 'quot', 'nbsp', 'copy', 'reg']);
+
+export function tokenizeListingAnchors(input: string): ListingAnchor[] {
+  const html = input.indexOf('\r') >= 0 ? input.replace(/\r\n?/g, '\n') : input;
+  const parts: string[] = [];
+  let textLength = 0;
+  const stack: OpenElement[] = [];
+  const groups: ScannedAnchor[][] = [[], [], [], []]; // pre, table, ul, ol (selector order)
+  const all: ScannedAnchor[] = [];
+  const openCount = { pre: 0, table: 0, ul: 0, ol: 0 };
+  let dropPreNewline = false;
+  let currentPre: OpenElement | undefined; // innermost open <pre>
+
+  function appendText(text: string) {
+    if (dropPreNewline) {
+      dropPreNewline = false;
+      if (text.startsWith('\n')) text = text.slice(1);
+    }
+    if (!text) return;
+    if (currentPre) {
+      for (let nl = text.indexOf('\n'); nl >= 0; nl = text.indexOf('\n', nl + 1)) {
+        endLine(currentPre, textLength + nl, textLength + nl + 1);
+      }
+    }
+    parts.push(text);
+    textLength += text.length;
+  }
+
+  // Line index for <pre>: <br> and newlines end the current line (same rules as indexPreLines).
+  function endLine(pre: OpenElement, end: number, nextStart: number) {
+    for (const a of pre.waiting!) a.lineEnd = end;
+    pre.waiting = [];
+    pre.lineStart = nextStart;
+  }
+
+  function pop(): void {
+    const el = stack.pop()!;
+    el.end = textLength;
+    if (el.tag in openCount) openCount[el.tag as keyof typeof openCount]--;
+    if (el.tag === 'pre') {
+      endLine(el, textLength, textLength);
+      currentPre = nearest('pre');
+    }
+  }
+
+  // Close the nearest open element in `targets`, unless a `boundary` element is reached first.
+  function closeNearest(targets: Set<string>, boundary: Set<string>) {
+    for (let i = stack.length - 1; i >= 0; i--) {
+      const tag = stack[i].tag;
+      if (boundary.has(tag)) return;
+      if (targets.has(tag)) {
+        while (stack.length > i) pop();
+        return;
+      }
+    }
+  }
+
+  function nearest(tag: string): OpenElement | undefined {
+    for (let i = stack.length - 1; i >= 0; i--) if (stack[i].tag === tag) return stack[i];
+    return undefined;
+  }
+
+  function openElement(tag: string, href: string | null) {
+    if (tag === 'a') closeNearest(A_TAGS, NO_TAGS);
+    else if (tag === 'tr') closeNearest(TR_TAGS, TABLE_TAGS);
+    else if (tag === 'td' || tag === 'th') closeNearest(CELL_TAGS, ROW_TAGS);
+    else if (tag === 'li') closeNearest(LI_TAGS, LIST_TAGS);
+    if (tag === 'br' && currentPre) endLine(currentPre, textLength, textLength);
+    if (VOID_TAGS.has(tag)) return;
+    const el: OpenElement = { tag, start: textLength, end: -1 };
+    if (tag === 'td' || tag === 'th') {
+      for (const open of stack) if (open.tag === 'tr') open.cells!.push(el);
+    } else if (tag === 'tr') {
+      el.cells = [];
+    } else if (tag === 'pre') {
+      el.lineStart = textLength;
+      el.waiting = [];
+    }
+    if (tag === 'a' && href != null) {
+      const anchor: ScannedAnchor = { href, el, parent: stack[stack.length - 1], tr: nearest('tr'), li: nearest('li'), pre: currentPre };
+      all.push(anchor);
+      if (currentPre) {
+        anchor.lineStart = currentPre.lineStart;
+        currentPre.waiting!.push(anchor);
+      }
+      if (openCount.pre) groups[0].push(anchor);
+      if (openCount.table) groups[1].push(anchor);
+      if (openCount.ul) groups[2].push(anchor);
+      if (openCount.ol) groups[3].push(anchor);
+    }
+    stack.push(el);
+    if (tag in openCount) openCount[tag as keyof typeof openCount]++;
+    if (tag === 'pre') {
+      currentPre = el;
+      dropPreNewline = true;
+    }
+  }
+
+  function closeElement(tag: string) {
+    for (let i = stack.length - 1; i >= 0; i--) {
+      if (stack[i].tag === tag) {
+        while (stack.length > i) pop();
+        return;
+      }
+    }
+  }
+
+  let i = 0;
+  const n = html.length;
+  while (i < n) {
+    const lt = html.indexOf('<', i);
+    if (lt < 0) {
+      appendText(decodeEntities(html.slice(i), false));
+      break;
+    }
+    if (lt > i) appendText(decodeEntities(html.slice(i, lt), false));
+    const next = html.charCodeAt(lt + 1);
+    if (html.startsWith('<!--', lt)) {
+      const close = html.indexOf('-->', lt + 4);
+      i = close < 0 ? n : close + 3;
+      continue;
+    }
+    if (next === 33 /* ! */ || next === 63 /* ? */) {
+      const close = html.indexOf('>', lt + 2);
+      i = close < 0 ? n : close + 1;
+      continue;
+    }
+    if (next === 47 /* / */ && isAsciiAlpha(html.charCodeAt(lt + 2))) {
+      const nameEnd = scanName(html, lt + 2);
+      const close = html.indexOf('>', nameEnd);
+      closeElement(html.slice(lt + 2, nameEnd).toLowerCase());
+      dropPreNewline = false;
+      i = close < 0 ? n : close + 1;
+      continue;
+    }
+    if (!isAsciiAlpha(next)) {
+      appendText('<');
+      i = lt + 1;
+      continue;
+    }
+    const nameEnd = scanName(html, lt + 1);
+    const tag = html.slice(lt + 1, nameEnd).toLowerCase();
+    const { href, end } = scanAttributes(html, nameEnd, tag === 'a');
+    dropPreNewline = false;
+    openElement(tag, href);
+    i = end;
+    if (RAW_TEXT_TAGS.has(tag)) {
+      const closeRe = new RegExp(`</${tag}[\\s/>]`, 'ig');
+      closeRe.lastIndex = i;
+      const m = closeRe.exec(html);
+      const contentEnd = m ? m.index : n;
+      const raw = html.slice(i, contentEnd);
+      appendText(tag === 'script' || tag === 'style' ? raw : decodeEntities(raw, false));
+      closeElement(tag);
+      const close = m ? html.indexOf('>', contentEnd) : -1;
+      i = close < 0 ? n : close + 1;
+    }
+  }
+  while (stack.length) pop();
+
+  const full = parts.join('');
+  const text = (el: OpenElement) => full.slice(el.start, el.end);
+  let candidates = ([] as ScannedAnchor[]).concat(...groups);
+  if (candidates.length === 0) candidates = all;
+  return candidates.map(a => ({
+    href: a.href,
+    metadata(): string {
+      if (a.tr) {
+        const cells = a.tr.cells!;
+        if (cells.length > 0) return cells.map(text).join(' ');
+        return text(a.tr);
+      }
+      if (a.li) return text(a.li);
+      if (a.pre) return full.slice(a.lineStart!, a.lineEnd!) || text(a.el);
+      return a.parent ? text(a.parent) : text(a.el);
+    }
+  }));
+}
+
+const NO_TAGS = new Set<string>();
+const A_TAGS = new Set(['a']);
+const TR_TAGS = new Set(['tr']);
+const CELL_TAGS = new Set(['td', 'th']);
+const LI_TAGS = new Set(['li']);
+const TABLE_TAGS = new Set(['table']);
+const ROW_TAGS = new Set(['tr', 'table']);
+const LIST_TAGS = new Set(['ul', 'ol']);
+
+function isAsciiAlpha(c: number): boolean {
+  return (c >= 65 && c <= 90) || (c >= 97 && c <= 122);
+}
+
+function scanName(html: string, from: number): number {
+  let j = from;
+  while (j < html.length) {
+    const c = html.charCodeAt(j);
+    if (c === 62 /* > */ || c === 47 /* / */ || c <= 32) break;
+    j++;
+  }
+  return j;
+}
+
+// Walks a start tag's attributes; only the href value is materialized (and only when wanted).
+function scanAttributes(html: string, from: number, wantHref: boolean): { href: string | null; end: number } {
+  let j = from;
+  let href: string | null = null;
+  const n = html.length;
+  while (j < n) {
+    let c = html.charCodeAt(j);
+    if (c <= 32 || c === 47 /* / */) { j++; continue; }
+    if (c === 62 /* > */) return { href, end: j + 1 };
+    const nameStart = j;
+    while (j < n) {
+      c = html.charCodeAt(j);
+      if (c <= 32 || c === 47 || c === 61 /* = */ || c === 62) break;
+      j++;
+    }
+    const name = html.slice(nameStart, j);
+    while (j < n && html.charCodeAt(j) <= 32) j++;
+    if (html.charCodeAt(j) !== 61) continue;
+    j++;
+    while (j < n && html.charCodeAt(j) <= 32) j++;
+    let value: string;
+    const q = html.charCodeAt(j);
+    if (q === 34 /* " */ || q === 39 /* ' */) {
+      const close = html.indexOf(String.fromCharCode(q), j + 1);
+      const valueEnd = close < 0 ? n : close;
+      value = html.slice(j + 1, valueEnd);
+      j = valueEnd + 1;
+    } else {
+      const valueStart = j;
+      while (j < n) {
+        c = html.charCodeAt(j);
+        if (c <= 32 || c === 62) break;
+        j++;
+      }
+      value = html.slice(valueStart, j);
+    }
+    if (wantHref && href == null && name.length === 4 && name.toLowerCase() === 'href') {
+      href = decodeEntities(value, true);
+    }
+  }
+  return { href, end: n };
+}
+
+function decodeEntities(s: string, inAttribute: boolean): string {
+  if (s.indexOf('&') < 0) return s;
+  return s.replace(/&(#[0-9]+|#[xX][0-9a-fA-F]+|[A-Za-z][A-Za-z0-9]*)(;?)/g, (m, body: string, semi: string, offset: number) => {
+    if (body.charCodeAt(0) === 35 /* # */) {
+      const code = body[1] === 'x' || body[1] === 'X' ? parseInt(body.slice(2), 16) : parseInt(body.slice(1), 10);
+      if (!code || code > 0x10ffff || (code >= 0xd800 && code <= 0xdfff)) return '\ufffd';
+      return String.fromCodePoint(code);
+    }
+    const value = NAMED_ENTITIES[body];
+    if (value === undefined) return m;
+    if (semi) return value;
+    if (!LEGACY_ENTITIES.has(body)) return m;
+    if (inAttribute) {
+      const after = s.charAt(offset + m.length);
+      if (after === '=' || /[A-Za-z0-9]/.test(after)) return m;
+    }
+    return value;
+  });
+}
@@ -0,0 +1,238 @@
+import { FileEntry, FolderApiOpenStats, FolderApiOptions, FolderEntry, FolderHandle, FolderNode, FolderRootHandle, InternalDirectoryParse, ListingValidators, NormalizedOptions } from './types.js';
+import { normalizeOptions } from './options.js';
+import { claimStart, createDirectoryLoader, createRecursionState, DirectoryBatch, DirectoryLoader, RecursionState } from './core/recursion.js';
+import { enrichMime } from './core/mime.js';
+import { createInstrumentation, Instrumentation } from './core/instrument.js';
+import { keyForVisited, normalizeDirectoryUrl } from './utils/url.js';
+import { pushError } from './utils/errors.js';
+import { abortReason } from './utils/abort.js';
+import { InflightLoads } from './core/inflight.js';
+
+// Lists the start folder and returns its handle; every other folder is listed only when its handle is
+// expanded or prefetched, so fetch work follows what the caller actually opens. maxDepth is not used.
+export async function folderApiOpen(url: string, options?: FolderApiOptions): Promise<FolderRootHandle> {
+  const opts = normalizeOptions(options);
+  const instrument = createInstrumentation(opts, url);
+  const state = createRecursionState(opts, instrument);
+  const start = claimStart(url, state)!; // fresh visited set: never already claimed
+  const root = new RootHandle(new OpenTree(start, opts, state, instrument), start);
+  try {
+    await root.expand();
+  } catch (e) {
+    root.close();
+    throw e;
+  }
+  return root;
+}
+
+// State behind one folderApiOpen() tree; loads go through the call's FolderApiSession like any other call.
+class OpenTree {
+  readonly loader: DirectoryLoader;
+  private readonly pending = new InflightLoads<InternalDirectoryParse>(true); // loading, or prefetched until expanded
+  private readonly batches = new Map<string, Promise<DirectoryBatch>>(); // expanded folders by visited key
+  private readonly handles = new Map<string, Handle>(); // first handle per folder, for find()
+  private readonly stop = new AbortController(); // aborted by close(): cancels HEADs and their backoff waits
+  private readonly mimeOpts: NormalizedOptions;
+  private closed = false;
+  expanded = 0;
+  prefetched = 0;
+
+  constructor(start: FolderEntry, readonly opts: NormalizedOptions, readonly state: RecursionState, private readonly instrument: Instrumentation | null) {
+    this.loader = createDirectoryLoader(start, opts, state);
+    this.mimeOpts = { ...opts, signal: this.stop.signal };
+    opts.signal?.addEventListener('abort', this.close, { once: true }); // per-load signals do not include it
+  }
+
+  register(handle: Handle) {
+    if (!this.handles.has(handle.key)) this.handles.set(handle.key, handle);
+  }
+
+  find(url: string): Handle | undefined {
+    return this.handles.get(keyForVisited(new URL(normalizeDirectoryUrl(url))));
+  }
+
+  isLoaded(key: string): boolean {
+    return this.batches.has(key) || this.pending.has(key);
+  }
+
+  // Batch of an expanded folder: from an earlier expansion (of any handle of the same folder) or a new load.
+  async batch(handle: Handle, signal?: AbortSignal): Promise<DirectoryBatch> {
+    const done = this.batches.get(handle.key);
+    if (done) return done;
+    if (this.state.safetyCount > 50000) {
+      pushError(this.state.errors, 'limit', 'entry limit exceeded');
+      throw new Error('entry limit exceeded');
+    }
+    const parsed = await this.listing(handle, signal, false);
+    let batch = this.batches.get(handle.key);
+    if (!batch) {
+      batch = this.claim(handle, parsed);
+      this.batches.set(handle.key, batch);
+    }
+    return batch;
+  }
+
+  listing(handle: Handle, signal: AbortSignal | undefined, prefetch: boolean): Promise<InternalDirectoryParse> {
+    if (this.closed) return Promise.reject(new DOMException('folderApiOpen handle was closed', 'AbortError'));
+    if (this.opts.signal?.aborted) return Promise.reject(abortReason(this.opts.signal));
+    let started = false;
+    const { promise } = this.pending.run(handle.key, signal, loadSignal => {
+      started = true;
+      return this.loader.load(handle.url, handle.depth, handle.node.date, loadSignal);
+    });
+    if (started && prefetch) promise.then(() => { this.prefetched++; }, () => {});
+    return promise;
+  }
+
+  private async claim(handle: Handle, parsed: InternalDirectoryParse): Promise<DirectoryBatch> {
+    this.pending.delete(handle.key);
+    this.state.visited.add(handle.key);
+    const batch = this.loader.toBatch(handle.node, handle.depth, parsed);
+    this.state.maxDepthEncountered = Math.max(this.state.maxDepthEncountered, handle.depth);
+    this.expanded++;
+    if (this.opts.includeMime) await enrichMime(batch.files, this.mimeOpts, this.state.stats, this.state.errors, this.state.scheduler, this.instrument);
+    return batch;
+  }
+
+  close = () => {
+    if (this.closed) return;
+    this.closed = true;
+    this.opts.signal?.removeEventListener('abort', this.close);
+    this.pending.abortAll();
+    this.stop.abort(new DOMException('folderApiOpen handle was closed', 'AbortError'));
+    if (!this.opts.session) this.state.scheduler.dispose(); // this tree's own scheduler
+    this.instrument?.finish(); // closes the crawl measure (performance marks)
+  };
+}
+
+class Handle implements FolderHandle {
+  readonly key: string;
+  status: FolderHandle['status'] = 'idle';
+  error: string | null = null;
+  children: Handle[] = [];
+  folders: FolderEntry[] = [];
+  files: FileEntry[] = [];
+  private loads = 0; // expand() calls in progress
+
+  constructor(protected readonly tree: OpenTree, readonly node: FolderNode, readonly depth: number) {
+    this.key = keyForVisited(new URL(node.url));
+    tree.register(this);
+  }
+
+  get url(): string {
+    return this.node.url;
+  }
+
+  private get isExpanded(): boolean {
+    return this.status === 'expanded';
+  }
+
+  async expand(options?: { signal?: AbortSignal }): Promise<FolderHandle> {
+    if (this.isExpanded) return this;
+    this.status = 'loading';
+    this.error = null;
+    this.loads++;
+    try {
+      const batch = await this.tree.batch(this, options?.signal); // concurrent calls share one load
+      if (!this.isExpanded) this.apply(batch); // a concurrent expand() may have applied it
+      return this;
+    } catch (e: any) {
+      if (!this.isExpanded) {
+        if (!options?.signal?.aborted) {
+          this.status = 'error';
+          this.error = e?.message ?? String(e);
+        } else if (this.loads === 1) {
+          this.status = 'idle'; // no other expand() is waiting
+        }
+      }
+      throw e;
+    } finally {
+      this.loads--;
+    }
+  }
+
+  prefetch(options?: { signal?: AbortSignal }): Promise<void> {
+    if (this.status === 'expanded' || this.loads > 0 || this.tree.isLoaded(this.key)) return Promise.resolve();
+    return this.tree.listing(this, options?.signal, true).then(() => {}, () => {});
+  }
+
+  async prefetchChildren(options?: { signal?: AbortSignal; idle?: boolean }): Promise<void> {
+    const signal = options?.signal;
+    for (const child of this.children) {
+      if (signal?.aborted) return;
+      if (child.status === 'expanded' || this.tree.isLoaded(child.key)) continue;
+      if (options?.idle) await whenIdle(signal);
+      if (signal?.aborted) return;
+      await child.prefetch({ signal });
+    }
+  }
+
+  private apply(batch: DirectoryBatch) {
+    this.status = 'expanded';
+    this.error = null;
+    this.folders = batch.folders;
+    for (const folder of batch.folders) {
+      if (folder.role !== 'child') continue;
+      const childNode: FolderNode = { ...folder, children: [], files: [] };
+      this.node.children.push(childNode);
+      this.children.push(new Handle(this.tree, childNode, this.depth + 1));
+    }
+    for (const file of batch.files) this.node.files.push(file);
+    this.files = this.node.files;
+  }
+}
+
+class RootHandle extends Handle implements FolderRootHandle {
+  constructor(tree: OpenTree, node: FolderNode) {
+    super(tree, node, 0);
+  }
+
+  get errors(): string[] {
+    return this.tree.state.errors;
+  }
+
+  get directories(): Record<string, ListingValidators> {
+    return this.tree.state.directories;
+  }
+
+  get stats(): FolderApiOpenStats {
+    const { state } = this.tree;
+    return {
+      ...state.stats,
+      concurrency: state.scheduler.concurrency,
+      peakConcurrency: state.scheduler.peak,
+      retries: state.scheduler.retried,
+      pruned: state.pruned,
+      expanded: this.tree.expanded,
+      prefetched: this.tree.prefetched,
+      maxDepth: state.maxDepthEncountered
+    };
+  }
+
+  find(url: string): FolderHandle | undefined {
+    return this.tree.find(url);
+  }
+
+  close() {
+    this.tree.close();
+  }
+}
+
+// Resolves in the next idle period (requestIdleCallback, else a macrotask) or when `signal` aborts.
+function whenIdle(signal?: AbortSignal): Promise<void> {
+  return new Promise<void>(resolve => {
+    const g = globalThis as any;
+    const idle = typeof g.requestIdleCallback === 'function';
+    const id = idle ? g.requestIdleCallback(done) : setTimeout(done, 0);
+    function done() {
+      signal?.removeEventListener('abort', cancel);
+      resolve();
+    }
+    function cancel() {
+      if (idle) g.cancelIdleCallback(id);
+      else clearTimeout(id);
+      resolve();
+    }
+    signal?.addEventListener('abort', cancel, { once: true });
+  });
+}
@@ -1,40 +1,84 @@
-import { FolderApiOptions, FolderApiResult, FileEntry, FolderEntry } from './types.js';
+import { FileEntry, FolderApiOptions, FolderApiResult, FolderEntry, FolderNode, NormalizedOptions } from './types.js';
 import { normalizeOptions } from './options.js';
-import { traverse } from './core/recursion.js';
+import { traverse, createRecursionState, RecursionState } from './core/recursion.js';
 import { enrichMime } from './core/mime.js';
+import { diffEntries } from './core/incremental.js';
+import { createInstrumentation, Instrumentation } from './core/instrument.js';
+import { CompactEntries, compactResult, traverseCompact } from './core/compact.js';
+import { abortReason, CrawlScope, crawlScope } from './utils/abort.js';
+import { pushError } from './utils/errors.js';
 
 export async function folderApiRequest(url: string, options?: FolderApiOptions): Promise<FolderApiResult> {
-  const opts = normalizeOptions(options);
+  const normalized = normalizeOptions(options);
+  // Everything the crawl starts (GETs, HEADs, iframes, backoff waits) runs under the scope's signal.
+  const scope = crawlScope(normalized.signal, normalized.totalTimeoutMs);
+  const opts = scope.signal === normalized.signal ? normalized : { ...normalized, signal: scope.signal };
+  const instrument = createInstrumentation(opts, url);
+  const state = createRecursionState(opts, instrument, scope);
+  try {
+    return await crawl(url, opts, state, scope, instrument);
+  } finally {
+    scope.dispose();
+    if (!opts.session) state.scheduler.dispose(); // this call's own scheduler
+  }
+}
+
+async function crawl(url: string, opts: NormalizedOptions, state: RecursionState, scope: CrawlScope, instrument: Instrumentation | null): Promise<FolderApiResult> {
   const started = performance.now?.() ?? Date.now();
-  const state = {
-    visited: new Set<string>(),
-    allFolders: [] as FolderEntry[],
-    allFiles: [] as FileEntry[],
-    errors: [] as string[],
-    stats: { fetches: 0, iframes: 0, heads: 0 },
-    safetyCount: 0,
-    maxDepthEncountered: 0
-  };
-  const rootNode = await traverse(url, opts, state);
-  if (opts.includeMime) {
-    await enrichMime(state.allFiles, opts, state.stats, state.errors);
+  // HEADs for each directory start as soon as it is parsed and overlap the rest of the traversal.
+  const enrichments: Promise<void>[] = [];
+  const enrich = (files: FileEntry[]) => enrichMime(files, opts, state.stats, state.errors, state.scheduler, instrument);
+  const compact = opts.resultFormat === 'compact' ? new CompactEntries() : null;
+  let rootNode: FolderNode | null = null;
+  if (compact) {
+    // enrichment fills in mime / size after the listing was stored; copy them back
+    await traverseCompact(url, opts, state, compact, opts.includeMime
+      ? (files, first) => { enrichments.push(enrich(files).then(() => files.forEach((f, k) => compact.update(first + k, f)))); }
+      : undefined);
+  } else {
+    rootNode = await traverse(url, opts, state, opts.includeMime ? files => { enrichments.push(enrich(files)); } : undefined);
+  }
+  await Promise.all(enrichments);
+  if (scope.expired) pushError(state.errors, 'limit', `crawl stopped at totalTimeoutMs (${opts.totalTimeoutMs})`);
+  else if (opts.signal?.aborted) throw abortReason(opts.signal); // aborted while HEADs were running
+  let diff;
+  if (opts.previous) {
+    const folders = compact ? Array.from(compact.folderIndexes(), i => compact.entryAt(i) as FolderEntry) : state.allFolders;
+    const files = compact ? Array.from(compact.fileIndexes(), i => compact.entryAt(i) as FileEntry) : state.allFiles;
+    diff = diffEntries(opts.previous, folders, files, state.reusedDirectories);
   }
   const durationMs = (performance.now?.() ?? Date.now()) - started;
-  const entries = [...state.allFolders, ...state.allFiles];
-  return {
-    url: rootNode.url,
-    root: rootNode,
-    folders: state.allFolders,
-    files: state.allFiles,
-    entries,
+  const timings = instrument?.finish();
+  const rest = {
     generatedAt: new Date().toISOString(),
     errors: state.errors,
+    directories: state.directories,
+    ...(diff ? { diff } : {}),
     stats: {
       fetches: state.stats.fetches,
       iframes: state.stats.iframes,
       heads: state.stats.heads,
+      headsAvoided: state.stats.headsAvoided,
+      cacheHits: state.stats.cacheHits,
+      cacheMisses: state.stats.cacheMisses,
+      coalesced: state.stats.coalesced,
+      concurrency: state.scheduler.concurrency,
+      peakConcurrency: state.scheduler.peak,
+      retries: state.scheduler.retried,
+      pruned: state.pruned,
+      truncated: scope.expired,
+      ...(timings && opts.timings ? { timings } : {}),
       durationMs,
       maxDepth: state.maxDepthEncountered
     }
   };
+  if (!rootNode) return compactResult(compact!, rest);
+  return {
+    url: rootNode.url,
+    root: rootNode,
+    folders: state.allFolders,
+    files: state.allFiles,
+    entries: [...state.allFolders, ...state.allFiles],
+    ...rest
+  };
 }
@@ -0,0 +1,53 @@
+import { FolderApiOptions, FolderApiStreamEvent } from './types.js';
+import { normalizeOptions } from './options.js';
+import { claimStart, createRecursionState, walk } from './core/recursion.js';
+import { enrichMime } from './core/mime.js';
+import { createInstrumentation } from './core/instrument.js';
+import { abortReason, crawlScope } from './utils/abort.js';
+import { pushError } from './utils/errors.js';
+
+// Yields each directory's entries as soon as its listing is parsed (depth-first order).
+// Nothing is accumulated across directories; new listing fetches are only scheduled while the consumer pulls.
+export async function* folderApiStream(url: string, options?: FolderApiOptions): AsyncGenerator<FolderApiStreamEvent> {
+  const normalized = normalizeOptions(options);
+  const scope = crawlScope(normalized.signal, normalized.totalTimeoutMs);
+  const opts = scope.signal === normalized.signal ? normalized : { ...normalized, signal: scope.signal };
+  const instrument = createInstrumentation(opts, url);
+  const state = createRecursionState(opts, instrument, scope);
+  const root = claimStart(url, state);
+  let directories = 0;
+  try {
+    if (root) {
+      for await (const batch of walk(root, opts, state)) {
+        if (opts.includeMime) await enrichMime(batch.files, opts, state.stats, state.errors, state.scheduler, instrument);
+        if (normalized.signal?.aborted) throw abortReason(normalized.signal); // aborted while HEADs were running
+        for (const error of state.errors.splice(0)) yield { type: 'error', error };
+        directories++;
+        yield {
+          type: 'directory',
+          url: batch.directory.url,
+          depth: batch.depth,
+          directory: batch.directory,
+          folders: batch.folders,
+          files: batch.files
+        };
+        yield {
+          type: 'progress',
+          directories,
+          entries: state.safetyCount,
+          pruned: state.pruned,
+          fetches: state.stats.fetches,
+          iframes: state.stats.iframes,
+          heads: state.stats.heads,
+          concurrency: state.scheduler.concurrency
+        };
+      }
+    }
+    if (scope.expired) pushError(state.errors, 'limit', `crawl stopped at totalTimeoutMs (${opts.totalTimeoutMs})`);
+    for (const error of state.errors.splice(0)) yield { type: 'error', error };
+  } finally {
+    scope.dispose();
+    if (!opts.session) state.scheduler.dispose(); // this call's own scheduler
+    instrument?.finish(); // closes the crawl measure (performance marks)
+  }
+}
@@ -1,2 +1,9 @@
 export * from './types.js';
 export { folderApiRequest } from './folderApiRequest.js';
+export { folderApiStream } from './folderApiStream.js';
+export { folderApiOpen } from './folderApiOpen.js';
+export { FolderApiSession } from './core/session.js';
+export { MemoryListingCache } from './core/listingCache.js';
+export { IndexedDbListingCache } from './core/idbListingCache.js';
+export { terminateParseWorkers } from './core/parseWorkers.js';
+export { releaseIframes } from './core/iframeDirectory.js';
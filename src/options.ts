@@ -1,13 +1,58 @@
 import { FolderApiOptions, NormalizedOptions } from './types.js';
+import { defaultListingCache } from './core/listingCache.js';
+import { indexPrevious } from './core/incremental.js';
+import { MIME_TYPES } from './utils/mimeTypes.js';
+import { compileGlobs } from './utils/glob.js';
 
 export function normalizeOptions(opts: FolderApiOptions | undefined): NormalizedOptions {
+  // a session owns the scheduler, so its limits replace the call's
+  const session = opts?.session ?? null;
   return {
     maxDepth: Math.max(0, opts?.maxDepth ?? 0),
     mode: opts?.mode ?? 'auto',
     includeMime: opts?.includeMime ?? false,
-  headConcurrency: Math.max(1, opts?.headConcurrency ?? 4),
+    mimeStrategy: opts?.mimeStrategy ?? 'head',
+    mimeTypes: opts?.mimeTypes ? { ...MIME_TYPES, ...normalizeMimeTypes(opts.mimeTypes) } : MIME_TYPES,
+  headConcurrency: session ? session.limits.head : Math.max(1, opts?.headConcurrency ?? 4),
+    directoryConcurrency: session ? session.limits.listing : Math.max(1, opts?.directoryConcurrency ?? 1),
+    originConcurrency: session ? session.limits.perOrigin : Math.max(1, opts?.originConcurrency ?? 6),
+    iframeConcurrency: Math.max(1, Math.floor(opts?.iframeConcurrency ?? 2)),
+    adaptiveConcurrency: session ? session.limits.adaptive ?? true : opts?.adaptiveConcurrency ?? true,
+    retries: session ? session.limits.retries ?? 2 : Math.max(0, opts?.retries ?? 2),
     timeoutMs: Math.max(100, opts?.timeoutMs ?? 15000),
+    totalTimeoutMs: opts?.totalTimeoutMs != null ? Math.max(1, opts.totalTimeoutMs) : Infinity,
+    maxListingBytes: Math.max(1024, Math.floor(opts?.maxListingBytes ?? 32 * 1024 * 1024)),
+    maxEntriesPerDirectory: Math.max(1, Math.floor(opts?.maxEntriesPerDirectory ?? 50000)),
     sameOriginOnly: opts?.sameOriginOnly ?? true,
+    includeGlobs: compileGlobs(opts?.includeGlobs),
+    excludeGlobs: compileGlobs(opts?.excludeGlobs),
+    skipHidden: opts?.skipHidden ?? false,
+    filter: opts?.filter ?? null,
+    maxResults: opts?.maxResults != null ? Math.max(1, Math.floor(opts.maxResults)) : Infinity,
+    parser: opts?.parser ?? 'auto',
+    parseInWorker: opts?.parseInWorker === true ? hardwareConcurrency() : Math.max(0, Math.floor(Number(opts?.parseInWorker) || 0)),
+    preferJson: opts?.preferJson ?? false,
+    resultFormat: opts?.resultFormat === 'compact' ? 'compact' : 'full',
+    cache: opts?.cache === true ? defaultListingCache() : opts?.cache === undefined ? session?.cache ?? null : opts.cache || null,
+    session,
+    previous: opts?.previous ? indexPrevious(opts.previous) : null,
+    incremental: opts?.incremental ?? 'revalidate',
+    hooks: opts?.hooks ?? null,
+    timings: opts?.timings ?? false,
+    performanceMarks: opts?.performanceMarks ?? false,
     signal: opts?.signal
   };
 }
+
+// Pool size for parseInWorker: true; 4 where the platform does not say.
+function hardwareConcurrency(): number {
+  const n = (globalThis as any).navigator?.hardwareConcurrency;
+  return typeof n === 'number' && n > 0 ? n : 4;
+}
+
+// Keys are matched against lowercased extensions without the dot.
+function normalizeMimeTypes(table: Record<string, string>): Record<string, string> {
+  const out: Record<string, string> = {};
+  for (const [ext, mime] of Object.entries(table)) out[ext.replace(/^\./, '').toLowerCase()] = mime;
+  return out;
+}
@@ -1,3 +1,6 @@
+import type { Glob } from './utils/glob.js';
+import type { FolderApiSession } from './core/session.js';
+
 export type EntryKind = 'file' | 'folder';
 export type FolderRole = 'root' | 'self' | 'parent' | 'child';
 
@@ -5,12 +8,59 @@ export interface FolderApiOptions {
   maxDepth?: number; // default 0
   mode?: 'fetch' | 'iframe' | 'auto'; // default auto
   includeMime?: boolean; // default false
+  mimeStrategy?: 'infer' | 'infer-then-head' | 'head'; // default head
+  mimeTypes?: Record<string, string>; // extra extension -> MIME entries, merged over the built-in table
   headConcurrency?: number; // default 4
+  directoryConcurrency?: number; // default 1 (sequential listing fetches)
+  originConcurrency?: number; // default 6; max in-flight listing GETs + HEADs per origin
+  iframeConcurrency?: number; // default 2; pooled iframes for iframe / auto-fallback listing loads
+  adaptiveConcurrency?: boolean; // default true; AIMD per-origin limit between 1 and originConcurrency
+  retries?: number; // default 2; retries after 429 / 503 / timeout (jittered backoff, honors Retry-After)
   timeoutMs?: number; // default 15000 per directory
+  totalTimeoutMs?: number; // default none; whole-crawl budget (folderApiRequest / folderApiStream): stops and returns what was collected, with stats.truncated
+  maxListingBytes?: number; // default 32 MiB; a fetched listing body is read up to this many bytes, then cancelled (partial result + `limit:` error)
+  maxEntriesPerDirectory?: number; // default 50000; entries kept per listing (partial result + `limit:` error)
   sameOriginOnly?: boolean; // default true
+  includeGlobs?: string[]; // keep only files matching one of these; folders are listed only if a match could be below them
+  excludeGlobs?: string[]; // drop matching files and folders (matching folders are not listed)
+  skipHidden?: boolean; // default false; drop dot-files and dot-folders (not listed)
+  filter?: (entry: FolderEntry | FileEntry) => boolean; // false drops the entry; a dropped folder is not listed
+  maxResults?: number; // stop once this many files were collected; outstanding listing loads are cancelled
+  parser?: 'dom' | 'tokenizer' | 'auto'; // default auto (DOMParser when available)
+  parseInWorker?: boolean | number; // default false; parse listings on a worker pool (true = navigator.hardwareConcurrency workers, number = pool size)
+  preferJson?: boolean; // default false; ask for JSON listings (nginx autoindex_format json, Caddy browse) with exact sizes / dates
+  resultFormat?: 'full' | 'compact'; // default full; compact = struct-of-arrays store, entry arrays / tree built on first access
+  cache?: boolean | ListingCacheStore; // default false (the session's cache with `session`); true = shared in-memory LRU
+  session?: FolderApiSession; // shared scheduler, cache and in-flight listing loads across calls
+  previous?: FolderApiSnapshot; // earlier result to refresh against; adds `diff` to the result
+  incremental?: 'revalidate' | 'subtree'; // default revalidate (only used with previous)
+  hooks?: FolderApiHooks; // optional per-phase callbacks
+  timings?: boolean; // default false; adds stats.timings
+  performanceMarks?: boolean; // default false; performance.mark / measure per directory, fetch, parse, HEAD
   signal?: AbortSignal; // optional
 }
 
+// Options of `new FolderApiSession()`; with `session`, the call's own values for these are not used.
+export type FolderApiSessionOptions = Pick<FolderApiOptions, 'originConcurrency' | 'directoryConcurrency' | 'headConcurrency' | 'adaptiveConcurrency' | 'retries' | 'cache'>;
+
+// Instrumentation callbacks; times are milliseconds from performance.now(). Exceptions thrown by hooks are ignored.
+export interface FolderApiHooks {
+  onDirectoryStart?(event: { url: string; depth: number }): void;
+  onFetchEnd?(event: { url: string; via: 'fetch' | 'iframe'; ms: number; bytes: number; status: number | null; notModified: boolean }): void;
+  onParseEnd?(event: { url: string; ms: number; documentMs: number; heuristicsMs: number; folders: number; files: number }): void;
+  onHeadEnd?(event: { url: string; ms: number; status: number | null }): void;
+}
+
+export interface FolderApiTimings {
+  networkMs: number; // summed listing request time (fetch / iframe); concurrent requests add up
+  parseMs: number;
+  documentMs: number; // part of parseMs: DOMParser / tokenizer
+  heuristicsMs: number; // part of parseMs: metadata text, classification, date / size parsing
+  headMs: number; // summed HEAD time
+  bytes: number; // listing bytes downloaded (Content-Length, else body length)
+  directories: { count: number; p50Ms: number; p95Ms: number; maxMs: number }; // per-directory load (fetch + parse)
+}
+
 export interface BaseEntry {
   kind: EntryKind;
   url: string; // absolute normalized
@@ -43,27 +93,205 @@ export interface FolderApiResult {
   entries: Array<FolderEntry | FileEntry>;
   generatedAt: string;
   errors: string[];
+  directories: Record<string, ListingValidators>; // every listed directory -> validators of its response
+  diff?: FolderApiDiff; // only when options.previous was given
+  compact?: CompactEntryStore; // only with resultFormat: 'compact'
   stats: {
     fetches: number;
     iframes: number;
     heads: number;
+    headsAvoided: number; // files given a MIME type without a HEAD request
+    cacheHits: number; // listings revalidated with 304 (no download, no parse)
+    cacheMisses: number; // listings downloaded + parsed while a cache was enabled
+    coalesced: number; // listings taken from another call's in-flight load (same session)
+    concurrency: number; // per-origin request limit at the end of the crawl (the session's, with `session`)
+    peakConcurrency: number; // most requests in flight at once
+    retries: number; // requests retried after 429 / 503 / timeout
+    pruned: number; // folders dropped by skipHidden / includeGlobs / excludeGlobs / filter (never listed)
+    truncated: boolean; // totalTimeoutMs ran out: the result holds what was collected until then
+    timings?: FolderApiTimings; // only with options.timings
     durationMs: number;
     maxDepth: number;
   };
 }
 
+// Entry storage behind resultFormat: 'compact' (core/compact.ts). Indexes run over every listed entry in
+// crawl order (tree order, so a folder listed twice appears twice); folderIndexes() / fileIndexes() give
+// the entries of `folders` / `files`, in order, without materializing them.
+export interface CompactEntryStore {
+  readonly count: number;
+  readonly directoryPrefixes: readonly string[]; // interned URL prefixes (up to the last '/')
+  kindAt(i: number): EntryKind;
+  urlAt(i: number): string;
+  nameAt(i: number): string;
+  sizeAt(i: number): number | null;
+  dateAt(i: number): string | null;
+  entryAt(i: number): FolderEntry | FileEntry; // a fresh object per call
+  folderIndexes(): Int32Array;
+  fileIndexes(): Int32Array;
+}
+
+// Minimal part of a FolderApiResult needed to refresh against it (JSON-serializable).
+export type FolderApiSnapshot = Pick<FolderApiResult, 'url' | 'folders' | 'files'> & Partial<Pick<FolderApiResult, 'directories'>>;
+
+export interface FolderApiDiff {
+  added: Array<FolderEntry | FileEntry>;
+  removed: Array<FolderEntry | FileEntry>; // entries from the previous result
+  modified: Array<{ before: FolderEntry | FileEntry; after: FolderEntry | FileEntry }>; // same kind + url, date or size changed
+  reusedDirectories: number; // listings taken from previous (304 or unchanged folder date) instead of parsed
+}
+
+export interface ListingValidators {
+  etag: string | null;
+  lastModified: string | null;
+}
+
+export type FolderApiStreamEvent =
+  | {
+      type: 'directory';
+      url: string; // directory that was listed
+      depth: number; // 0 = start directory
+      directory: FolderEntry;
+      folders: FolderEntry[]; // as listed (role assigned; not deduped across directories)
+      files: FileEntry[];
+    }
+  | {
+      type: 'progress';
+      directories: number; // directories yielded so far
+      entries: number; // entries counted toward the safety limit
+      pruned: number; // folders dropped by filters so far
+      fetches: number;
+      iframes: number;
+      heads: number;
+      concurrency: number; // current per-origin request limit
+    }
+  | { type: 'error'; error: string }; // same prefixed strings as FolderApiResult.errors
+
+// Lazily expanded folder returned by folderApiOpen(). `node` (and the arrays below) fill in when the folder is
+// expanded; every handle of one folderApiOpen() call shares its scheduler, cache, visited set, stats and errors.
+export interface FolderHandle {
+  readonly url: string;
+  readonly depth: number; // 0 = start folder
+  readonly node: FolderNode; // children / files appended by expand()
+  readonly status: 'idle' | 'loading' | 'expanded' | 'error';
+  readonly error: string | null; // message of the last failed expand()
+  readonly children: FolderHandle[]; // child folders, once expanded
+  readonly folders: FolderEntry[]; // folders the listing links to, with roles (the start folder also gets root / parent)
+  readonly files: FileEntry[];
+  // Lists the folder (once; later calls resolve immediately). Rejects on failure or when `signal` aborts.
+  expand(options?: { signal?: AbortSignal }): Promise<FolderHandle>;
+  // Loads the listing ahead of expand() (e.g. on hover). Never rejects; failures are retried by expand().
+  prefetch(options?: { signal?: AbortSignal }): Promise<void>;
+  // Prefetches the children of an expanded folder one at a time; `idle` waits for requestIdleCallback before each.
+  prefetchChildren(options?: { signal?: AbortSignal; idle?: boolean }): Promise<void>;
+}
+
+export interface FolderRootHandle extends FolderHandle {
+  readonly errors: string[]; // same prefixed strings as FolderApiResult.errors, for every expansion so far
+  readonly directories: Record<string, ListingValidators>;
+  readonly stats: FolderApiOpenStats;
+  find(url: string): FolderHandle | undefined; // handle of a folder already seen in an expanded listing
+  close(): void; // cancels pending loads, HEADs and backoff waits; later expand() calls reject
+}
+
+export interface FolderApiOpenStats {
+  fetches: number;
+  iframes: number;
+  heads: number;
+  headsAvoided: number;
+  cacheHits: number;
+  cacheMisses: number;
+  coalesced: number;
+  concurrency: number;
+  peakConcurrency: number;
+  retries: number;
+  pruned: number;
+  expanded: number; // folders expanded
+  prefetched: number; // listings loaded by prefetch() / prefetchChildren()
+  maxDepth: number; // deepest expanded folder
+}
+
 export interface InternalDirectoryParse {
   folders: Array<Partial<FolderEntry> & { url: string }>; // may miss role, depth until normalized
   files: Array<Partial<FileEntry> & { url: string }>; // size/date may be null
   errors: string[];
 }
 
+// Candidate anchor found by a parser engine; metadata() is the row / line text around it.
+export interface ListingAnchor {
+  href: string; // raw attribute value (entities decoded)
+  metadata(): string;
+}
+
+// Parsed listing kept by a ListingCacheStore, with the validators needed to revalidate it.
+export interface CachedListing extends ListingValidators {
+  variant: string; // parse-affecting options the entry was produced with
+  parsed: InternalDirectoryParse;
+  bytes: number; // approximate in-memory size
+}
+
+// Keyed by normalized directory URL. Methods may be sync or async.
+export interface ListingCacheStore {
+  get(key: string): CachedListing | undefined | Promise<CachedListing | undefined>;
+  set(key: string, value: CachedListing): void | Promise<void>;
+  delete(key: string): void | Promise<void>;
+}
+
+export interface ListingCacheLimits {
+  maxEntries?: number; // default 500
+  maxBytes?: number; // default 32 MiB (approximate entry sizes)
+}
+
+export interface IndexedDbListingCacheOptions extends ListingCacheLimits {
+  dbName?: string; // default 'folder-api'
+  storeName?: string; // default 'listings'
+}
+
+// Index over options.previous built once per call (see core/incremental.ts).
+export interface PreviousCrawl {
+  listings: Map<string, PreviousListing>; // normalized directory URL -> its listing in the previous result
+  folders: FolderEntry[];
+  files: FileEntry[];
+}
+
+export interface PreviousListing {
+  date: string | null; // the directory's own date as listed by its parent
+  validators: ListingValidators;
+  parsed: InternalDirectoryParse;
+}
+
 export interface NormalizedOptions {
   maxDepth: number;
   mode: 'fetch' | 'iframe' | 'auto';
   includeMime: boolean;
+  mimeStrategy: 'infer' | 'infer-then-head' | 'head';
+  mimeTypes: Readonly<Record<string, string>>;
   headConcurrency: number;
+  directoryConcurrency: number;
+  originConcurrency: number;
+  iframeConcurrency: number;
+  adaptiveConcurrency: boolean;
+  retries: number;
   timeoutMs: number;
+  totalTimeoutMs: number; // Infinity = no crawl deadline
+  maxListingBytes: number;
+  maxEntriesPerDirectory: number;
   sameOriginOnly: boolean;
+  includeGlobs: Glob[] | null;
+  excludeGlobs: Glob[] | null;
+  skipHidden: boolean;
+  filter: ((entry: FolderEntry | FileEntry) => boolean) | null;
+  maxResults: number; // Infinity = no cap
+  parser: 'dom' | 'tokenizer' | 'auto';
+  parseInWorker: number; // max parse workers; 0 = parse on the calling thread
+  preferJson: boolean;
+  resultFormat: 'full' | 'compact';
+  cache: ListingCacheStore | null;
+  session: FolderApiSession | null;
+  previous: PreviousCrawl | null;
+  incremental: 'revalidate' | 'subtree';
+  hooks: FolderApiHooks | null;
+  timings: boolean;
+  performanceMarks: boolean;
   signal?: AbortSignal;
 }
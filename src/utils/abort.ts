@@ -0,0 +1,67 @@
+// Signal that aborts as soon as any of `signals` does; undefined when none were given.
+export function anySignal(...signals: Array<AbortSignal | undefined>): AbortSignal | undefined {
+  const list = signals.filter((s): s is AbortSignal => s != null);
+  if (list.length <= 1) return list[0];
+  const any = (AbortSignal as any).any;
+  if (typeof any === 'function') return any.call(AbortSignal, list);
+  // Fallback for engines without AbortSignal.any: listeners stay until one of the signals aborts.
+  const controller = new AbortController();
+  const onAbort = (ev: Event) => {
+    for (const s of list) s.removeEventListener('abort', onAbort);
+    controller.abort((ev.target as AbortSignal).reason);
+  };
+  for (const s of list) {
+    if (s.aborted) {
+      controller.abort(s.reason);
+      break;
+    }
+    s.addEventListener('abort', onAbort, { once: true });
+  }
+  if (controller.signal.aborted) for (const s of list) s.removeEventListener('abort', onAbort);
+  return controller.signal;
+}
+
+// What an aborted operation rejects with: the signal's reason, else an AbortError.
+export function abortReason(signal: AbortSignal): unknown {
+  return signal.reason ?? new DOMException('The operation was aborted.', 'AbortError');
+}
+
+// Aborts `controller` when `signal` does; the returned function detaches the listener again, so a long-lived
+// signal does not collect one listener per request.
+export function linkSignal(signal: AbortSignal | undefined, controller: AbortController): () => void {
+  if (!signal) return () => {};
+  if (signal.aborted) {
+    controller.abort(signal.reason);
+    return () => {};
+  }
+  const onAbort = () => controller.abort(signal.reason);
+  signal.addEventListener('abort', onAbort, { once: true });
+  return () => signal.removeEventListener('abort', onAbort);
+}
+
+// Cancellation scope of one crawl: `signal` aborts with the caller's signal or once `totalTimeoutMs` has passed
+// (`expired` tells the two apart). dispose() clears the timer and detaches from the caller's signal.
+export interface CrawlScope {
+  readonly signal: AbortSignal | undefined;
+  readonly expired: boolean;
+  dispose(): void;
+}
+
+export function crawlScope(signal: AbortSignal | undefined, totalTimeoutMs: number): CrawlScope {
+  if (!Number.isFinite(totalTimeoutMs)) return { signal, expired: false, dispose() {} };
+  const controller = new AbortController();
+  const unlink = linkSignal(signal, controller);
+  const scope = {
+    signal: controller.signal,
+    expired: false,
+    dispose() {
+      clearTimeout(timer);
+      unlink();
+    }
+  };
+  const timer = setTimeout(() => {
+    scope.expired = true;
+    controller.abort(new DOMException('crawl deadline reached', 'TimeoutError'));
+  }, totalTimeoutMs);
+  return scope;
+}
@@ -1,43 +1,95 @@
-// Date parsing heuristics -> returns ISO 8601 UTC string or null, pushes errors when ambiguous
-export function parseDateMeta(text: string, errors: string[]): string | null {
-  const t = text;
+// Day / month order of purely numeric dates (`03/04/2024`), decided per listing (see core/rowSchema.ts).
+export type NumericDateOrder = 'mdy' | 'dmy';
+
+// One date layout found in listing metadata. `toIso` turns a match into an ISO 8601 UTC string, or null when the
+// numbers are out of range or the day / month order is unknown.
+export interface DateFormat {
+  name: 'iso' | 'apache' | 'numeric';
+  re: RegExp;
+  toIso(m: RegExpExecArray, order: NumericDateOrder | null): string | null;
+}
+
+export const DATE_FORMATS: readonly DateFormat[] = [
   // 1. ISO-ish YYYY-MM-DD[ T]HH:MM(:SS)?
-  let m = /(\d{4})-(\d{2})-(\d{2})[ T](\d{2}):(\d{2})(?::(\d{2}))?/.exec(t);
-  if (m) {
-    const [ , Y, Mo, D, H, Mi, S] = m;
-    const date = new Date(Date.UTC(Number(Y), Number(Mo)-1, Number(D), Number(H), Number(Mi), Number(S ?? '0')));
-    return date.toISOString();
-  }
+  {
+    name: 'iso',
+    re: /(\d{4})-(\d{2})-(\d{2})[ T](\d{2}):(\d{2})(?::(\d{2}))?/,
+    toIso: m => utcIso(Number(m[1]), Number(m[2]), Number(m[3]), Number(m[4]), Number(m[5]), Number(m[6] ?? '0'))
+  },
   // 2. DD-Mon-YYYY HH:MM (Apache style)
-  m = /(\d{2})-(\w{3})-(\d{4})\s(\d{2}):(\d{2})/.exec(t);
-  if (m) {
-    const [ , D, Mon, Y, H, Mi] = m;
-    const monthIndex = shortMonthToIndex(Mon);
-    if (monthIndex != null) {
-      return new Date(Date.UTC(Number(Y), monthIndex, Number(D), Number(H), Number(Mi), 0)).toISOString();
+  {
+    name: 'apache',
+    re: /(\d{2})-(\w{3})-(\d{4})\s(\d{2}):(\d{2})/,
+    toIso: m => {
+      const monthIndex = shortMonthToIndex(m[2]);
+      return monthIndex == null ? null : utcIso(Number(m[3]), monthIndex + 1, Number(m[1]), Number(m[4]), Number(m[5]), 0);
     }
-  }
-  // 3. US M/D/YYYY HH:MM( AM| PM)
-  m = /(\d{1,2})\/(\d{1,2})\/(\d{4})\s(\d{1,2}):(\d{2})(?:\s?(AM|PM))/i.exec(t);
-  if (m) {
-    const [ , M, D, Y, Hh, Mi, ap] = m;
-    let H = Number(Hh);
-    if (ap) {
-      if (/am/i.test(ap)) {
-        if (H === 12) H = 0; // midnight
-      } else if (/pm/i.test(ap)) {
-        if (H !== 12) H += 12;
+  },
+  // 3. Numeric M/D/YYYY or D/M/YYYY, HH:MM(:SS)?( AM| PM)? – IIS pads single-digit hours with a second space
+  {
+    name: 'numeric',
+    re: /\b(\d{1,2})\/(\d{1,2})\/(\d{4})\s+(\d{1,2}):(\d{2})(?::(\d{2}))?(?:\s?(AM|PM)\b)?/i,
+    toIso: (m, order) => {
+      const ap = m[7];
+      // A 12-hour clock is the US convention, so AM / PM implies month first unless the listing says otherwise.
+      const resolved = order ?? (ap ? 'mdy' : null);
+      if (!resolved) return null;
+      const M = Number(m[resolved === 'mdy' ? 1 : 2]);
+      const D = Number(m[resolved === 'mdy' ? 2 : 1]);
+      if (M < 1 || M > 12 || D < 1 || D > 31) return null;
+      let H = Number(m[4]);
+      if (ap) {
+        if (/am/i.test(ap)) {
+          if (H === 12) H = 0; // midnight
+        } else if (H !== 12) {
+          H += 12;
+        }
       }
+      return utcIso(Number(m[3]), M, D, H, Number(m[5]), Number(m[6] ?? '0'));
     }
-    return new Date(Date.UTC(Number(Y), Number(M)-1, Number(D), H, Number(Mi), 0)).toISOString();
+  }
+];
+
+// Date parsing heuristics -> returns ISO 8601 UTC string or null, pushes errors when ambiguous.
+// Without `order`, numeric dates are only read when they carry AM / PM.
+export function parseDateMeta(text: string, errors: string[], order: NumericDateOrder | null = null): string | null {
+  for (const format of DATE_FORMATS) {
+    const m = format.re.exec(text);
+    if (!m) continue;
+    const iso = format.toIso(m, order);
+    if (iso) return iso;
   }
   // Ambiguous purely numeric? treat unknown
-  if (/\b\d{1,2}[-/]\d{1,2}[-/]\d{2,4}\b/.test(t)) {
+  if (/\b\d{1,2}[-/]\d{1,2}[-/]\d{2,4}\b/.test(text)) {
     errors.push('date: ambiguous numeric date pattern');
   }
   return null;
 }
 
+// What one numeric date match says about the listing's order: a first number above 12 can only be a day.
+export function numericDateOrder(m: RegExpExecArray): NumericDateOrder | null {
+  if (Number(m[1]) > 12) return 'dmy';
+  if (Number(m[2]) > 12) return 'mdy';
+  return null;
+}
+
+// Same string as new Date(Date.UTC(...)).toISOString(), which costs more than the rest of a row's parsing; it is
+// only called for fields that would roll over (31 Feb, 24:00) or two-digit years.
+function utcIso(Y: number, M: number, D: number, H: number, Mi: number, S: number): string {
+  if (Y >= 1000 && M >= 1 && M <= 12 && D >= 1 && D <= daysInMonth(Y, M) && H < 24 && Mi < 60 && S < 60) {
+    return `${Y}-${pad2(M)}-${pad2(D)}T${pad2(H)}:${pad2(Mi)}:${pad2(S)}.000Z`;
+  }
+  return new Date(Date.UTC(Y, M-1, D, H, Mi, S)).toISOString();
+}
+
+function daysInMonth(Y: number, M: number): number {
+  return M === 2 ? (Y % 4 === 0 && (Y % 100 !== 0 || Y % 400 === 0) ? 29 : 28) : [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31][M-1];
+}
+
+function pad2(n: number): string {
+  return n < 10 ? '0' + n : String(n);
+}
+
 function shortMonthToIndex(mon: string): number | null {
   const idx = ['jan','feb','mar','apr','may','jun','jul','aug','sep','oct','nov','dec'].indexOf(mon.toLowerCase());
   return idx >=0 ? idx : null;
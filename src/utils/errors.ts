@@ -1,3 +1,9 @@
 export function pushError(errors: string[], prefix: string, message: string) {
   errors.push(`${prefix}: ${message}`);
 }
+
+// What a listing fetch, iframe load or HEAD rejects with when timeoutMs passes. Deliberately not an
+// OverloadError: a timeout is not retried, and auto mode treats a fetch timeout like any other fetch failure.
+export function timeoutError(): Error {
+  return new Error('timeout');
+}
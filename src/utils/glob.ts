@@ -0,0 +1,126 @@
+// includeGlobs / excludeGlobs patterns, matched against paths relative to the start folder: decoded segments
+// joined by '/', without leading or trailing slash ('videos/2024/clip.mp4'). `*` and `?` stay within one
+// segment, `**` spans zero or more segments, `[...]` and `{a,b}` work as in shells. A pattern without a '/'
+// matches the name at any depth (as in .gitignore); a trailing '/' restricts it to folders.
+export class Glob {
+  private readonly segments: Array<RegExp | null>; // null = '**'
+  private readonly folderOnly: boolean;
+
+  constructor(readonly source: string, pattern: string = source) {
+    let p = pattern.replace(/^\.\//, '');
+    this.folderOnly = p.endsWith('/');
+    p = p.replace(/\/+$/, '');
+    if (p.startsWith('/')) p = p.slice(1);
+    else if (!p.includes('/')) p = `**/${p}`;
+    this.segments = p.split('/').filter(Boolean).map(seg => seg === '**' ? null : segmentRegex(seg, source));
+  }
+
+  matches(path: string, folder: boolean): boolean {
+    if (this.folderOnly && !folder) return false;
+    return matchFrom(this.segments, 0, split(path), 0);
+  }
+
+  // True when some entry below the folder could match (used to prune folders for includeGlobs).
+  matchesBelow(folderPath: string): boolean {
+    const segs = split(folderPath);
+    const pat = this.segments;
+    let pi = 0;
+    for (let si = 0; si < segs.length; si++, pi++) {
+      if (pi >= pat.length) return false;
+      const p = pat[pi];
+      if (p === null) return true;
+      if (!p.test(segs[si])) return false;
+    }
+    return pi < pat.length;
+  }
+}
+
+// One Glob per brace alternative; null when no patterns were given. Throws on a malformed pattern.
+export function compileGlobs(patterns: readonly string[] | undefined): Glob[] | null {
+  if (!patterns?.length) return null;
+  return patterns.flatMap(source => expandBraces(source).map(p => new Glob(source, p)));
+}
+
+// Path of `url` relative to `basePath` (a directory pathname), decoded per segment; no trailing slash.
+// URLs outside basePath are given from the origin root.
+export function relativeGlobPath(url: string, basePath: string): string {
+  const pathname = new URL(url).pathname;
+  const rel = pathname.startsWith(basePath) ? pathname.slice(basePath.length) : pathname.slice(1);
+  return split(rel).map(decodeSegment).join('/');
+}
+
+function split(path: string): string[] {
+  return path.split('/').filter(Boolean);
+}
+
+function decodeSegment(segment: string): string {
+  try {
+    return decodeURIComponent(segment);
+  } catch {
+    return segment;
+  }
+}
+
+function matchFrom(pat: Array<RegExp | null>, pi: number, segs: string[], si: number): boolean {
+  for (; pi < pat.length; pi++, si++) {
+    const p = pat[pi];
+    if (p === null) {
+      for (let k = si; k <= segs.length; k++) if (matchFrom(pat, pi + 1, segs, k)) return true;
+      return false;
+    }
+    if (si >= segs.length || !p.test(segs[si])) return false;
+  }
+  return si === segs.length;
+}
+
+function segmentRegex(seg: string, source: string): RegExp {
+  let re = '';
+  for (let i = 0; i < seg.length; i++) {
+    const c = seg[i];
+    if (c === '*') {
+      while (seg[i + 1] === '*') i++;
+      re += '[^/]*';
+    } else if (c === '?') {
+      re += '[^/]';
+    } else if (c === '[') {
+      const end = seg.indexOf(']', i + 2);
+      if (end < 0) {
+        re += '\\[';
+        continue;
+      }
+      let body = seg.slice(i + 1, end).replace(/\\/g, '\\\\');
+      if (body[0] === '!') body = '^' + body.slice(1);
+      re += `[${body}]`;
+      i = end;
+    } else {
+      re += c.replace(/[.+^${}()|\\\]]/g, '\\$&');
+    }
+  }
+  try {
+    return new RegExp(`^${re}$`);
+  } catch {
+    throw new Error(`invalid glob: ${source}`);
+  }
+}
+
+function expandBraces(pattern: string): string[] {
+  const open = pattern.indexOf('{');
+  if (open < 0) return [pattern];
+  let depth = 0;
+  let start = open + 1;
+  const parts: string[] = [];
+  for (let i = open; i < pattern.length; i++) {
+    const c = pattern[i];
+    if (c === '{') depth++;
+    else if (c === '}' && --depth === 0) {
+      parts.push(pattern.slice(start, i));
+      const head = pattern.slice(0, open);
+      const tails = expandBraces(pattern.slice(i + 1));
+      return parts.flatMap(part => expandBraces(part).flatMap(p => tails.map(t => head + p + t)));
+    } else if (c === ',' && depth === 1) {
+      parts.push(pattern.slice(start, i));
+      start = i + 1;
+    }
+  }
+  return [pattern]; // unbalanced: literal
+}
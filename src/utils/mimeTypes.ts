@@ -0,0 +1,107 @@
+// Extension (lowercase, no dot) -> MIME type for files typically found in directory listings.
+export const MIME_TYPES: Readonly<Record<string, string>> = {
+  // text / documents
+  txt: 'text/plain',
+  log: 'text/plain',
+  md: 'text/markdown',
+  csv: 'text/csv',
+  tsv: 'text/tab-separated-values',
+  htm: 'text/html',
+  html: 'text/html',
+  css: 'text/css',
+  js: 'text/javascript',
+  mjs: 'text/javascript',
+  xml: 'application/xml',
+  json: 'application/json',
+  yaml: 'application/yaml',
+  yml: 'application/yaml',
+  ics: 'text/calendar',
+  rtf: 'application/rtf',
+  pdf: 'application/pdf',
+  doc: 'application/msword',
+  docx: 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+  xls: 'application/vnd.ms-excel',
+  xlsx: 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+  ppt: 'application/vnd.ms-powerpoint',
+  pptx: 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+  odt: 'application/vnd.oasis.opendocument.text',
+  ods: 'application/vnd.oasis.opendocument.spreadsheet',
+  epub: 'application/epub+zip',
+  // images
+  jpg: 'image/jpeg',
+  jpeg: 'image/jpeg',
+  png: 'image/png',
+  gif: 'image/gif',
+  webp: 'image/webp',
+  avif: 'image/avif',
+  svg: 'image/svg+xml',
+  ico: 'image/vnd.microsoft.icon',
+  bmp: 'image/bmp',
+  tif: 'image/tiff',
+  tiff: 'image/tiff',
+  heic: 'image/heic',
+  // audio
+  mp3: 'audio/mpeg',
+  m4a: 'audio/mp4',
+  aac: 'audio/aac',
+  wav: 'audio/wav',
+  flac: 'audio/flac',
+  ogg: 'audio/ogg',
+  oga: 'audio/ogg',
+  opus: 'audio/opus',
+  mid: 'audio/midi',
+  midi: 'audio/midi',
+  // video
+  mp4: 'video/mp4',
+  m4v: 'video/mp4',
+  mkv: 'video/x-matroska',
+  webm: 'video/webm',
+  mov: 'video/quicktime',
+  avi: 'video/x-msvideo',
+  wmv: 'video/x-ms-wmv',
+  mpg: 'video/mpeg',
+  mpeg: 'video/mpeg',
+  ogv: 'video/ogg',
+  ts: 'video/mp2t',
+  m3u8: 'application/vnd.apple.mpegurl',
+  vtt: 'text/vtt',
+  srt: 'application/x-subrip',
+  // archives / binaries
+  zip: 'application/zip',
+  gz: 'application/gzip',
+  tgz: 'application/gzip',
+  bz2: 'application/x-bzip2',
+  xz: 'application/x-xz',
+  zst: 'application/zstd',
+  '7z': 'application/x-7z-compressed',
+  rar: 'application/vnd.rar',
+  tar: 'application/x-tar',
+  iso: 'application/x-iso9660-image',
+  dmg: 'application/x-apple-diskimage',
+  exe: 'application/vnd.microsoft.portable-executable',
+  msi: 'application/x-msi',
+  deb: 'application/vnd.debian.binary-package',
+  rpm: 'application/x-rpm',
+  apk: 'application/vnd.android.package-archive',
+  jar: 'application/java-archive',
+  wasm: 'application/wasm',
+  bin: 'application/octet-stream',
+  img: 'application/octet-stream',
+  // fonts
+  woff: 'font/woff',
+  woff2: 'font/woff2',
+  ttf: 'font/ttf',
+  otf: 'font/otf'
+};
+
+// Lowercased text after the last dot of a file name ('' when there is none, or only a leading dot).
+export function fileExtension(name: string): string {
+  const dot = name.lastIndexOf('.');
+  if (dot <= 0 || dot === name.length - 1) return '';
+  return name.slice(dot + 1).toLowerCase();
+}
+
+export function inferMime(name: string, table: Readonly<Record<string, string>> = MIME_TYPES): string | null {
+  const ext = fileExtension(name);
+  return ext && Object.prototype.hasOwnProperty.call(table, ext) ? table[ext] : null;
+}
@@ -0,0 +1,240 @@
+import { abortReason } from './abort.js';
+
+export type RequestKind = 'listing' | 'head';
+
+export interface SchedulerLimits {
+  perOrigin: number; // ceiling for in-flight requests per origin (all kinds)
+  listing: number; // in-flight listing loads across origins
+  head: number; // in-flight HEADs across origins
+  adaptive?: boolean; // default true: AIMD between 1 and perOrigin, starting small
+  retries?: number; // default 2: extra attempts after an OverloadError
+  retryBaseMs?: number; // default 200: first backoff step (doubles per attempt, jittered)
+  signal?: AbortSignal; // stops queued waits, retries and backoff waits (default for run()'s own signal)
+}
+
+// Server pushback (429 / 503): shrinks the origin's limit and is retried. Timeouts are not overload: a hung
+// request says nothing about the server's capacity, and waiting out another timeoutMs rarely helps.
+export class OverloadError extends Error {
+  constructor(message: string, readonly retryAfterMs: number | null = null) {
+    super(message);
+    this.name = 'OverloadError';
+  }
+}
+
+interface OriginQueue {
+  active: number;
+  limit: number; // fractional; floor() slots are usable
+  waiting: Record<RequestKind, Array<() => void>>; // aborted waiters remove themselves
+  lastKind: RequestKind;
+  minLatencyMs: number;
+  epoch: number; // bumped on every decrease; requests started in an older epoch cannot decrease again
+  pausedUntil: number;
+  wake?: ReturnType<typeof setTimeout>; // armed only while requests wait out a Retry-After pause
+}
+
+const LISTING_FIRST: RequestKind[] = ['listing', 'head'];
+const HEAD_FIRST: RequestKind[] = ['head', 'listing'];
+const INITIAL_LIMIT = 2;
+const FLAT_LATENCY_SLACK_MS = 10;
+
+// Shared admission control for listing GETs and HEADs. Each origin has one budget; when a slot frees,
+// kinds take turns (round robin) so a long HEAD backlog cannot starve traversal and vice versa.
+// The budget is adaptive (AIMD): +1 slot per window of successes while latency stays near the best seen,
+// halved on 429 / 503, and paused for Retry-After.
+export class RequestScheduler {
+  private readonly origins = new Map<string, OriginQueue>();
+  private readonly kindActive: Record<RequestKind, number> = { listing: 0, head: 0 };
+  private readonly adaptive: boolean;
+  private readonly retries: number;
+  private readonly retryBaseMs: number;
+  private active = 0;
+  peak = 0;
+  retried = 0;
+
+  constructor(private readonly limits: SchedulerLimits) {
+    this.adaptive = limits.adaptive ?? true;
+    this.retries = Math.max(0, limits.retries ?? 2);
+    this.retryBaseMs = Math.max(0, limits.retryBaseMs ?? 200);
+  }
+
+  get inFlight(): number { return this.active; }
+
+  // Current per-origin limit (the largest across origins seen so far).
+  get concurrency(): number {
+    let max = 0;
+    for (const origin of this.origins.values()) max = Math.max(max, Math.floor(origin.limit));
+    return max || this.initialLimit();
+  }
+
+  // signal: a request still queued when it aborts rejects at once without taking a slot; also stops retries /
+  // backoff waits. A shared scheduler serves callers with different signals.
+  async run<T>(url: string, kind: RequestKind, task: () => Promise<T>, signal: AbortSignal | undefined = this.limits.signal): Promise<T> {
+    const origin = this.originFor(url);
+    for (let attempt = 0; ; attempt++) {
+      await this.slot(origin, kind, signal);
+      const epoch = origin.epoch;
+      const started = now();
+      let overload: OverloadError;
+      try {
+        const result = await task();
+        this.onSuccess(origin, now() - started);
+        return result;
+      } catch (e) {
+        if (!(e instanceof OverloadError)) throw e;
+        this.onOverload(origin, epoch, e.retryAfterMs);
+        if (attempt >= this.retries || signal?.aborted) throw e;
+        overload = e;
+      } finally {
+        origin.active--;
+        this.kindActive[kind]--;
+        this.active--;
+        this.pumpAll();
+      }
+      this.retried++;
+      const backoff = this.retryBaseMs * 2 ** attempt * (0.5 + Math.random());
+      await sleep(Math.max(overload.retryAfterMs ?? 0, backoff), signal);
+      if (signal?.aborted) throw overload;
+    }
+  }
+
+  private slot(origin: OriginQueue, kind: RequestKind, signal: AbortSignal | undefined): Promise<void> {
+    if (signal?.aborted) return Promise.reject(abortReason(signal));
+    return new Promise<void>((resolve, reject) => {
+      const queue = origin.waiting[kind];
+      const grant = () => {
+        signal?.removeEventListener('abort', onAbort);
+        resolve();
+      };
+      const onAbort = () => {
+        const index = queue.indexOf(grant);
+        if (index >= 0) queue.splice(index, 1);
+        reject(abortReason(signal!));
+        this.pump(origin); // drops the wake timer once nothing waits
+      };
+      queue.push(grant);
+      signal?.addEventListener('abort', onAbort, { once: true });
+      this.pump(origin);
+    });
+  }
+
+  // Clears pending Retry-After wake timers; a scheduler owned by one finished call must not keep them alive.
+  dispose() {
+    for (const origin of this.origins.values()) clearWake(origin);
+  }
+
+  private initialLimit(): number {
+    return this.adaptive ? Math.min(INITIAL_LIMIT, this.limits.perOrigin) : this.limits.perOrigin;
+  }
+
+  private onSuccess(origin: OriginQueue, latencyMs: number) {
+    if (!this.adaptive) return;
+    origin.minLatencyMs = Math.min(origin.minLatencyMs, latencyMs);
+    // Latency near the best observed means the origin is not queueing yet: additive increase.
+    if (latencyMs <= origin.minLatencyMs * 2 + FLAT_LATENCY_SLACK_MS) {
+      origin.limit = Math.min(this.limits.perOrigin, origin.limit + 1 / Math.floor(origin.limit));
+    }
+  }
+
+  private onOverload(origin: OriginQueue, epoch: number, retryAfterMs: number | null) {
+    if (retryAfterMs != null && retryAfterMs > 0) {
+      origin.pausedUntil = Math.max(origin.pausedUntil, now() + retryAfterMs);
+    }
+    if (!this.adaptive || epoch !== origin.epoch) return; // one decrease per round of in-flight requests
+    origin.epoch++;
+    origin.limit = Math.max(1, Math.floor(origin.limit / 2));
+  }
+
+  private originFor(url: string): OriginQueue {
+    let key: string;
+    try {
+      key = new URL(url).origin;
+    } catch {
+      key = url;
+    }
+    let origin = this.origins.get(key);
+    if (!origin) {
+      origin = {
+        active: 0,
+        limit: this.initialLimit(),
+        waiting: { listing: [], head: [] },
+        lastKind: 'head',
+        minLatencyMs: Infinity,
+        epoch: 0,
+        pausedUntil: 0
+      };
+      this.origins.set(key, origin);
+    }
+    return origin;
+  }
+
+  private pump(origin: OriginQueue) {
+    if (origin.waiting.listing.length === 0 && origin.waiting.head.length === 0) {
+      clearWake(origin);
+      return;
+    }
+    const wait = origin.pausedUntil - now();
+    if (wait > 0) {
+      if (!origin.wake) {
+        origin.wake = setTimeout(() => {
+          origin.wake = undefined;
+          this.pump(origin);
+        }, wait);
+      }
+      return;
+    }
+    while (origin.active < Math.floor(origin.limit)) {
+      const kind = this.nextKind(origin);
+      if (!kind) return;
+      origin.waiting[kind].shift()!();
+      origin.lastKind = kind;
+      origin.active++;
+      this.kindActive[kind]++;
+      this.active++;
+      this.peak = Math.max(this.peak, this.active);
+    }
+  }
+
+  // Kind limits are global, so a release on one origin can unblock another.
+  private pumpAll() {
+    for (const origin of this.origins.values()) this.pump(origin);
+  }
+
+  private nextKind(origin: OriginQueue): RequestKind | null {
+    for (const kind of origin.lastKind === 'listing' ? HEAD_FIRST : LISTING_FIRST) {
+      if (origin.waiting[kind].length > 0 && this.kindActive[kind] < this.limits[kind]) return kind;
+    }
+    return null;
+  }
+}
+
+// Retry-After is either delta-seconds or an HTTP date.
+export function parseRetryAfter(value: string | null, nowMs = Date.now()): number | null {
+  if (!value) return null;
+  const trimmed = value.trim();
+  if (/^\d+$/.test(trimmed)) return Number(trimmed) * 1000;
+  const at = Date.parse(trimmed);
+  return isNaN(at) ? null : Math.max(0, at - nowMs);
+}
+
+function clearWake(origin: OriginQueue) {
+  if (origin.wake === undefined) return;
+  clearTimeout(origin.wake);
+  origin.wake = undefined;
+}
+
+function now(): number {
+  return performance.now?.() ?? Date.now();
+}
+
+function sleep(ms: number, signal?: AbortSignal): Promise<void> {
+  return new Promise(resolve => {
+    if (signal?.aborted) return resolve();
+    const done = () => {
+      clearTimeout(timer);
+      signal?.removeEventListener('abort', done);
+      resolve();
+    };
+    const timer = setTimeout(done, ms);
+    signal?.addEventListener('abort', done, { once: true });
+  });
+}
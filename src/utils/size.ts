@@ -1,9 +1,10 @@
+const POW: Record<string, number> = { '':0, 'B':0, 'K':1, 'KB':1, 'M':2, 'MB':2, 'G':3, 'GB':3, 'T':4, 'TB':4, 'P':5, 'PB':5 };
+
 // Parses sizes in forms like 1, 1K, 1.2M, 4G, 12KB etc. Binary interpretation only.
 // Strategy: strip common date/time patterns, ignore numbers embedded in words, then choose largest magnitude.
 export function parseSizeMeta(text: string): number | null {
   const cleaned = stripDateTime(text);
   const re = /(\d+(?:\.\d+)?)([KMGTP]?B?)/gi;
-  const pow = { '':0, 'B':0, 'K':1, 'KB':1, 'M':2, 'MB':2, 'G':3, 'GB':3, 'T':4, 'TB':4, 'P':5, 'PB':5 } as const;
   interface Token { bytes: number; unit: string; raw: string; index: number; }
   const tokens: Token[] = [];
   let m: RegExpExecArray | null;
@@ -11,7 +12,7 @@ export function parseSizeMeta(text: string): number | null {
     const raw = m[0];
     const value = Number(m[1]);
     const unit = (m[2] || '').toUpperCase();
-    const p = (pow as any)[unit];
+    const p = POW[unit];
     if (isNaN(value) || p === undefined) continue;
     if (isEmbeddedInWord(cleaned, m.index, raw.length)) continue;
     // Skip tokens that are very likely part of a date year (4 digits followed by - or / nearby)
@@ -47,11 +48,18 @@ export function parseSizeMeta(text: string): number | null {
   return target.bytes;
 }
 
+// A whole size-column cell (`150`, `1.2M`, `4KB`) -> bytes, read the same way as parseSizeMeta reads a token;
+// null for anything else.
+export function sizeTokenBytes(token: string): number | null {
+  const m = /^(\d+(?:\.\d+)?)([KMGTP]?B?)$/i.exec(token);
+  return m ? Math.floor(Number(m[1]) * Math.pow(1024, POW[m[2].toUpperCase()])) : null;
+}
+
 function stripDateTime(text: string): string {
   let out = text;
   out = out.replace(/\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}(?::\d{2})?/g, ' ');
   out = out.replace(/\d{2}-\w{3}-\d{4}\s\d{2}:\d{2}/g, ' ');
-  out = out.replace(/\d{1,2}\/\d{1,2}\/\d{2,4}\s\d{1,2}:\d{2}(?:\s?(?:AM|PM))?/gi, ' ');
+  out = out.replace(/\d{1,2}\/\d{1,2}\/\d{2,4}\s+\d{1,2}:\d{2}(?::\d{2})?(?:\s?(?:AM|PM))?/gi, ' ');
   return out;
 }
 
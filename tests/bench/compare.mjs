@@ -0,0 +1,97 @@
+// Compares a `vitest bench --reporter=json --outputFile=<file>` report with tests/bench/baseline.json.
+//
+//   node tests/bench/compare.mjs bench-results.json            fail (exit 1) when a benchmark regressed
+//   node tests/bench/compare.mjs bench-results.json --update   rewrite the baseline from the report
+//
+// Means are divided by the calibration benchmark's mean (when both sides have it) so a baseline recorded on
+// one machine stays usable on another. A benchmark fails when its normalized mean exceeds the baseline by more
+// than its threshold (per-entry `threshold`, else BENCH_THRESHOLD, else the baseline's `threshold`, 1.25).
+// Benchmarks faster than `minMs` in the baseline are reported but not enforced (timer noise).
+import { readFileSync, writeFileSync } from 'node:fs';
+import { fileURLToPath } from 'node:url';
+
+const BASELINE = fileURLToPath(new URL('./baseline.json', import.meta.url));
+const CALIBRATION = 'metadata heuristics > calibration';
+
+const args = process.argv.slice(2);
+const update = args.includes('--update');
+const reportFile = args.find(a => !a.startsWith('--')) ?? 'bench-results.json';
+
+const current = collect(JSON.parse(readFileSync(reportFile, 'utf8')));
+if (current.size === 0) {
+  console.error(`no benchmark results found in ${reportFile}`);
+  process.exit(1);
+}
+let baseline = { threshold: 1.25, minMs: 0.05, benchmarks: {} };
+try {
+  baseline = { ...baseline, ...JSON.parse(readFileSync(BASELINE, 'utf8')) };
+} catch {
+  // first run
+}
+
+if (update) {
+  const benchmarks = {};
+  for (const [key, mean] of [...current].sort(([a], [b]) => a.localeCompare(b))) {
+    benchmarks[key] = { ...baseline.benchmarks[key], mean: round(mean) };
+  }
+  // one benchmark per line keeps baseline diffs readable
+  const lines = Object.entries(benchmarks).map(([key, value]) => `    ${JSON.stringify(key)}: ${JSON.stringify(value)}`);
+  const { benchmarks: _, ...settings } = baseline;
+  const head = JSON.stringify(settings, null, 2).slice(0, -2);
+  writeFileSync(BASELINE, `${head},\n  "benchmarks": {\n${lines.join(',\n')}\n  }\n}\n`);
+  console.log(`baseline updated: ${current.size} benchmarks`);
+  process.exit(0);
+}
+
+const threshold = Number(process.env.BENCH_THRESHOLD) || baseline.threshold;
+const scale = current.has(CALIBRATION) && baseline.benchmarks[CALIBRATION]
+  ? baseline.benchmarks[CALIBRATION].mean / current.get(CALIBRATION)
+  : 1;
+const regressions = [];
+let compared = 0;
+for (const [key, mean] of current) {
+  const base = baseline.benchmarks[key];
+  if (!base || key === CALIBRATION) continue;
+  compared++;
+  const ratio = (mean * scale) / base.mean;
+  const limit = base.threshold ?? threshold;
+  const enforced = base.mean >= baseline.minMs;
+  const mark = ratio > limit ? (enforced ? 'FAIL' : 'noisy') : 'ok';
+  if (mark === 'FAIL') regressions.push(key);
+  if (mark !== 'ok' || process.env.VERBOSE) {
+    console.log(`${mark.padEnd(5)} ${key}: ${fmt(base.mean)} -> ${fmt(mean * scale)} (x${ratio.toFixed(2)}, limit x${limit})`);
+  }
+}
+const missing = Object.keys(baseline.benchmarks).filter(k => !current.has(k));
+const added = [...current.keys()].filter(k => !baseline.benchmarks[k]);
+if (missing.length) console.log(`not run (kept in baseline): ${missing.length}`);
+if (added.length) console.log(`no baseline yet (npm run bench:baseline): ${added.join(', ')}`);
+console.log(`${compared} compared, ${regressions.length} regressed${scale !== 1 ? `, machine scale x${scale.toFixed(2)}` : ''}`);
+process.exit(regressions.length ? 1 : 0);
+
+// Accepts both report shapes: { testResults: { [suite]: [result] } } (vitest 1) and
+// { files: [{ groups: [{ fullName, benchmarks: [result] }] }] } (vitest 2+). Keys are `<suite> > <bench>`.
+function collect(node, group = '', out = new Map()) {
+  if (Array.isArray(node)) {
+    for (const item of node) collect(item, group, out);
+  } else if (node && typeof node === 'object') {
+    if (typeof node.name === 'string' && typeof node.mean === 'number') {
+      out.set(`${group} > ${node.name}`, node.mean);
+      return out;
+    }
+    if (typeof node.fullName === 'string') group = node.fullName.split(' > ').pop();
+    for (const [key, value] of Object.entries(node)) {
+      const named = Array.isArray(value) && !['files', 'groups', 'benchmarks'].includes(key);
+      collect(value, named ? key : group, out);
+    }
+  }
+  return out;
+}
+
+function round(ms) {
+  return Number(ms.toPrecision(4));
+}
+
+function fmt(ms) {
+  return ms >= 1 ? `${ms.toFixed(1)}ms` : `${(ms * 1000).toFixed(1)}µs`;
+}
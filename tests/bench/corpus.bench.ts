@@ -0,0 +1,30 @@
+import { bench, describe } from 'vitest';
+import { parseDirectoryHtml } from '../../src/core/parseDirectory.js';
+import { normalizeOptions } from '../../src/options.js';
+import { openCorpus, type CorpusListing } from '../corpus.js';
+
+// Parses every successful listing of a collected corpus (scripts/collect_listings.py --corpus), per server.
+// Opt-in: FOLDER_API_CORPUS=path/to/listings.corpus. Listings stay compressed on disk until the setup
+// of a server's benchmark streams them in.
+const file = process.env.FOLDER_API_CORPUS;
+const corpus = file ? await openCorpus(file) : null;
+
+describe.skipIf(!corpus)('parse collected corpus', () => {
+  for (const server of corpus?.servers() ?? []) {
+    for (const parser of ['dom', 'tokenizer'] as const) {
+      const opts = normalizeOptions({ parser });
+      let listings: CorpusListing[] = [];
+      bench(`${server} (${parser})`, () => {
+        for (const l of listings) parseDirectoryHtml(`http://127.0.0.1/${l.path}`, l.body, opts);
+      }, {
+        iterations: 5,
+        time: 0,
+        setup: async () => {
+          listings = [];
+          for await (const l of corpus!.listings({ server, kind: 'html' })) listings.push(l);
+        },
+        teardown: () => { listings = []; }
+      });
+    }
+  }
+});
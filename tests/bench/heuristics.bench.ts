@@ -0,0 +1,40 @@
+import { bench, describe } from 'vitest';
+import { parseDateMeta } from '../../src/utils/date.js';
+import { parseSizeMeta } from '../../src/utils/size.js';
+import { classifyEntry } from '../../src/utils/classify.js';
+import { parseRowMeta } from '../../src/core/rowSchema.js';
+import { LAYOUT_NAMES, SIZES, listing, runOptions } from './listings.js';
+
+// Per-row heuristics over the metadata text of generated listings (what entriesFromAnchors hands them).
+describe('metadata heuristics', () => {
+  // Fixed pure-JS workload; compare.mjs divides every mean by this one to factor out machine speed.
+  bench('calibration', () => {
+    let seed = 1;
+    const values: number[] = [];
+    for (let i = 0; i < 20_000; i++) {
+      seed = (seed * 16807) % 2147483647;
+      values.push(seed);
+    }
+    values.sort((a, b) => a - b).map(v => v.toString(36)).join('');
+  });
+
+  for (const layout of LAYOUT_NAMES) {
+    for (const rows of SIZES) {
+      const options = { ...runOptions(rows), setup: () => { listing(layout, rows); } };
+      bench(`${layout} ${rows} rows parseDateMeta`, () => {
+        const errors: string[] = [];
+        for (const r of listing(layout, rows).rows) parseDateMeta(r.metadata, errors);
+      }, options);
+      bench(`${layout} ${rows} rows parseSizeMeta`, () => {
+        for (const r of listing(layout, rows).rows) parseSizeMeta(r.metadata);
+      }, options);
+      // What entriesFromAnchors runs: the schema inferred once, then the fast path per row
+      bench(`${layout} ${rows} rows parseRowMeta`, () => {
+        parseRowMeta(listing(layout, rows).rows.map(r => r.metadata), []);
+      }, options);
+      bench(`${layout} ${rows} rows classifyEntry`, () => {
+        for (const r of listing(layout, rows).rows) classifyEntry(r.href, r.metadata);
+      }, options);
+    }
+  }
+});
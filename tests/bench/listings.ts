@@ -0,0 +1,100 @@
+import apacheFancy from '../../server/apache-fancy/index.html?raw';
+import apacheStd from '../../server/apache-std/index.html?raw';
+import deno from '../../server/deno/index.html?raw';
+import glitch from '../../server/glitch/index.html?raw';
+import iis from '../../server/iis/index.html?raw';
+import nginx from '../../server/nginx/index.html?raw';
+
+// Scales each captured page in server/*/index.html to any row count: the page's own entry rows are
+// repeated (cycling through them) with a unique `<i>-` prefix on every name, and spliced back in place
+// of the original rows, so markup, whitespace and metadata formats stay exactly what the server emits.
+interface Layout {
+  page: string;
+  row: RegExp; // one entry row (global); parent-directory rows are excluded by the pattern
+}
+
+export const LAYOUTS: Record<string, Layout> = {
+  'apache-fancy': { page: apacheFancy, row: /^<tr><td valign="top"><img [^>]*alt="\[(?!PARENTDIR)[^"]*\]">.*<\/tr>$/gm },
+  'apache-std': { page: apacheStd, row: /^<li><a href="\/server\/[^"]+">[^<]+<\/a><\/li>$/gm },
+  deno: { page: deno, row: /<tr>\s*<td class="mode">[\s\S]*?<\/tr>/g },
+  glitch: { page: glitch, row: /^ *<li><a href="(?!\/")[^"]+"[^>]*>.*<\/li>$/gm },
+  iis: { page: iis, row: /\s*\d+\/\d+\/\d{4}\s+\d+:\d+ [AP]M\s+(?:&lt;dir&gt;|\d+) <A HREF="[^"]+">[^<]+<\/A><br>/g },
+  nginx: { page: nginx, row: /^<a href="(?!\.\.\/)[^"]+">[^<]+<\/a>.*$/gm }
+};
+
+export const LAYOUT_NAMES = Object.keys(LAYOUTS);
+
+export interface GeneratedRow {
+  href: string; // as written in the page
+  metadata: string; // row text (what the parser hands to the date / size / classify heuristics)
+}
+
+export interface GeneratedListing {
+  html: string;
+  rows: GeneratedRow[];
+}
+
+export function generateListing(layout: string, rows: number): GeneratedListing {
+  const { page, row } = LAYOUTS[layout];
+  const matches = [...page.matchAll(row)];
+  if (matches.length < 2) throw new Error(`no entry rows found in ${layout} page`);
+  const start = matches[0].index!;
+  const last = matches[matches.length - 1];
+  const end = last.index! + last[0].length;
+  const separator = page.slice(matches[0].index! + matches[0][0].length, matches[1].index!);
+  const templates = matches.map(m => splitAtNames(m[0]));
+  const out: string[] = [];
+  const meta: GeneratedRow[] = [];
+  for (let i = 0; i < rows; i++) {
+    const html = templates[i % templates.length].join(`${i}-`);
+    out.push(html);
+    meta.push({ href: /href="([^"]+)"/i.exec(html)![1], metadata: rowText(html) });
+  }
+  return { html: page.slice(0, start) + out.join(separator) + page.slice(end), rows: meta };
+}
+
+// Splits a row right before every occurrence of its entry name (href segment, link text, title),
+// encoded or not, so joining the pieces with a prefix renames the entry.
+function splitAtNames(html: string): string[] {
+  const href = /href="([^"]+)"/i.exec(html)![1];
+  const encoded = href.replace(/\/$/, '').split('/').pop()!;
+  const decoded = decodeURIComponent(encoded);
+  const names = [...new Set([encoded, decoded])].map(n => n.replace(/[.*+?^${}()|[\]\\]/g, '\\$&'));
+  const pieces: string[] = [];
+  let last = 0;
+  for (const m of html.matchAll(new RegExp(`(?<=[/"'>]\\s*)(?:${names.join('|')})(?=\\s*[/"'<]|$)`, 'g'))) {
+    pieces.push(html.slice(last, m.index));
+    last = m.index!;
+  }
+  pieces.push(html.slice(last));
+  return pieces;
+}
+
+function rowText(html: string): string {
+  return html
+    .replace(/<\/t[dh]>/gi, ' ')
+    .replace(/<[^>]+>/g, '')
+    .replace(/&lt;/g, '<')
+    .replace(/&gt;/g, '>')
+    .replace(/&nbsp;/g, ' ')
+    .replace(/&amp;/g, '&')
+    .trim();
+}
+
+export const SIZES = [100, 10_000, 100_000];
+
+// Fewer samples for the big listings so a full run stays within minutes (tinybench still reports rme).
+export function runOptions(rows: number) {
+  if (rows >= 100_000) return { iterations: 3, time: 0, warmupIterations: 1, warmupTime: 0 };
+  if (rows >= 10_000) return { iterations: 10, time: 0 };
+  return { time: 200 };
+}
+
+// Single-slot cache: consecutive benchmarks reuse the page, and at most one large page is alive at a time.
+let cached: { key: string; listing: GeneratedListing } | null = null;
+
+export function listing(layout: string, rows: number): GeneratedListing {
+  const key = `${layout} ${rows}`;
+  if (cached?.key !== key) cached = { key, listing: generateListing(layout, rows) };
+  return cached.listing;
+}
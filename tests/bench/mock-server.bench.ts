@@ -0,0 +1,59 @@
+import { bench, describe } from 'vitest';
+import { spawn, type ChildProcess } from 'node:child_process';
+import { fileURLToPath } from 'node:url';
+import { folderApiRequest } from '../../src/folderApiRequest.js';
+import type { FolderApiOptions } from '../../src/types.js';
+
+// End-to-end crawls against mock_servers/run.py: a seeded tree 3 levels deep (1 + 6 + 36 + 216 directories,
+// 20 files each) answering after 5±3ms, rendered by every layout. Needs python with fastapi + uvicorn
+// (FOLDER_API_PYTHON overrides the interpreter); skipped when the server cannot start.
+const TREE = ['--synthetic', '--seed', '1', '--fanout', '6', '--depth', '3', '--files', '20', '--latency', '5', '--jitter', '3'];
+const PORT_OFFSET = 100; // 8201-8204, clear of a manually started server
+const PORTS: Record<string, number> = { apache: 8101, nginx: 8102, iis: 8103, caddy: 8104 };
+
+async function startServer(): Promise<ChildProcess | null> {
+  const script = fileURLToPath(new URL('../../mock_servers/run.py', import.meta.url));
+  const child = spawn(process.env.FOLDER_API_PYTHON ?? 'python3', [script, ...TREE, '--port-offset', String(PORT_OFFSET)], { stdio: ['ignore', 'pipe', 'inherit'] });
+  const ready = await new Promise<boolean>(resolve => {
+    const timer = setTimeout(() => resolve(false), 30_000);
+    const done = (ok: boolean) => {
+      clearTimeout(timer);
+      resolve(ok);
+    };
+    child.once('error', () => done(false));
+    child.once('exit', () => done(false));
+    child.stdout!.on('data', chunk => {
+      if (String(chunk).includes('servers ready')) done(true);
+    });
+  });
+  if (!ready) {
+    child.kill();
+    return null;
+  }
+  process.once('exit', () => child.kill());
+  return child;
+}
+
+const server = await startServer();
+if (!server) console.warn('[bench] mock server unavailable; skipping end-to-end benchmarks');
+const tree: { directories: number; files: number } | null = server
+  ? await (await fetch(`http://127.0.0.1:${PORTS.nginx + PORT_OFFSET}/__tree`)).json()
+  : null;
+
+async function crawl(layout: string, options: FolderApiOptions) {
+  const res = await folderApiRequest(`http://127.0.0.1:${PORTS[layout] + PORT_OFFSET}/root/`, { mode: 'fetch', maxDepth: 3, ...options });
+  // a faster crawl that lost entries is not an improvement
+  const children = res.folders.filter(f => f.role === 'child').length;
+  if (res.files.length !== tree!.files || children !== tree!.directories - 1) {
+    throw new Error(`${layout}: crawled ${res.files.length} files / ${children} folders, expected ${tree!.files} / ${tree!.directories - 1}`);
+  }
+}
+
+describe.skipIf(!server)('crawl mock server', () => {
+  const options = { iterations: 5, time: 0 };
+  for (const layout of Object.keys(PORTS)) {
+    bench(`${layout} (directoryConcurrency 4)`, () => crawl(layout, { directoryConcurrency: 4 }), options);
+  }
+  bench('nginx (sequential)', () => crawl('nginx', { directoryConcurrency: 1 }), options);
+  bench('nginx (includeMime infer-then-head)', () => crawl('nginx', { directoryConcurrency: 4, includeMime: true, mimeStrategy: 'infer-then-head' }), options);
+});
@@ -0,0 +1,19 @@
+import { bench, describe } from 'vitest';
+import { parseDirectoryHtml } from '../../src/core/parseDirectory.js';
+import { normalizeOptions } from '../../src/options.js';
+import { LAYOUT_NAMES, SIZES, listing, runOptions } from './listings.js';
+
+// Every captured layout at 100 / 10k / 100k rows, with both parser engines.
+// One suite on purpose: benchmarks of a suite run one after another, and the listing cache holds one page.
+describe('parseDirectoryHtml', () => {
+  for (const layout of LAYOUT_NAMES) {
+    for (const rows of SIZES) {
+      for (const parser of ['dom', 'tokenizer'] as const) {
+        const opts = normalizeOptions({ parser });
+        bench(`${layout} ${rows} rows (${parser})`, () => {
+          parseDirectoryHtml('http://127.0.0.1:8080/server/', listing(layout, rows).html, opts);
+        }, { ...runOptions(rows), setup: () => { listing(layout, rows); } });
+      }
+    }
+  }
+});
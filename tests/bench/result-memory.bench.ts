@@ -0,0 +1,79 @@
+import { bench, describe } from 'vitest';
+import { setFlagsFromString } from 'node:v8';
+import { runInNewContext } from 'node:vm';
+import { folderApiRequest } from '../../src/folderApiRequest.js';
+import type { FolderApiOptions } from '../../src/types.js';
+
+// Full vs compact results for a ~49k-entry crawl: time per crawl (benchmarks) and heap retained by the
+// result (printed once when the file loads: `[bench] retained heap ...`). Names are long-ish and mostly
+// plain ASCII, as in real trees; every file has a size and a date.
+const DIRS = 49;
+const FILES_PER_DIR = 1_000;
+
+function buildSite(): Map<string, string> {
+  const site = new Map<string, string>();
+  const rootRows: string[] = [];
+  for (let d = 0; d < DIRS; d++) {
+    const dir = `collection-${String(d).padStart(3, '0')}`;
+    rootRows.push(`<a href="${dir}/">${dir}/</a> 2024-03-01 12:00 -`);
+    const rows: string[] = [];
+    for (let f = 0; f < FILES_PER_DIR; f++) {
+      const name = `photo_${d}_${String(f).padStart(5, '0')}.jpg`;
+      rows.push(`<a href="${name}">${name}</a> 2024-03-${String(1 + (f % 28)).padStart(2, '0')} 12:${String(f % 60).padStart(2, '0')} ${f + 1}K`);
+    }
+    site.set(`/archive/${dir}/`, `<!doctype html><pre>\n${rows.join('\n')}\n</pre>`);
+  }
+  site.set('/archive/', `<!doctype html><pre>\n${rootRows.join('\n')}\n</pre>`);
+  return site;
+}
+
+const site = buildSite();
+const originalFetch = globalThis.fetch;
+
+function mockFetch() {
+  globalThis.fetch = async (resource: any) => {
+    const html = site.get(new URL(resource.toString()).pathname);
+    if (html == null) return new Response('', { status: 404 });
+    return new Response(html, { status: 200, headers: { 'content-type': 'text/html' } });
+  };
+}
+
+function restoreFetch() {
+  globalThis.fetch = originalFetch;
+}
+
+function crawl(options: FolderApiOptions) {
+  return folderApiRequest('https://example.com/archive/', { mode: 'fetch', maxDepth: 1, parser: 'tokenizer', ...options });
+}
+
+// --expose-gc at runtime, so no node flag is needed.
+setFlagsFromString('--expose-gc');
+const gc: () => void = runInNewContext('gc');
+
+async function retainedBytes(options: FolderApiOptions, touch?: (res: any) => unknown): Promise<{ bytes: number; entries: number }> {
+  mockFetch();
+  try {
+    gc();
+    const before = process.memoryUsage().heapUsed;
+    const res = await crawl(options);
+    touch?.(res);
+    gc();
+    const bytes = process.memoryUsage().heapUsed - before;
+    return { bytes, entries: res.compact?.count ?? res.entries.length };
+  } finally {
+    restoreFetch();
+  }
+}
+
+const mb = (n: number) => `${(n / 1024 / 1024).toFixed(1)} MB`;
+const full = await retainedBytes({});
+const compact = await retainedBytes({ resultFormat: 'compact' });
+const touched = await retainedBytes({ resultFormat: 'compact' }, res => res.files.length);
+console.log(`[bench] retained heap for ${full.entries} entries: full ${mb(full.bytes)}, compact ${mb(compact.bytes)} (x${(full.bytes / compact.bytes).toFixed(1)} smaller), compact after reading .files ${mb(touched.bytes)}`);
+
+describe('result format (49k entries)', () => {
+  const options = { iterations: 5, time: 0, setup: mockFetch, teardown: restoreFetch };
+  bench('full', () => crawl({}).then(() => {}), options);
+  bench('compact', () => crawl({ resultFormat: 'compact' }).then(() => {}), options);
+  bench('compact + materialize files', () => crawl({ resultFormat: 'compact' }).then(res => { void res.files.length; }), options);
+});
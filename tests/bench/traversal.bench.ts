@@ -0,0 +1,52 @@
+import { bench, describe } from 'vitest';
+import { folderApiRequest } from '../../src/folderApiRequest.js';
+
+// Synthetic tree: root -> N/100 folders -> 50 leaf folders + 49 files each (~N entries total).
+// Folder-heavy on purpose: folder dedupe is the bookkeeping that used to scale with n².
+// Listings are pre-rendered so the measured time is parse + traversal bookkeeping only.
+const ENTRIES_PER_DIR = 99;
+const SIZES = [1_000, 10_000, 50_000];
+
+function buildSite(totalEntries: number): Map<string, string> {
+  const dirs = Math.max(1, Math.floor(totalEntries / (ENTRIES_PER_DIR + 1)));
+  const site = new Map<string, string>();
+  const rootRows: string[] = [];
+  for (let d = 0; d < dirs; d++) {
+    rootRows.push(`<a href="d${d}/">d${d}/</a> 2024-03-01 12:00 -`);
+    const rows: string[] = [];
+    for (let f = 0; f < ENTRIES_PER_DIR; f++) {
+      rows.push(f % 2 === 0
+        ? `<a href="s${f}/">s${f}/</a> 2024-03-01 12:00 -`
+        : `<a href="f${f}.bin">f${f}.bin</a> 2024-03-01 12:00 ${f}K`);
+    }
+    site.set(`/root/d${d}/`, `<!doctype html><pre>\n${rows.join('\n')}\n</pre>`);
+  }
+  site.set('/root/', `<!doctype html><pre>\n${rootRows.join('\n')}\n</pre>`);
+  return site;
+}
+
+const sites = new Map(SIZES.map(n => [n, buildSite(n)]));
+const originalFetch = globalThis.fetch;
+let current = sites.get(SIZES[0])!;
+
+// Installed per benchmark through tinybench setup / teardown (bench mode does not run suite hooks).
+function mockFetch() {
+  globalThis.fetch = async (resource: any) => {
+    const html = current.get(new URL(resource.toString()).pathname);
+    if (html == null) return new Response('', { status: 404 });
+    return new Response(html, { status: 200, headers: { 'content-type': 'text/html' } });
+  };
+}
+
+function restoreFetch() {
+  globalThis.fetch = originalFetch;
+}
+
+describe('traversal scales linearly with entry count', () => {
+  for (const n of SIZES) {
+    bench(`${n} entries`, async () => {
+      current = sites.get(n)!;
+      await folderApiRequest('https://example.com/root/', { mode: 'fetch', maxDepth: 1 });
+    }, { iterations: 3, setup: mockFetch, teardown: restoreFetch });
+  }
+});
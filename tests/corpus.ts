@@ -0,0 +1,134 @@
+import { open, type FileHandle } from 'node:fs/promises';
+import { inflateSync } from 'node:zlib';
+
+// Reads the single-file listing corpus written by scripts/corpus.py (format described there). Only the
+// trailer and index are read on open; each listing is read from its offset and inflated when asked for,
+// so tests and benchmarks can walk tens of thousands of listings without unpacking them to disk.
+export interface CorpusEntry {
+  server: string;
+  path: string; // relative to the server root, trailing slash ('' = root)
+  kind: 'html' | 'error';
+  size: number; // uncompressed bytes
+  sha256: string;
+}
+
+export interface CorpusListing extends CorpusEntry {
+  body: string;
+}
+
+type BlobRecord = [offset: number, length: number, rawLength: number, sha256: string];
+type EntryRecord = [server: string, path: string, blob: number, kind: 'html' | 'error'];
+
+const MAGIC = 'FLDRCORP';
+const END_MAGIC = 'FLDRCEND';
+const HEADER_SIZE = 16;
+const TRAILER_SIZE = 24;
+
+export class Corpus {
+  private readonly byKey = new Map<string, EntryRecord>();
+
+  private constructor(private readonly file: FileHandle, private readonly blobs: BlobRecord[], private readonly records: EntryRecord[]) {
+    for (const r of records) this.byKey.set(`${r[0]}\n${r[1]}`, r);
+  }
+
+  static async open(path: string): Promise<Corpus> {
+    const file = await open(path, 'r');
+    try {
+      const { size } = await file.stat();
+      if (size < HEADER_SIZE + TRAILER_SIZE) throw new Error(`corpus: ${path} is too short`);
+      const header = await readAt(file, 0, HEADER_SIZE);
+      if (header.toString('latin1', 0, 8) !== MAGIC) throw new Error(`corpus: ${path} is not a listing corpus`);
+      if (header.readUInt32LE(8) !== 1) throw new Error(`corpus: unsupported version ${header.readUInt32LE(8)}`);
+      const found = await lastIndex(file, size);
+      if (!found) throw new Error(`corpus: ${path} has no trailer`);
+      const index = JSON.parse(inflateSync(await readAt(file, found.offset, found.length)).toString('utf8'));
+      return new Corpus(file, index.blobs, index.entries);
+    } catch (e) {
+      await file.close();
+      throw e;
+    }
+  }
+
+  get size(): number {
+    return this.records.length;
+  }
+
+  entries(server?: string): CorpusEntry[] {
+    return this.records.filter(r => server === undefined || r[0] === server).map(r => this.entry(r));
+  }
+
+  servers(): string[] {
+    return [...new Set(this.records.map(r => r[0]))];
+  }
+
+  has(server: string, path: string): boolean {
+    return this.byKey.has(`${server}\n${path}`);
+  }
+
+  async read(server: string, path: string): Promise<string | undefined> {
+    const record = this.byKey.get(`${server}\n${path}`);
+    return record ? this.body(record[2]) : undefined;
+  }
+
+  // Streams listings in file order (sequential reads); entries sharing a blob inflate it once.
+  async *listings(filter: { server?: string; kind?: 'html' | 'error' } = {}): AsyncGenerator<CorpusListing> {
+    const selected = this.records
+      .filter(r => (filter.server === undefined || r[0] === filter.server) && (filter.kind === undefined || r[3] === filter.kind))
+      .sort((a, b) => this.blobs[a[2]][0] - this.blobs[b[2]][0]);
+    let last = -1;
+    let body = '';
+    for (const r of selected) {
+      if (r[2] !== last) {
+        body = await this.body(r[2]);
+        last = r[2];
+      }
+      yield { ...this.entry(r), body };
+    }
+  }
+
+  close(): Promise<void> {
+    return this.file.close();
+  }
+
+  private entry([server, path, blob, kind]: EntryRecord): CorpusEntry {
+    return { server, path, kind, size: this.blobs[blob][2], sha256: this.blobs[blob][3] };
+  }
+
+  private async body(blob: number): Promise<string> {
+    const [offset, length] = this.blobs[blob];
+    return inflateSync(await readAt(this.file, offset, length)).toString('utf8');
+  }
+}
+
+export function openCorpus(path: string): Promise<Corpus> {
+  return Corpus.open(path);
+}
+
+// The index of the last complete trailer. Normally it ends the file; after an interrupted update the file ends
+// in partial blobs and the previous trailer is found by scanning back for its magic.
+async function lastIndex(file: FileHandle, size: number): Promise<{ offset: number; length: number } | null> {
+  const CHUNK = 1 << 16;
+  let hi = size;
+  while (hi > HEADER_SIZE) {
+    const lo = Math.max(HEADER_SIZE, hi - CHUNK);
+    const buffer = await readAt(file, lo, hi - lo);
+    for (let i = buffer.lastIndexOf(END_MAGIC, undefined, 'latin1'); i >= 0; i = i > 0 ? buffer.lastIndexOf(END_MAGIC, i - 1, 'latin1') : -1) {
+      const end = lo + i + END_MAGIC.length;
+      if (end < HEADER_SIZE + TRAILER_SIZE) continue;
+      const trailer = await readAt(file, end - TRAILER_SIZE, TRAILER_SIZE);
+      const offset = Number(trailer.readBigUInt64LE(0));
+      const length = trailer.readUInt32LE(8);
+      if (offset >= HEADER_SIZE && offset + length === end - TRAILER_SIZE) return { offset, length };
+    }
+    if (lo === HEADER_SIZE) break;
+    hi = lo + END_MAGIC.length - 1; // a magic split across two chunks is seen whole in the next one
+  }
+  return null;
+}
+
+async function readAt(file: FileHandle, position: number, length: number): Promise<Buffer> {
+  const buffer = Buffer.alloc(length);
+  const { bytesRead } = await file.read(buffer, 0, length, position);
+  if (bytesRead !== length) throw new Error('corpus: unexpected end of file');
+  return buffer;
+}
@@ -0,0 +1,84 @@
+import { describe, it, expect } from 'vitest';
+import { folderApiRequest } from '../../src/folderApiRequest.js';
+import { MemoryListingCache } from '../../src/core/listingCache.js';
+
+// root/ -> sub/ ; each listing has an ETag that changes when its version changes
+function mockServer(versions: Record<string, number>) {
+  const requests: Array<{ path: string; ifNoneMatch: string | null; status: number }> = [];
+  const fetchImpl = async (resource: any, init?: RequestInit) => {
+    const url = new URL(resource.toString());
+    const headers = new Headers(init?.headers);
+    const etag = `"${url.pathname}-${versions[url.pathname]}"`;
+    const ifNoneMatch = headers.get('if-none-match');
+    if (ifNoneMatch === etag) {
+      requests.push({ path: url.pathname, ifNoneMatch, status: 304 });
+      return new Response(null, { status: 304, headers: { etag } });
+    }
+    requests.push({ path: url.pathname, ifNoneMatch, status: 200 });
+    const rows = url.pathname === '/root/'
+      ? `<a href="sub/">sub/</a> 2024-03-01 12:00 -\n<a href="a.txt">a.txt</a> 2024-03-01 12:00 1K`
+      : `<a href="v${versions[url.pathname]}.txt">v${versions[url.pathname]}.txt</a> 2024-03-01 12:00 2K`;
+    return new Response(`<pre>\n${rows}\n</pre>`, { status: 200, headers: { 'content-type': 'text/html', etag } });
+  };
+  return { requests, fetchImpl };
+}
+
+async function withFetch<T>(impl: any, fn: () => Promise<T>): Promise<T> {
+  const originalFetch = globalThis.fetch;
+  globalThis.fetch = impl;
+  try {
+    return await fn();
+  } finally {
+    globalThis.fetch = originalFetch;
+  }
+}
+
+describe('listing cache', () => {
+  it('revalidates with If-None-Match and reuses the parsed listing on 304', async () => {
+    const versions = { '/root/': 1, '/root/sub/': 1 };
+    const server = mockServer(versions);
+    const cache = new MemoryListingCache();
+    const opts = { mode: 'fetch' as const, maxDepth: 1, cache };
+    const first = await withFetch(server.fetchImpl, () => folderApiRequest('https://example.com/root/', opts));
+    expect(first.stats.cacheMisses).toBe(2);
+    expect(first.stats.cacheHits).toBe(0);
+    expect(cache.size).toBe(2);
+
+    const second = await withFetch(server.fetchImpl, () => folderApiRequest('https://example.com/root/', opts));
+    expect(second.stats.cacheHits).toBe(2);
+    expect(second.stats.cacheMisses).toBe(0);
+    expect(second.stats.fetches).toBe(2);
+    expect(server.requests.slice(2).map(r => r.status)).toEqual([304, 304]);
+    expect(server.requests[2].ifNoneMatch).toBe('"/root/-1"');
+    expect(second.root).toEqual(first.root);
+    expect(second.files.map(f => f.url)).toEqual(first.files.map(f => f.url));
+
+    versions['/root/sub/'] = 2;
+    const third = await withFetch(server.fetchImpl, () => folderApiRequest('https://example.com/root/', opts));
+    expect(third.stats.cacheHits).toBe(1);
+    expect(third.stats.cacheMisses).toBe(1);
+    expect(third.files.map(f => f.name)).toEqual(['a.txt', 'v2.txt']);
+  });
+
+  it('sends no validators and counts nothing when the cache is off', async () => {
+    const server = mockServer({ '/root/': 1 });
+    const res = await withFetch(server.fetchImpl, () => folderApiRequest('https://example.com/root/', { mode: 'fetch' }));
+    const again = await withFetch(server.fetchImpl, () => folderApiRequest('https://example.com/root/', { mode: 'fetch' }));
+    expect(server.requests.every(r => r.ifNoneMatch === null)).toBe(true);
+    expect(again.stats.cacheHits).toBe(0);
+    expect(res.stats.cacheMisses).toBe(0);
+  });
+
+  it('falls back to a full fetch when the store fails', async () => {
+    const server = mockServer({ '/root/': 1 });
+    const broken = {
+      get: async () => { throw new Error('store down'); },
+      set: async () => { throw new Error('store down'); },
+      delete: async () => {}
+    };
+    const res = await withFetch(server.fetchImpl, () => folderApiRequest('https://example.com/root/', { mode: 'fetch', cache: broken }));
+    expect(res.files.length).toBe(1);
+    expect(res.errors).toEqual([]);
+    expect(res.stats.cacheMisses).toBe(1);
+  });
+});
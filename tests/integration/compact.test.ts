@@ -0,0 +1,98 @@
+import { describe, it, expect } from 'vitest';
+import { folderApiRequest } from '../../src/folderApiRequest.js';
+import { CompactEntries } from '../../src/core/compact.js';
+
+// root -> sub/ (a listing that also links back to itself and root), files with encoded / hidden names,
+// missing sizes and dates; every listing is served for depth 1.
+const LISTINGS: Record<string, string> = {
+  '/root/': `<pre>
+<a href="../">../</a>
+<a href="sub/">sub/</a>                2024-03-01 12:00    -
+<a href="caf%C3%A9%20menu.pdf">café menu.pdf</a>  2024-03-02 08:30  1.5M
+<a href=".env">.env</a>                2024-03-03 09:00  12
+<a href="notes.txt">notes.txt</a>      -                 -
+</pre>`,
+  '/root/sub/': `<pre>
+<a href="/root/">../</a>
+<a href="deeper/">deeper/</a>           01-Mar-2024 12:00    -
+<a href="image.png">image.png</a>       01-Mar-2024 12:00  2K
+<a href="archive.tar.gz">archive.tar.gz</a>  01-Mar-2024 12:00  3G
+</pre>`
+};
+
+async function crawl(options: any) {
+  const originalFetch = globalThis.fetch;
+  globalThis.fetch = async (resource: any, init?: any) => {
+    const path = new URL(resource.toString()).pathname;
+    if (init?.method === 'HEAD') return new Response('', { status: 200, headers: { 'content-type': 'application/x-head', 'content-length': '7' } });
+    const html = LISTINGS[path];
+    if (html == null) return new Response('', { status: 404 });
+    return new Response(html, { status: 200, headers: { 'content-type': 'text/html' } });
+  };
+  try {
+    return await folderApiRequest('https://example.com/root/', { mode: 'fetch', maxDepth: 1, ...options });
+  } finally {
+    globalThis.fetch = originalFetch;
+  }
+}
+
+function shape(res: Awaited<ReturnType<typeof crawl>>) {
+  return JSON.parse(JSON.stringify({ url: res.url, root: res.root, folders: res.folders, files: res.files, entries: res.entries, errors: res.errors }));
+}
+
+describe("resultFormat: 'compact'", () => {
+  it('materializes the same result as the default format', async () => {
+    const full = await crawl({});
+    const compact = await crawl({ resultFormat: 'compact' });
+    expect(full.compact).toBeUndefined();
+    expect(shape(compact)).toEqual(shape(full));
+    expect(compact.files.find(f => f.rawName === 'caf%C3%A9%20menu.pdf')?.name).toBe('café menu.pdf');
+    expect(compact.folders[0]).toBe(compact.root);
+  });
+
+  it('keeps MIME types and sizes filled in by HEAD enrichment', async () => {
+    const options = { includeMime: true, mimeStrategy: 'infer-then-head' };
+    const full = await crawl(options);
+    const compact = await crawl({ ...options, resultFormat: 'compact' });
+    expect(shape(compact)).toEqual(shape(full));
+    expect(compact.files.find(f => f.name === 'notes.txt')).toMatchObject({ mime: 'text/plain', size: 7 });
+  });
+
+  it('builds entry arrays and tree nodes only when read', async () => {
+    const res = await crawl({ resultFormat: 'compact' });
+    for (const key of ['root', 'folders', 'files', 'entries']) {
+      expect(typeof Object.getOwnPropertyDescriptor(res, key)?.get).toBe('function');
+    }
+    const store = res.compact!;
+    const files = store.fileIndexes();
+    expect(files).toHaveLength(5);
+    expect(store.urlAt(files[0])).toBe('https://example.com/root/caf%C3%A9%20menu.pdf');
+    expect(store.nameAt(files[0])).toBe('café menu.pdf');
+    expect(store.sizeAt(files[2])).toBeNull();
+    expect(store.dateAt(files[3])).toBe('2024-03-01T12:00:00.000Z');
+    expect(store.directoryPrefixes).toEqual(['https://example.com/', 'https://example.com/root/', 'https://example.com/root/sub/']);
+    expect(Object.getOwnPropertyDescriptor(res, 'files')?.get).toBeDefined();
+
+    const sub = res.root.children[0];
+    expect(typeof Object.getOwnPropertyDescriptor(sub, 'files')?.get).toBe('function');
+    expect(sub.files.map(f => f.name)).toEqual(['image.png', 'archive.tar.gz']);
+    expect(res.files).toBe(res.files); // cached after first access
+  });
+
+  it('keeps values it cannot derive verbatim', () => {
+    const store = new CompactEntries();
+    const file = { kind: 'file' as const, url: 'https://example.com/a/b%20c.txt?x=1', rawName: 'b%20c.txt', name: 'b c.txt', hidden: false, size: 3 };
+    for (const date of ['2024-02-30T00:00:00.000Z', '2024-03-01T12:00:00Z', '2024-03-01T24:00:00.000Z', '2024-03-01T12:00:00.000Z', null]) {
+      store.add({ ...file, date }, true);
+    }
+    store.seal();
+    expect(Array.from(store.fileIndexes(), i => store.dateAt(i))).toEqual(['2024-02-30T00:00:00.000Z', '2024-03-01T12:00:00Z', '2024-03-01T24:00:00.000Z', '2024-03-01T12:00:00.000Z', null]);
+    expect(store.entryAt(0)).toEqual({ ...file, date: '2024-02-30T00:00:00.000Z' });
+  });
+
+  it('can be refreshed against and diffed like a full result', async () => {
+    const previous = await crawl({ resultFormat: 'compact' });
+    const next = await crawl({ resultFormat: 'compact', previous });
+    expect(next.diff).toMatchObject({ added: [], removed: [], modified: [] });
+  });
+});
@@ -0,0 +1,84 @@
+import { describe, it, expect } from 'vitest';
+import { folderApiRequest } from '../../src/folderApiRequest.js';
+
+// Three levels: root -> a/ b/ c/ -> x/ y/ -> one file each
+function listingFor(path: string): string | null {
+  const depth = path.split('/').filter(Boolean).length - 1; // 0 = /root/
+  if (depth > 2) return null;
+  const rows: string[] = [];
+  if (depth === 0) for (const d of ['a', 'b', 'c']) rows.push(`<a href="${d}/">${d}/</a> 2024-03-01 12:00 -`);
+  if (depth === 1) for (const d of ['x', 'y']) rows.push(`<a href="${d}/">${d}/</a> 2024-03-01 12:00 -`);
+  rows.push(`<a href="f${depth}.txt">f${depth}.txt</a> 2024-03-01 12:00 1K`);
+  return `<!doctype html><pre>\n${rows.join('\n')}\n</pre>`;
+}
+
+async function crawl(directoryConcurrency: number) {
+  const originalFetch = globalThis.fetch;
+  let inFlight = 0;
+  let peak = 0;
+  globalThis.fetch = async (resource: any) => {
+    const url = new URL(resource.toString());
+    inFlight++;
+    peak = Math.max(peak, inFlight);
+    try {
+      await new Promise(r => setTimeout(r, 10));
+      const html = listingFor(url.pathname);
+      if (html == null) return new Response('', { status: 404 });
+      return new Response(html, { status: 200, headers: { 'content-type': 'text/html' } });
+    } finally {
+      inFlight--;
+    }
+  };
+  try {
+    const res = await folderApiRequest('https://example.com/root/', { mode: 'fetch', maxDepth: 2, directoryConcurrency });
+    return { res, peak };
+  } finally {
+    globalThis.fetch = originalFetch;
+  }
+}
+
+describe('directoryConcurrency', () => {
+  it('fetches sequentially by default', async () => {
+    const { res, peak } = await crawl(1);
+    expect(peak).toBe(1);
+    expect(res.stats.fetches).toBe(10);
+  });
+
+  it('produces the same tree and ordering when fetching in parallel', async () => {
+    const serial = await crawl(1);
+    const parallel = await crawl(4);
+    expect(parallel.peak).toBeGreaterThan(1);
+    expect(parallel.peak).toBeLessThanOrEqual(4);
+    expect(parallel.res.stats.fetches).toBe(serial.res.stats.fetches);
+    expect(parallel.res.folders.map(f => `${f.role}:${f.url}`)).toEqual(serial.res.folders.map(f => `${f.role}:${f.url}`));
+    expect(parallel.res.files.map(f => f.url)).toEqual(serial.res.files.map(f => f.url));
+    expect(parallel.res.root).toEqual(serial.res.root);
+    expect(parallel.res.stats.maxDepth).toBe(serial.res.stats.maxDepth);
+  });
+
+  it('does not prefetch a folder linked from outside its own parent', async () => {
+    // root lists a/ and also links straight to a/x/; the walk reaches x/ through a/ at maxDepth, so z/ is never listed
+    const pages: Record<string, string[]> = {
+      '/root/': ['a/', '/root/a/x/'],
+      '/root/a/': ['x/'],
+      '/root/a/x/': ['z/'],
+      '/root/a/x/z/': []
+    };
+    const originalFetch = globalThis.fetch;
+    const requested: string[] = [];
+    globalThis.fetch = async (resource: any) => {
+      const path = new URL(resource.toString()).pathname;
+      requested.push(path);
+      await new Promise(r => setTimeout(r, 10));
+      const rows = pages[path].map(href => `<a href="${href}">${href}</a> 2024-03-01 12:00 -`);
+      return new Response(`<pre>\n${rows.join('\n')}\n</pre>`, { status: 200, headers: { 'content-type': 'text/html' } });
+    };
+    try {
+      const res = await folderApiRequest('https://example.com/root/', { mode: 'fetch', maxDepth: 2, directoryConcurrency: 4 });
+      expect(res.folders.filter(f => f.role === 'child').map(f => f.url)).toContain('https://example.com/root/a/x/');
+      expect(requested.sort()).toEqual(['/root/', '/root/a/', '/root/a/x/']);
+    } finally {
+      globalThis.fetch = originalFetch;
+    }
+  });
+});
@@ -0,0 +1,146 @@
+import { describe, it, expect } from 'vitest';
+import { folderApiRequest } from '../../src/folderApiRequest.js';
+import { folderApiStream } from '../../src/folderApiStream.js';
+
+const FOLDERS = ['a', 'b', 'c', 'd', 'e'];
+
+function listing(path: string) {
+  const rows = path === '/root/'
+    ? FOLDERS.map(d => `<a href="${d}/">${d}/</a> 2024-03-01 12:00 -`)
+    : [1, 2].map(i => `<a href="f${i}.txt">f${i}.txt</a> 2024-03-01 12:00 ${i}`);
+  return new Response(`<pre>\n${rows.join('\n')}\n</pre>`, { status: 200, headers: { 'content-type': 'text/html' } });
+}
+
+// Requests answer right away unless `stalls` says otherwise: true stalls the request until its signal aborts, a
+// Response is sent as is. `aborted` counts the requests cancelled while in flight.
+async function withServer<T>(stalls: (path: string, head: boolean) => boolean | Response, run: (seen: { gets: number; heads: number; aborted: number }) => Promise<T>): Promise<T> {
+  const originalFetch = globalThis.fetch;
+  const seen = { gets: 0, heads: 0, aborted: 0 };
+  globalThis.fetch = ((resource: any, init?: any) => {
+    const head = init?.method === 'HEAD';
+    if (head) seen.heads++;
+    else seen.gets++;
+    const path = new URL(resource.toString()).pathname;
+    const stalled = stalls(path, head);
+    if (stalled instanceof Response) return Promise.resolve(stalled);
+    if (!stalled) return Promise.resolve(head ? new Response(null, { status: 200, headers: { 'content-type': 'text/plain' } }) : listing(path));
+    const signal = init?.signal as AbortSignal | undefined;
+    return new Promise<Response>((_resolve, reject) => {
+      signal?.addEventListener('abort', () => {
+        seen.aborted++;
+        reject(signal.reason);
+      }, { once: true });
+    });
+  }) as any;
+  try {
+    return await run(seen);
+  } finally {
+    globalThis.fetch = originalFetch;
+  }
+}
+
+describe('totalTimeoutMs', () => {
+  it('returns what was collected when the crawl deadline passes', async () => {
+    const res = await withServer(path => path === '/root/c/', () => folderApiRequest('https://example.com/root/', { mode: 'fetch', maxDepth: 1, directoryConcurrency: 1, totalTimeoutMs: 100 }));
+    expect(res.stats.truncated).toBe(true);
+    expect(res.errors).toEqual(['limit: crawl stopped at totalTimeoutMs (100)']);
+    expect(res.root.children.map(c => c.name)).toEqual(FOLDERS);
+    expect(res.files.map(f => f.url.slice('https://example.com/root/'.length))).toEqual(['a/f1.txt', 'a/f2.txt', 'b/f1.txt', 'b/f2.txt']);
+  });
+
+  it('leaves stats.truncated false when the crawl finishes in time', async () => {
+    const res = await withServer(() => false, () => folderApiRequest('https://example.com/root/', { mode: 'fetch', maxDepth: 1, totalTimeoutMs: 5000 }));
+    expect(res.stats.truncated).toBe(false);
+    expect(res.files).toHaveLength(FOLDERS.length * 2);
+    expect(res.errors).toEqual([]);
+  });
+
+  it('cancels HEADs still in flight at the deadline', async () => {
+    await withServer((_path, head) => head, async seen => {
+      const res = await folderApiRequest('https://example.com/root/', { mode: 'fetch', maxDepth: 1, includeMime: true, totalTimeoutMs: 100 });
+      expect(res.stats.truncated).toBe(true);
+      expect(seen.heads).toBeGreaterThan(0);
+      expect(seen.aborted).toBe(seen.heads);
+      expect(res.errors.filter(e => e.startsWith('mime:'))).toEqual([]);
+    });
+  });
+
+  it('ends a stream with a limit error at the deadline', async () => {
+    const events: any[] = [];
+    await withServer(path => path === '/root/b/', async () => {
+      for await (const ev of folderApiStream('https://example.com/root/', { mode: 'fetch', maxDepth: 1, directoryConcurrency: 1, totalTimeoutMs: 100 })) events.push(ev);
+    });
+    expect(events.filter(e => e.type === 'directory').map(e => e.url)).toEqual(['https://example.com/root/', 'https://example.com/root/a/']);
+    expect(events.at(-1)).toEqual({ type: 'error', error: 'limit: crawl stopped at totalTimeoutMs (100)' });
+  });
+
+  it('still rejects when the caller aborts', async () => {
+    const controller = new AbortController();
+    setTimeout(() => controller.abort(), 30);
+    await expect(withServer(path => path === '/root/a/', () => folderApiRequest('https://example.com/root/', { mode: 'fetch', maxDepth: 1, signal: controller.signal, totalTimeoutMs: 5000 }))).rejects.toBeDefined();
+  });
+});
+
+// Tracks timers set through the global setTimeout until they fire or are cleared.
+async function withTimers<T>(run: (pending: Set<unknown>) => Promise<T>): Promise<T> {
+  const originalSetTimeout = globalThis.setTimeout;
+  const originalClearTimeout = globalThis.clearTimeout;
+  const pending = new Set<unknown>();
+  globalThis.setTimeout = ((fn: any, ms?: number, ...args: any[]) => {
+    const id = originalSetTimeout(() => {
+      pending.delete(id);
+      fn(...args);
+    }, ms);
+    pending.add(id);
+    return id;
+  }) as any;
+  globalThis.clearTimeout = ((id: any) => {
+    pending.delete(id);
+    originalClearTimeout(id);
+  }) as any;
+  try {
+    return await run(pending);
+  } finally {
+    globalThis.setTimeout = originalSetTimeout;
+    globalThis.clearTimeout = originalClearTimeout;
+  }
+}
+
+describe('abort listener hygiene', () => {
+  it('leaves no listeners on a long-lived signal and no timers behind across many crawls', async () => {
+    const controller = new AbortController();
+    const signal = controller.signal;
+    let listeners = 0;
+    const add = signal.addEventListener.bind(signal);
+    const remove = signal.removeEventListener.bind(signal);
+    // the abort never fires here, so each listener is live until removed
+    signal.addEventListener = ((type: string, fn: any, o?: any) => { listeners++; add(type, fn, o); }) as any;
+    signal.removeEventListener = ((type: string, fn: any, o?: any) => { listeners--; remove(type, fn, o); }) as any;
+
+    await withTimers(pending => withServer(() => false, async () => {
+      const options = { mode: 'fetch' as const, maxDepth: 1, signal, includeMime: true, directoryConcurrency: 3 };
+      for (let i = 0; i < 50; i++) {
+        const res = await folderApiRequest('https://example.com/root/', i % 2 ? options : { ...options, totalTimeoutMs: 60_000 });
+        expect(res.files).toHaveLength(FOLDERS.length * 2);
+        expect(pending.size).toBe(0);
+        for await (const _ of folderApiStream('https://example.com/root/', { ...options, totalTimeoutMs: 60_000 })) { /* drain */ }
+        expect(pending.size).toBe(0);
+        expect(listeners).toBe(0);
+      }
+    }));
+  });
+
+  it('leaves no timers behind when the deadline cuts a Retry-After backoff short', async () => {
+    const overloaded = () => new Response('', { status: 503, headers: { 'retry-after': '30' } });
+    await withTimers(pending => withServer(path => path === '/root/b/' && overloaded(), async () => {
+      const res = await folderApiRequest('https://example.com/root/', { mode: 'fetch', maxDepth: 1, directoryConcurrency: 3, totalTimeoutMs: 200 });
+      expect(res.stats.truncated).toBe(true);
+      expect(res.stats.retries).toBeGreaterThan(0);
+      expect(pending.size).toBe(0);
+
+      const stream = folderApiStream('https://example.com/root/', { mode: 'fetch', maxDepth: 1, directoryConcurrency: 3, totalTimeoutMs: 200 });
+      for await (const _ of stream) { /* drain */ }
+      expect(pending.size).toBe(0);
+    }));
+  });
+});
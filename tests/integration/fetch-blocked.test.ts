@@ -0,0 +1,35 @@
+import { describe, it, expect, vi } from 'vitest';
+import { folderApiRequest } from '../../src/folderApiRequest.js';
+import { FolderApiSession } from '../../src/core/session.js';
+
+// fetch() rejecting with a TypeError is what CORS / mixed-content blocking looks like.
+vi.mock('../../src/core/fetchDirectory.ts', () => ({
+  fetchDirectoryResponse: async () => { throw new TypeError('Failed to fetch'); }
+}));
+
+vi.mock('../../src/core/iframeDirectory.ts', () => ({
+  iframeDirectoryDocument: async (url: string, _opts: any, stats: any) => {
+    stats.iframes++;
+    const html = url.endsWith('/root/')
+      ? '<pre><a href="a/">a/</a> 2024-03-01 12:00 -\n<a href="b/">b/</a> 2024-03-01 12:00 -</pre>'
+      : '<pre><a href="f.txt">f.txt</a> 2024-03-01 12:00 1K</pre>';
+    return { document: new DOMParser().parseFromString(html, 'text/html'), bytes: () => html.length, release: () => {} };
+  }
+}));
+
+describe('auto mode fetch memory', () => {
+  it('stops trying fetch on an origin once the iframe fallback worked', async () => {
+    const vias: string[] = [];
+    const session = new FolderApiSession();
+    const hooks = { onFetchEnd: (e: any) => { vias.push(e.via); } };
+    const res = await folderApiRequest('https://example.com/root/', { mode: 'auto', maxDepth: 1, hooks, session });
+    expect(res.files).toHaveLength(2);
+    expect(res.stats.iframes).toBe(3);
+    expect(vias.filter(v => v === 'fetch')).toHaveLength(1); // only the first listing tried fetch
+    expect(session.fetchBlocked.has('https://example.com')).toBe(true);
+
+    vias.length = 0;
+    await folderApiRequest('https://example.com/root/', { mode: 'auto', hooks, session });
+    expect(vias).toEqual(['iframe']);
+  });
+});
@@ -0,0 +1,62 @@
+import { describe, it, expect, vi } from 'vitest';
+import { folderApiRequest } from '../../src/folderApiRequest.js';
+import { OverloadError } from '../../src/utils/scheduler.js';
+
+vi.mock('../../src/core/iframeDirectory.ts', () => ({
+  iframeDirectoryDocument: async (_url: string, _opts: any, stats: any) => {
+    stats.iframes++;
+    const html = '<pre><a href="file.txt">file.txt</a> 2024-03-01 12:00 1K</pre>';
+    return { document: new DOMParser().parseFromString(html, 'text/html'), bytes: () => html.length, release: () => {} };
+  }
+}));
+
+// Every GET hangs until its signal aborts; HEADs hang too when `heads` is set.
+async function withHangingFetch<T>(run: (calls: { gets: number; heads: number }) => Promise<T>, heads = false): Promise<T> {
+  const originalFetch = globalThis.fetch;
+  const calls = { gets: 0, heads: 0 };
+  globalThis.fetch = ((_resource: any, init?: any) => {
+    const head = init?.method === 'HEAD';
+    if (head) calls.heads++;
+    else calls.gets++;
+    if (head && !heads) return Promise.resolve(new Response(null, { status: 200, headers: { 'content-type': 'text/plain' } }));
+    const signal = init?.signal as AbortSignal | undefined;
+    return new Promise<Response>((_resolve, reject) => {
+      signal?.addEventListener('abort', () => reject(signal.reason), { once: true });
+    });
+  }) as any;
+  try {
+    return await run(calls);
+  } finally {
+    globalThis.fetch = originalFetch;
+  }
+}
+
+describe('fetch timeout', () => {
+  it('falls back to the iframe in auto mode without retrying the fetch', async () => {
+    await withHangingFetch(async calls => {
+      const res = await folderApiRequest('https://example.com/root/', { mode: 'auto', timeoutMs: 100, retries: 2 });
+      expect(res.files.map(f => f.name)).toEqual(['file.txt']);
+      expect(calls.gets).toBe(1);
+      expect(res.stats.iframes).toBe(1);
+      expect(res.stats.retries).toBe(0);
+    });
+  });
+
+  it('rejects after a single attempt in fetch mode', async () => {
+    await withHangingFetch(async calls => {
+      const error = await folderApiRequest('https://example.com/root/', { mode: 'fetch', timeoutMs: 100, retries: 2 }).catch(e => e);
+      expect(error).not.toBeInstanceOf(OverloadError);
+      expect(error.message).toBe('timeout'); // the same error an iframe load that times out rejects with
+      expect(calls.gets).toBe(1);
+    });
+  });
+
+  it('does not retry a HEAD that times out', async () => {
+    await withHangingFetch(async calls => {
+      const res = await folderApiRequest('https://example.com/root/', { mode: 'iframe', includeMime: true, timeoutMs: 100, retries: 2 });
+      expect(calls.heads).toBe(1);
+      expect(res.stats.retries).toBe(0);
+      expect(res.errors).toEqual(['mime: failed HEAD for https://example.com/root/file.txt']);
+    }, true);
+  });
+});
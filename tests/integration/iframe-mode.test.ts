@@ -2,15 +2,16 @@ import { describe, it, expect, vi } from 'vitest';
 import { folderApiRequest } from '../../src/folderApiRequest.js';
 
 vi.mock('../../src/core/iframeDirectory.ts', () => ({
-  iframeDirectoryHtml: async (_url: string, _opts: any, stats: any) => {
+  iframeDirectoryDocument: async (_url: string, _opts: any, stats: any) => {
     if (stats) stats.iframes++;
-    return '<html><body><pre><a href="file.txt">file.txt</a> 2024-03-01 12:00 1K</pre></body></html>';
+    const html = '<html><body><pre><a href="file.txt">file.txt</a> 2024-03-01 12:00 1K</pre></body></html>';
+    return { document: new DOMParser().parseFromString(html, 'text/html'), bytes: () => html.length, release: () => {} };
   }
 }));
 
 // Ensure fetch path is never called in iframe mode.
 vi.mock('../../src/core/fetchDirectory.ts', () => ({
-  fetchDirectoryHtml: async () => { throw new Error('should not fetch in iframe mode'); }
+  fetchDirectoryResponse: async () => { throw new Error('should not fetch in iframe mode'); }
 }));
 
 describe('iframe mode only', () => {
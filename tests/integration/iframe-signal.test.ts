@@ -0,0 +1,52 @@
+import { describe, it, expect, vi } from 'vitest';
+import { folderApiRequest } from '../../src/folderApiRequest.js';
+import { folderApiOpen } from '../../src/folderApiOpen.js';
+
+// root/ and a/ load; any other folder's frame never finishes loading, so its load only ends when the signal it
+// was given aborts. Every load is recorded in globalThis.__iframeLoads.
+vi.mock('../../src/core/iframeDirectory.ts', () => ({
+  iframeDirectoryDocument: (url: string, _opts: any, stats: any, signal?: AbortSignal) => {
+    stats.iframes++;
+    const loads = (globalThis as any).__iframeLoads;
+    loads.push({ url, signal });
+    const path = new URL(url).pathname;
+    const html = path === '/root/'
+      ? '<pre><a href="a/">a/</a>\n<a href="b/">b/</a>\n<a href="c/">c/</a>\n<a href="f0.txt">f0.txt</a> 2024-03-01 12:00 1K</pre>'
+      : path === '/root/a/' ? '<pre><a href="f1.txt">f1.txt</a> 2024-03-01 12:00 1K</pre>' : null;
+    if (html) return Promise.resolve({ document: new DOMParser().parseFromString(html, 'text/html'), bytes: () => html.length, release: () => {} });
+    return new Promise((_resolve, reject) => {
+      signal?.addEventListener('abort', () => reject(signal.reason));
+    });
+  }
+}));
+
+type Load = { url: string; signal?: AbortSignal };
+
+function loads(): Load[] {
+  return (globalThis as any).__iframeLoads = [];
+}
+
+describe('iframe loads use their own signal', () => {
+  it('frees prefetched frames once the walk stops at maxResults', async () => {
+    const seen = loads();
+    const res = await folderApiRequest('https://example.com/root/', { mode: 'iframe', maxDepth: 1, maxResults: 2, directoryConcurrency: 3 });
+    expect(res.files.map(f => f.name)).toEqual(['f0.txt', 'f1.txt']);
+    const stalled = seen.filter(l => !/\/root\/(a\/)?$/.test(l.url));
+    expect(stalled.length).toBeGreaterThan(0);
+    expect(stalled.every(l => l.signal?.aborted)).toBe(true);
+  });
+
+  it('frees the frame of a cancelled folderApiOpen prefetch', async () => {
+    const seen = loads();
+    const root = await folderApiOpen('https://example.com/root/', { mode: 'iframe' });
+    const hover = new AbortController();
+    const done = root.children.find(c => c.node.name === 'b')!.prefetch({ signal: hover.signal });
+    await new Promise(r => setTimeout(r, 5));
+    const load = seen.find(l => l.url === 'https://example.com/root/b/')!;
+    expect(load.signal?.aborted).toBe(false);
+    hover.abort();
+    await done;
+    expect(load.signal?.aborted).toBe(true);
+    root.close();
+  });
+});
@@ -0,0 +1,100 @@
+import { describe, it, expect } from 'vitest';
+import { folderApiRequest } from '../../src/folderApiRequest.js';
+
+// In-memory tree: directory path -> rows; each directory has a version (ETag) and an mtime shown in its parent listing.
+interface Dir { version: number; mtime: string; folders: string[]; files: Record<string, string> }
+
+function mockServer(tree: Record<string, Dir>, withEtags: boolean) {
+  const requests: Array<{ path: string; status: number }> = [];
+  const fetchImpl = async (resource: any, init?: RequestInit) => {
+    const url = new URL(resource.toString());
+    const dir = tree[url.pathname];
+    if (!dir) return new Response('', { status: 404 });
+    const etag = `"${url.pathname}-${dir.version}"`;
+    if (withEtags && new Headers(init?.headers).get('if-none-match') === etag) {
+      requests.push({ path: url.pathname, status: 304 });
+      return new Response(null, { status: 304, headers: { etag } });
+    }
+    requests.push({ path: url.pathname, status: 200 });
+    const rows = [
+      ...dir.folders.map(name => `<a href="${name}/">${name}/</a> ${tree[url.pathname + name + '/'].mtime} -`),
+      ...Object.entries(dir.files).map(([name, meta]) => `<a href="${name}">${name}</a> ${meta}`)
+    ];
+    const headers: Record<string, string> = { 'content-type': 'text/html' };
+    if (withEtags) headers.etag = etag;
+    return new Response(`<pre>\n${rows.join('\n')}\n</pre>`, { status: 200, headers });
+  };
+  return { requests, fetchImpl };
+}
+
+function sampleTree(): Record<string, Dir> {
+  return {
+    '/root/': { version: 1, mtime: '2024-03-01 12:00', folders: ['a', 'b'], files: { 'top.txt': '2024-03-01 12:00 1K' } },
+    '/root/a/': { version: 1, mtime: '2024-03-01 12:00', folders: ['deep'], files: { 'a1.txt': '2024-03-01 12:00 2K' } },
+    '/root/a/deep/': { version: 1, mtime: '2024-03-01 12:00', folders: [], files: { 'd.txt': '2024-03-01 12:00 3K' } },
+    '/root/b/': { version: 1, mtime: '2024-03-01 12:00', folders: [], files: { 'b1.txt': '2024-03-01 12:00 4K' } }
+  };
+}
+
+async function crawl(server: ReturnType<typeof mockServer>, options: any) {
+  const originalFetch = globalThis.fetch;
+  globalThis.fetch = server.fetchImpl as any;
+  try {
+    return await folderApiRequest('https://example.com/root/', { mode: 'fetch', maxDepth: 2, ...options });
+  } finally {
+    globalThis.fetch = originalFetch;
+  }
+}
+
+describe('incremental refresh', () => {
+  it('revalidates every listing against the previous validators', async () => {
+    const tree = sampleTree();
+    const server = mockServer(tree, true);
+    const first = await crawl(server, {});
+    expect(first.diff).toBeUndefined();
+    expect(Object.keys(first.directories).length).toBe(4);
+
+    const same = await crawl(server, { previous: first });
+    expect(server.requests.slice(4).map(r => r.status)).toEqual([304, 304, 304, 304]);
+    expect(same.diff).toEqual({ added: [], removed: [], modified: [], reusedDirectories: 4 });
+    expect(same.root).toEqual(first.root);
+
+    tree['/root/b/'].version = 2;
+    tree['/root/b/'].mtime = '2024-03-02 08:00';
+    tree['/root/b/'].files['b2.txt'] = '2024-03-02 08:00 5K';
+    delete tree['/root/b/'].files['b1.txt'];
+    tree['/root/'].version = 2;
+    const changed = await crawl(server, { previous: JSON.parse(JSON.stringify(same)) });
+    expect(changed.diff!.added.map(e => e.name)).toEqual(['b2.txt']);
+    expect(changed.diff!.removed.map(e => e.name)).toEqual(['b1.txt']);
+    expect(changed.diff!.modified.map(m => [m.before.name, m.before.date, m.after.date])).toEqual([
+      ['b', '2024-03-01T12:00:00.000Z', '2024-03-02T08:00:00.000Z']
+    ]);
+    expect(changed.diff!.reusedDirectories).toBe(2);
+  });
+
+  it('skips unchanged subtrees by folder date in subtree mode', async () => {
+    const tree = sampleTree();
+    const server = mockServer(tree, false);
+    const first = await crawl(server, {});
+    tree['/root/b/'].mtime = '2024-03-02 08:00';
+    tree['/root/b/'].files['b1.txt'] = '2024-03-02 08:00 6K';
+    const refreshed = await crawl(server, { previous: first, incremental: 'subtree' });
+    expect(server.requests.slice(4).map(r => r.path)).toEqual(['/root/', '/root/b/']);
+    expect(refreshed.stats.fetches).toBe(2);
+    expect(refreshed.diff!.reusedDirectories).toBe(2); // a/ and a/deep/
+    expect(refreshed.diff!.added).toEqual([]);
+    expect(refreshed.diff!.modified.map(m => m.after.name)).toEqual(['b', 'b1.txt']);
+    expect(refreshed.files.map(f => f.name)).toEqual(first.files.map(f => f.name));
+    expect(refreshed.root.children[0]).toEqual(first.root.children[0]);
+  });
+
+  it('re-lists directories the previous crawl never loaded', async () => {
+    const tree = sampleTree();
+    const server = mockServer(tree, false);
+    const shallow = await crawl(server, { maxDepth: 1 });
+    const deeper = await crawl(server, { previous: shallow, incremental: 'subtree' });
+    expect(deeper.diff!.added.map(e => e.name)).toEqual(['d.txt']);
+    expect(deeper.files.length).toBe(4);
+  });
+});
@@ -0,0 +1,93 @@
+import { describe, it, expect } from 'vitest';
+import { folderApiRequest } from '../../src/folderApiRequest.js';
+
+const LISTINGS: Record<string, string> = {
+  '/root/': '<pre>\n<a href="sub/">sub/</a> 2024-03-01 12:00 -\n<a href="a.txt">a.txt</a> 2024-03-01 12:00 10\n</pre>',
+  '/root/sub/': '<pre>\n<a href="b.bin">b.bin</a> 2024-03-01 12:00 20\n</pre>'
+};
+
+async function withServer<T>(run: () => Promise<T>): Promise<T> {
+  const originalFetch = globalThis.fetch;
+  globalThis.fetch = async (resource: any, init?: any) => {
+    const url = new URL(resource.toString());
+    await new Promise(r => setTimeout(r, 5));
+    if (init?.method === 'HEAD') return new Response('', { status: url.pathname.endsWith('.bin') ? 404 : 200, headers: { 'content-type': 'text/plain' } });
+    const html = LISTINGS[url.pathname];
+    if (html == null) return new Response('', { status: 404 });
+    return new Response(html, { status: 200, headers: { 'content-type': 'text/html' } });
+  };
+  try {
+    return await run();
+  } finally {
+    globalThis.fetch = originalFetch;
+  }
+}
+
+describe('instrumentation', () => {
+  it('calls hooks for every phase', async () => {
+    const events: string[] = [];
+    const fetchEnds: any[] = [];
+    const parseEnds: any[] = [];
+    const headEnds: any[] = [];
+    const res = await withServer(() => folderApiRequest('https://example.com/root/', {
+      mode: 'fetch',
+      maxDepth: 1,
+      includeMime: true,
+      hooks: {
+        onDirectoryStart: e => events.push(`start ${e.url} ${e.depth}`),
+        onFetchEnd: e => fetchEnds.push(e),
+        onParseEnd: e => parseEnds.push(e),
+        onHeadEnd: e => headEnds.push(e)
+      }
+    }));
+    expect(events).toEqual(['start https://example.com/root/ 0', 'start https://example.com/root/sub/ 1']);
+    expect(fetchEnds.map(e => [e.url, e.via, e.status, e.notModified, e.bytes])).toEqual([
+      ['https://example.com/root/', 'fetch', 200, false, LISTINGS['/root/'].length],
+      ['https://example.com/root/sub/', 'fetch', 200, false, LISTINGS['/root/sub/'].length]
+    ]);
+    expect(fetchEnds.every(e => e.ms >= 0)).toBe(true);
+    expect(parseEnds.map(e => [e.url, e.folders, e.files])).toEqual([
+      ['https://example.com/root/', 1, 1],
+      ['https://example.com/root/sub/', 0, 1]
+    ]);
+    expect(parseEnds.every(e => e.documentMs + e.heuristicsMs <= e.ms + 0.001)).toBe(true);
+    expect(headEnds.map(e => [e.url, e.status]).sort()).toEqual([
+      ['https://example.com/root/a.txt', 200],
+      ['https://example.com/root/sub/b.bin', 404]
+    ]);
+    // hooks alone do not add stats.timings
+    expect(res.stats.timings).toBeUndefined();
+  });
+
+  it('summarizes timings per request', async () => {
+    const res = await withServer(() => folderApiRequest('https://example.com/root/', { mode: 'fetch', maxDepth: 1, includeMime: true, timings: true }));
+    const t = res.stats.timings!;
+    expect(t.bytes).toBe(LISTINGS['/root/'].length + LISTINGS['/root/sub/'].length);
+    expect(t.directories.count).toBe(2);
+    expect(t.directories.p50Ms).toBeLessThanOrEqual(t.directories.p95Ms);
+    expect(t.directories.p95Ms).toBeLessThanOrEqual(t.directories.maxMs);
+    expect(t.networkMs).toBeGreaterThan(0);
+    expect(t.headMs).toBeGreaterThan(0);
+    expect(t.documentMs + t.heuristicsMs).toBeLessThanOrEqual(t.parseMs + 0.001);
+  });
+
+  it('ignores throwing hooks', async () => {
+    const res = await withServer(() => folderApiRequest('https://example.com/root/', {
+      mode: 'fetch',
+      maxDepth: 1,
+      hooks: { onFetchEnd: () => { throw new Error('boom'); }, onParseEnd: () => { throw new Error('boom'); } }
+    }));
+    expect(res.files.map(f => f.name)).toEqual(['a.txt', 'b.bin']);
+    expect(res.errors).toEqual([]);
+  });
+
+  it('emits performance measures when enabled', async () => {
+    if (typeof performance.getEntriesByType !== 'function') return;
+    const before = performance.getEntriesByType('measure').length;
+    await withServer(() => folderApiRequest('https://example.com/root/', { mode: 'fetch', maxDepth: 1, performanceMarks: true }));
+    const names = performance.getEntriesByType('measure').slice(before).map(m => m.name);
+    expect(names.some(n => / fetch https:\/\/example\.com\/root\/$/.test(n))).toBe(true);
+    expect(names.some(n => / parse https:\/\/example\.com\/root\/sub\/$/.test(n))).toBe(true);
+    expect(names.some(n => / crawl$/.test(n))).toBe(true);
+  });
+});
@@ -0,0 +1,71 @@
+import { describe, it, expect } from 'vitest';
+import { folderApiRequest } from '../../src/folderApiRequest.js';
+import { FolderApiSession } from '../../src/core/session.js';
+
+// Directory path -> [folders, files as [name, bytes]]
+const SITE: Record<string, [string[], Array<[string, number]>]> = {
+  '/root/': [['sub'], [['big.iso', 1250000], ['small.txt', 123]]],
+  '/root/sub/': [[], [['deep.md', 89]]]
+};
+
+function html(path: string) {
+  const [folders, files] = SITE[path];
+  const rows = [...folders.map(d => `<a href="${d}/">${d}/</a> 2024-03-01 12:00 -`), ...files.map(([f, n]) => `<a href="${f}">${f}</a> 2024-03-01 12:00 ${n > 1024 ? (n / 1048576).toFixed(1) + 'M' : n}`)];
+  return new Response(`<pre>\n${rows.join('\n')}\n</pre>`, { status: 200, headers: { 'content-type': 'text/html' } });
+}
+
+function json(path: string) {
+  const [folders, files] = SITE[path];
+  const items = [...folders.map(d => ({ name: d, type: 'directory', mtime: 'Fri, 01 Mar 2024 12:00:00 GMT' })), ...files.map(([name, size]) => ({ name, type: 'file', mtime: 'Fri, 01 Mar 2024 12:00:00 GMT', size }))];
+  return new Response(JSON.stringify(items), { status: 200, headers: { 'content-type': 'application/json' } });
+}
+
+// server: 'negotiate' (JSON when Accept asks for it), 'html' (ignores Accept), 'strict' (406 to JSON requests)
+async function crawl(server: 'negotiate' | 'html' | 'strict', options: any) {
+  const originalFetch = globalThis.fetch;
+  const accepts: string[] = [];
+  globalThis.fetch = async (resource: any, init?: any) => {
+    const path = new URL(resource.toString()).pathname;
+    const accept = init?.headers?.Accept ?? '';
+    accepts.push(accept);
+    const wantsJson = accept.startsWith('application/json');
+    if (server === 'strict' && wantsJson) return new Response('', { status: 406 });
+    return server === 'negotiate' && wantsJson ? json(path) : html(path);
+  };
+  try {
+    const res = await folderApiRequest('https://example.com/root/', { mode: 'fetch', maxDepth: 1, ...options });
+    return { res, accepts, sizes: Object.fromEntries(res.files.map(f => [f.name, f.size])) };
+  } finally {
+    globalThis.fetch = originalFetch;
+  }
+}
+
+describe('preferJson', () => {
+  it('uses JSON listings for exact sizes when the server offers them', async () => {
+    const { res, accepts, sizes } = await crawl('negotiate', { preferJson: true });
+    expect(sizes).toEqual({ 'big.iso': 1250000, 'small.txt': 123, 'deep.md': 89 });
+    expect(res.folders.find(f => f.role === 'child')!.url).toBe('https://example.com/root/sub/');
+    expect(accepts.every(a => a.startsWith('application/json'))).toBe(true);
+  });
+
+  it('asks for HTML only without preferJson', async () => {
+    const { accepts, sizes } = await crawl('negotiate', {});
+    expect(accepts.every(a => a.startsWith('text/html'))).toBe(true);
+    expect(sizes['big.iso']).not.toBe(1250000);
+  });
+
+  it('stops asking an origin for JSON once it answered with HTML', async () => {
+    const session = new FolderApiSession();
+    const { accepts, sizes } = await crawl('html', { preferJson: true, session });
+    expect(accepts.map(a => a.split(',')[0])).toEqual(['application/json', 'text/html']);
+    expect(session.jsonListings.get('https://example.com')).toBe(false);
+    expect(sizes['small.txt']).toBe(123);
+  });
+
+  it('retries a 406 as an HTML request', async () => {
+    const { res, accepts } = await crawl('strict', { preferJson: true });
+    expect(res.errors).toEqual([]);
+    expect(res.files).toHaveLength(3);
+    expect(accepts.map(a => a.split(',')[0])).toEqual(['application/json', 'text/html', 'text/html']);
+  });
+});
@@ -0,0 +1,114 @@
+import { describe, it, expect } from 'vitest';
+import { folderApiRequest } from '../../src/folderApiRequest.js';
+import { MemoryListingCache } from '../../src/core/listingCache.js';
+
+const ROWS = 100_000;
+const ROWS_PER_CHUNK = 100;
+
+function size(i: number) {
+  return 1000 + i;
+}
+
+// A listing far larger than any budget, produced chunk by chunk as the reader pulls; records how much was
+// pulled and whether the reader cancelled the download.
+function streamedListing(format: 'html' | 'json') {
+  const seen = { chunks: 0, cancelled: false };
+  const encoder = new TextEncoder();
+  let row = 0;
+  const body = new ReadableStream<Uint8Array>({
+    pull(controller) {
+      seen.chunks++;
+      let text = row === 0 ? (format === 'html' ? '<html><body><pre><a href="../">../</a>\n' : '[') : '';
+      for (const end = row + ROWS_PER_CHUNK; row < end; row++) {
+        text += format === 'html'
+          ? `<a href="f${row}.bin">f${row}.bin</a>   01-Mar-2024 12:00   ${size(row)}\n`
+          : `${row ? ',' : ''}{"name":"f${row}.bin","type":"file","mtime":"Fri, 01 Mar 2024 12:00:00 GMT","size":${size(row)}}`;
+      }
+      if (row >= ROWS) {
+        text += format === 'html' ? '</pre></body></html>' : ']';
+        controller.enqueue(encoder.encode(text));
+        controller.close();
+      } else {
+        controller.enqueue(encoder.encode(text));
+      }
+    },
+    cancel() {
+      seen.cancelled = true;
+    }
+  });
+  const type = format === 'html' ? 'text/html' : 'application/json';
+  return { seen, response: new Response(body, { status: 200, headers: { 'content-type': type, etag: '"v1"' } }) };
+}
+
+async function crawl(format: 'html' | 'json', options: any) {
+  const originalFetch = globalThis.fetch;
+  const { seen, response } = streamedListing(format);
+  globalThis.fetch = async () => response;
+  try {
+    const res = await folderApiRequest('https://example.com/root/', { mode: 'fetch', preferJson: format === 'json', ...options });
+    return { res, seen };
+  } finally {
+    globalThis.fetch = originalFetch;
+  }
+}
+
+describe('listing budgets', () => {
+  it('stops reading a listing once it holds maxEntriesPerDirectory entries', async () => {
+    const { res, seen } = await crawl('html', { maxEntriesPerDirectory: 250 });
+    expect(res.files).toHaveLength(249); // the ../ folder is kept first
+    expect(res.files.every((f, i) => f.name === `f${i}.bin` && f.size === size(i))).toBe(true);
+    expect(res.errors).toEqual(['limit: listing truncated at maxEntriesPerDirectory (250): https://example.com/root/']);
+    expect(seen.cancelled).toBe(true);
+    expect(seen.chunks).toBeLessThan(10);
+  });
+
+  it('cuts the body at maxListingBytes, keeps only complete rows and does not cache the partial listing', async () => {
+    const cache = new MemoryListingCache();
+    const { res, seen } = await crawl('html', { maxListingBytes: 20_000, cache });
+    expect(res.files.length).toBeGreaterThan(100);
+    expect(res.files.length).toBeLessThan(400);
+    expect(res.files.every((f, i) => f.name === `f${i}.bin` && f.size === size(i) && f.date === '2024-03-01T12:00:00.000Z')).toBe(true);
+    expect(res.errors).toEqual(['limit: listing truncated at maxListingBytes (20000): https://example.com/root/']);
+    expect(seen.cancelled).toBe(true);
+    expect(res.directories['https://example.com/root/'].etag).toBeNull();
+    expect(await cache.get('https://example.com/root/')).toBeUndefined();
+  });
+
+  it('keeps the complete items of a cut JSON listing', async () => {
+    const { res, seen } = await crawl('json', { maxEntriesPerDirectory: 150 });
+    expect(res.files).toHaveLength(150);
+    expect(res.files[149]).toMatchObject({ name: 'f149.bin', size: size(149) });
+    expect(res.errors).toHaveLength(1);
+    expect(seen.cancelled).toBe(true);
+
+    const small = await crawl('json', { maxListingBytes: 5000 });
+    expect(small.res.files.length).toBeGreaterThan(10);
+    expect(small.res.files.every((f, i) => f.size === size(i))).toBe(true);
+  });
+
+  it('measures a response without a body stream in bytes as well', async () => {
+    // two-byte characters: a UTF-16 length would read about twice as many rows into the budget
+    const rows = Array.from({ length: 200 }, (_, i) => `<a href="caf%C3%A9${i}.txt">café${i}.txt</a>   01-Mar-2024 12:00   ${size(i)}\n`);
+    const html = `<html><body><pre>${rows.join('')}</pre></body></html>`.replace(/café/g, 'éééé');
+    const load = async (streamed: boolean) => {
+      const originalFetch = globalThis.fetch;
+      const fetched: number[] = [];
+      globalThis.fetch = async () => {
+        const response = new Response(html, { status: 200, headers: { 'content-type': 'text/html' } });
+        if (!streamed) Object.defineProperty(response, 'body', { value: null });
+        return response;
+      };
+      try {
+        const res = await folderApiRequest('https://example.com/root/', { mode: 'fetch', maxListingBytes: 4096, hooks: { onFetchEnd: e => fetched.push(e.bytes) } });
+        return { names: res.files.map(f => f.name), errors: res.errors, fetched };
+      } finally {
+        globalThis.fetch = originalFetch;
+      }
+    };
+    const streamed = await load(true);
+    const whole = await load(false);
+    expect(streamed.errors).toEqual(['limit: listing truncated at maxListingBytes (4096): https://example.com/root/']);
+    expect(whole).toEqual(streamed);
+    expect(whole.fetched).toEqual([4096]);
+  });
+});
@@ -22,5 +22,62 @@ describe('mime enrichment', () => {
       globalThis.fetch = originalFetch;
     }
   });
-});
 
+  describe('mimeStrategy', () => {
+    const listing = `<!doctype html><pre>
+<a href="photo.JPG">photo.JPG</a> 2024-03-01 12:00 2M
+<a href="clip.mp4">clip.mp4</a> 2024-03-01 12:00 -
+<a href="data.weird">data.weird</a> 2024-03-01 12:00 1K
+<a href="notes.md">notes.md</a> 2024-03-01 12:00 1K
+</pre>`;
+
+    async function run(options: any) {
+      const heads: string[] = [];
+      const originalFetch = globalThis.fetch;
+      globalThis.fetch = async (resource: any, init?: any) => {
+        const url = resource.toString();
+        if (init?.method === 'HEAD') {
+          heads.push(url.split('/').pop());
+          return new Response('', { status: 200, headers: { 'content-type': 'application/x-from-head', 'content-length': '77' } });
+        }
+        return new Response(listing, { status: 200, headers: { 'content-type': 'text/html' } });
+      };
+      try {
+        const res = await folderApiRequest('https://example.com/root/', { includeMime: true, ...options });
+        return { res, heads, mime: Object.fromEntries(res.files.map(f => [f.name, f.mime])) };
+      } finally {
+        globalThis.fetch = originalFetch;
+      }
+    }
+
+    it('infer uses the table only', async () => {
+      const { res, heads, mime } = await run({ mimeStrategy: 'infer' });
+      expect(heads).toEqual([]);
+      expect(mime).toEqual({ 'photo.JPG': 'image/jpeg', 'clip.mp4': 'video/mp4', 'data.weird': null, 'notes.md': 'text/markdown' });
+      expect(res.stats.headsAvoided).toBe(4);
+      expect(res.stats.heads).toBe(0);
+    });
+
+    it('infer-then-head only sends HEAD for unknown types or missing sizes', async () => {
+      const { res, heads, mime } = await run({ mimeStrategy: 'infer-then-head' });
+      expect(heads.sort()).toEqual(['clip.mp4', 'data.weird']);
+      expect(mime['clip.mp4']).toBe('video/mp4');
+      expect(mime['data.weird']).toBe('application/x-from-head');
+      expect(res.files.find(f => f.name === 'clip.mp4')!.size).toBe(77);
+      expect(res.stats.headsAvoided).toBe(2);
+    });
+
+    it('merges custom mimeTypes over the built-in table', async () => {
+      const { heads, mime } = await run({ mimeStrategy: 'infer-then-head', mimeTypes: { '.WEIRD': 'application/x-weird', md: 'text/x-markdown' } });
+      expect(heads).toEqual(['clip.mp4']);
+      expect(mime['data.weird']).toBe('application/x-weird');
+      expect(mime['notes.md']).toBe('text/x-markdown');
+    });
+
+    it('head keeps one HEAD per file', async () => {
+      const { res, heads } = await run({});
+      expect(heads.length).toBe(4);
+      expect(res.stats.headsAvoided).toBe(0);
+    });
+  });
+});
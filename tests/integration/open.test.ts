@@ -0,0 +1,217 @@
+import { describe, it, expect } from 'vitest';
+import { folderApiOpen } from '../../src/folderApiOpen.js';
+import { folderApiRequest } from '../../src/folderApiRequest.js';
+import { FolderHandle } from '../../src/types.js';
+
+// root -> a/ b/ c/ (missing/) -> x/ y/ -> one file each; missing/ answers 404
+function listingFor(path: string, missing: boolean): string | null {
+  const depth = path.split('/').filter(Boolean).length - 1;
+  if (depth > 2 || path.includes('/missing/')) return null;
+  const rows: string[] = [];
+  if (depth === 0) for (const d of missing ? ['a', 'b', 'c', 'missing'] : ['a', 'b', 'c']) rows.push(`<a href="${d}/">${d}/</a> 2024-03-01 12:00 -`);
+  if (depth === 1) for (const d of ['x', 'y']) rows.push(`<a href="${d}/">${d}/</a> 2024-03-01 12:00 -`);
+  rows.push(`<a href="f${depth}.txt">f${depth}.txt</a> 2024-03-01 12:00 1K`);
+  return `<!doctype html><pre>\n${rows.join('\n')}\n</pre>`;
+}
+
+interface Site { requested: string[]; aborted: string[] }
+
+async function withSite<T>(fn: (site: Site) => Promise<T>, missing = true): Promise<T> {
+  const originalFetch = globalThis.fetch;
+  const site: Site = { requested: [], aborted: [] };
+  globalThis.fetch = async (resource: any, init?: any) => {
+    const path = new URL(resource.toString()).pathname;
+    site.requested.push(path);
+    await new Promise<void>((resolve, reject) => {
+      const timer = setTimeout(resolve, 20);
+      init?.signal?.addEventListener('abort', () => {
+        clearTimeout(timer);
+        site.aborted.push(path);
+        reject(new DOMException('aborted', 'AbortError'));
+      }, { once: true });
+    });
+    const html = listingFor(path, missing);
+    if (html == null) return new Response('', { status: 404 });
+    return new Response(html, { status: 200, headers: { 'content-type': 'text/html' } });
+  };
+  try {
+    return await fn(site);
+  } finally {
+    globalThis.fetch = originalFetch;
+  }
+}
+
+const START = 'https://example.com/root/';
+const child = (h: FolderHandle, name: string) => h.children.find(c => c.node.name === name)!;
+
+async function expandAll(handle: FolderHandle, depth: number) {
+  if (depth === 0) return;
+  for (const c of handle.children) {
+    await c.expand();
+    await expandAll(c, depth - 1);
+  }
+}
+
+// Tracks timers set through the global setTimeout until they fire or are cleared.
+async function withTimers<T>(run: (pending: Set<unknown>) => Promise<T>): Promise<T> {
+  const originalSetTimeout = globalThis.setTimeout;
+  const originalClearTimeout = globalThis.clearTimeout;
+  const pending = new Set<unknown>();
+  globalThis.setTimeout = ((fn: any, ms?: number, ...args: any[]) => {
+    const id = originalSetTimeout(() => {
+      pending.delete(id);
+      fn(...args);
+    }, ms);
+    pending.add(id);
+    return id;
+  }) as any;
+  globalThis.clearTimeout = ((id: any) => {
+    pending.delete(id);
+    originalClearTimeout(id);
+  }) as any;
+  try {
+    return await run(pending);
+  } finally {
+    globalThis.setTimeout = originalSetTimeout;
+    globalThis.clearTimeout = originalClearTimeout;
+  }
+}
+
+describe('folderApiOpen', () => {
+  it('lists only what is expanded and builds the same tree as a full crawl', async () => {
+    await withSite(async site => {
+      const root = await folderApiOpen(START, { mode: 'fetch' });
+      expect(site.requested).toEqual(['/root/']);
+      expect(root.status).toBe('expanded');
+      expect(root.children.map(c => c.node.name)).toEqual(['a', 'b', 'c']);
+      expect(root.children.every(c => c.status === 'idle' && c.node.files.length === 0)).toBe(true);
+      expect(root.folders.map(f => f.role)).toContain('root');
+
+      const a = await child(root, 'a').expand();
+      expect(site.requested).toEqual(['/root/', '/root/a/']);
+      await a.expand();
+      expect(site.requested).toHaveLength(2);
+      expect(root.node.children[0]).toBe(a.node);
+      expect(a.node.files.map(f => f.name)).toEqual(['f1.txt']);
+      expect(root.find('https://example.com/root/a/x')).toBe(child(a, 'x'));
+
+      await expandAll(root, 2);
+      root.close();
+      const full = await folderApiRequest(START, { mode: 'fetch', maxDepth: 2 });
+      expect(JSON.parse(JSON.stringify(root.node))).toEqual(JSON.parse(JSON.stringify(full.root)));
+      expect(root.stats).toMatchObject({ fetches: 10, expanded: 10, prefetched: 0, maxDepth: 2 });
+    }, false);
+  });
+
+  it('expands a prefetched folder without another request', async () => {
+    await withSite(async site => {
+      const root = await folderApiOpen(START, { mode: 'fetch' });
+      const b = child(root, 'b');
+      await b.prefetch();
+      expect(b.status).toBe('idle');
+      await b.expand();
+      expect(site.requested.filter(p => p === '/root/b/')).toHaveLength(1);
+      expect(root.stats).toMatchObject({ fetches: 2, prefetched: 1, expanded: 2 });
+    });
+  });
+
+  it('cancels a prefetch whose signal aborts unless an expand is waiting for it', async () => {
+    await withSite(async site => {
+      const root = await folderApiOpen(START, { mode: 'fetch', directoryConcurrency: 4 });
+      const hover = new AbortController();
+      const done = child(root, 'a').prefetch({ signal: hover.signal });
+      await new Promise(r => setTimeout(r, 5));
+      hover.abort();
+      await done; // never rejects
+      expect(site.aborted).toEqual(['/root/a/']);
+      await child(root, 'a').expand(); // loads again
+      expect(site.requested.filter(p => p === '/root/a/')).toHaveLength(2);
+
+      const second = new AbortController();
+      const prefetch = child(root, 'b').prefetch({ signal: second.signal });
+      const expanded = child(root, 'b').expand();
+      second.abort();
+      await prefetch;
+      await expanded;
+      expect(site.aborted).toEqual(['/root/a/']);
+      expect(child(root, 'b').status).toBe('expanded');
+    });
+  });
+
+  it('rejects an aborted expand and leaves the folder expandable', async () => {
+    await withSite(async site => {
+      const root = await folderApiOpen(START, { mode: 'fetch' });
+      const c = child(root, 'c');
+      const collapse = new AbortController();
+      const pending = c.expand({ signal: collapse.signal });
+      expect(c.status).toBe('loading');
+      await new Promise(r => setTimeout(r, 5));
+      collapse.abort(); // request in flight: cancelled
+      await expect(pending).rejects.toMatchObject({ name: 'AbortError' });
+      expect(c.status).toBe('idle');
+      expect(c.node.children).toEqual([]);
+      await c.expand();
+      expect(c.children.map(h => h.node.name)).toEqual(['x', 'y']);
+      expect(site.aborted).toEqual(['/root/c/']);
+    });
+  });
+
+  it('prefetches the next level at idle time until cancelled', async () => {
+    await withSite(async site => {
+      const root = await folderApiOpen(START, { mode: 'fetch' });
+      await root.prefetchChildren({ idle: true });
+      expect(site.requested).toEqual(['/root/', '/root/a/', '/root/b/', '/root/c/', '/root/missing/']);
+      expect(root.stats.prefetched).toBe(3); // missing/ failed and is not counted
+      await child(root, 'a').expand();
+      expect(site.requested).toHaveLength(5);
+
+      const a = child(root, 'a');
+      const stop = new AbortController();
+      const idle = a.prefetchChildren({ idle: true, signal: stop.signal });
+      stop.abort();
+      await idle;
+      expect(site.requested).toHaveLength(5);
+    });
+  });
+
+  it('reports a failed expand on the handle and after close() rejects further expands', async () => {
+    await withSite(async () => {
+      const root = await folderApiOpen(START, { mode: 'fetch' });
+      const missing = child(root, 'missing');
+      await expect(missing.expand()).rejects.toThrow('http 404');
+      expect(missing).toMatchObject({ status: 'error', error: 'http 404' });
+      root.close();
+      await expect(child(root, 'a').expand()).rejects.toMatchObject({ name: 'AbortError' });
+    });
+  });
+
+  it('leaves no timers behind when closed during Retry-After backoffs', async () => {
+    const originalFetch = globalThis.fetch;
+    const throttled = () => new Response('', { status: 503, headers: { 'retry-after': '30' } });
+    // the HEAD of a/f1.txt and the listing of b/ are throttled; the rest answer at once
+    globalThis.fetch = async (resource: any, init?: any) => {
+      const path = new URL(resource.toString()).pathname;
+      if (init?.method === 'HEAD') return path === '/root/a/f1.txt' ? throttled() : new Response(null, { status: 200, headers: { 'content-type': 'text/plain' } });
+      if (path === '/root/b/') return throttled();
+      return new Response(listingFor(path, false), { status: 200, headers: { 'content-type': 'text/html' } });
+    };
+    try {
+      await withTimers(async pending => {
+        const root = await folderApiOpen(START, { mode: 'fetch', includeMime: true });
+        const a = child(root, 'a').expand();
+        const b = child(root, 'b').expand();
+        await new Promise(resolve => setTimeout(resolve, 20)); // both answered 503 and wait out Retry-After
+        const c = child(root, 'c').expand(); // queued behind the origin's pause
+        expect(pending.size).toBeGreaterThan(0);
+        root.close();
+        expect(pending.size).toBe(0); // backoff waits and the wake timer are cleared right away
+        await a; // MIME enrichment is cut short, the listing itself was complete
+        await expect(b).rejects.toBeDefined();
+        await expect(c).rejects.toMatchObject({ name: 'AbortError' });
+        expect(pending.size).toBe(0);
+      });
+    } finally {
+      globalThis.fetch = originalFetch;
+    }
+  });
+});
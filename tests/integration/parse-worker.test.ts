@@ -0,0 +1,123 @@
+import { describe, it, expect, afterEach } from 'vitest';
+import { folderApiRequest } from '../../src/folderApiRequest.js';
+import { normalizeOptions } from '../../src/options.js';
+import { handleParseMessage, terminateParseWorkers } from '../../src/core/parseWorkers.js';
+
+// root -> d0..d3, each with two files
+function listingFor(path: string): string | null {
+  if (path === '/root/') return `<pre>\n${[0, 1, 2, 3].map(i => `<a href="d${i}/">d${i}/</a> 2024-03-01 12:00 -`).join('\n')}\n</pre>`;
+  const m = /^\/root\/d(\d)\/$/.exec(path);
+  if (!m) return null;
+  return `<pre>\n<a href="a${m[1]}.bin">a${m[1]}.bin</a> 2024-03-01 12:00 1K\n<a href="b${m[1]}.bin">b${m[1]}.bin</a> 2024-03-01 12:00 2K\n</pre>`;
+}
+
+// Stands in for a module Worker: answers with the real worker handler on a later task.
+function installWorker(behaviour: 'ok' | 'fail' = 'ok') {
+  const original = (globalThis as any).Worker;
+  const log = { created: 0, messages: 0, busy: 0, peakBusy: 0 };
+  (globalThis as any).Worker = class {
+    onmessage: ((ev: { data: unknown }) => void) | null = null;
+    onerror: ((ev: unknown) => void) | null = null;
+    constructor(url: URL, init: { type: string }) {
+      expect(String(url)).toMatch(/parseWorker\.js$/);
+      expect(init.type).toBe('module');
+      log.created++;
+    }
+    postMessage(req: any) {
+      log.messages++;
+      log.peakBusy = Math.max(log.peakBusy, ++log.busy);
+      setTimeout(() => {
+        log.busy--;
+        if (behaviour === 'fail') this.onerror?.({ message: 'failed to load module script' });
+        else this.onmessage?.({ data: structuredClone(handleParseMessage(structuredClone(req))) });
+      }, 5);
+    }
+    terminate() {}
+  };
+  return { log, restore: () => { (globalThis as any).Worker = original; } };
+}
+
+async function crawl(options: any) {
+  const originalFetch = globalThis.fetch;
+  globalThis.fetch = async (resource: any) => {
+    const html = listingFor(new URL(resource.toString()).pathname);
+    if (html == null) return new Response('', { status: 404 });
+    return new Response(html, { status: 200, headers: { 'content-type': 'text/html' } });
+  };
+  try {
+    return await folderApiRequest('https://example.com/root/', { mode: 'fetch', maxDepth: 1, parser: 'tokenizer', ...options });
+  } finally {
+    globalThis.fetch = originalFetch;
+  }
+}
+
+function summary(res: Awaited<ReturnType<typeof crawl>>) {
+  return {
+    folders: res.folders.map(f => [f.url, f.role, f.date]),
+    files: res.files.map(f => [f.url, f.size, f.date])
+  };
+}
+
+describe('parseInWorker', () => {
+  afterEach(() => {
+    terminateParseWorkers();
+  });
+
+  it('parses on the worker pool with the same result as inline parsing', async () => {
+    const inline = await crawl({ directoryConcurrency: 4 });
+    const worker = installWorker();
+    try {
+      const res = await crawl({ directoryConcurrency: 4, parseInWorker: 2 });
+      expect(summary(res)).toEqual(summary(inline));
+      expect(res.files).toHaveLength(8);
+      expect(worker.log.messages).toBe(5); // one per listing
+      expect(worker.log.created).toBeLessThanOrEqual(2);
+      expect(worker.log.peakBusy).toBeLessThanOrEqual(2);
+    } finally {
+      worker.restore();
+    }
+  });
+
+  it('reports worker parse time through hooks and timings', async () => {
+    const worker = installWorker();
+    try {
+      const parses: number[] = [];
+      const res = await crawl({ parseInWorker: true, timings: true, hooks: { onParseEnd: (e: any) => parses.push(e.ms) } });
+      expect(parses).toHaveLength(5);
+      expect(res.stats.timings!.parseMs).toBeGreaterThan(0);
+    } finally {
+      worker.restore();
+    }
+  });
+
+  it('falls back to inline parsing when workers cannot start', async () => {
+    const inline = await crawl({});
+    const worker = installWorker('fail');
+    try {
+      const res = await crawl({ directoryConcurrency: 4, parseInWorker: 4 });
+      expect(summary(res)).toEqual(summary(inline));
+      expect(res.errors).toEqual([]);
+      expect(worker.log.created).toBeGreaterThan(0);
+    } finally {
+      worker.restore();
+    }
+  });
+
+  it('keeps parser: dom on the calling thread', async () => {
+    const worker = installWorker();
+    try {
+      await crawl({ parser: 'dom', parseInWorker: 2 });
+      expect(worker.log.created).toBe(0);
+    } finally {
+      worker.restore();
+    }
+  });
+
+  it('sizes the pool from options', () => {
+    expect(normalizeOptions({}).parseInWorker).toBe(0);
+    expect(normalizeOptions({ parseInWorker: false }).parseInWorker).toBe(0);
+    expect(normalizeOptions({ parseInWorker: 3.7 }).parseInWorker).toBe(3);
+    expect(normalizeOptions({ parseInWorker: -2 }).parseInWorker).toBe(0);
+    expect(normalizeOptions({ parseInWorker: true }).parseInWorker).toBe(navigator.hardwareConcurrency || 4);
+  });
+});
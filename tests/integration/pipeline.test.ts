@@ -0,0 +1,58 @@
+import { describe, it, expect } from 'vitest';
+import { folderApiRequest } from '../../src/folderApiRequest.js';
+
+// root -> d0..d3, each with two files; every request takes 10ms
+function listingFor(path: string): string | null {
+  if (path === '/root/') return `<pre>\n${[0, 1, 2, 3].map(i => `<a href="d${i}/">d${i}/</a> 2024-03-01 12:00 -`).join('\n')}\n</pre>`;
+  const m = /^\/root\/d(\d)\/$/.exec(path);
+  if (!m) return null;
+  return `<pre>\n<a href="a${m[1]}.bin">a${m[1]}.bin</a> 2024-03-01 12:00 -\n<a href="b${m[1]}.bin">b${m[1]}.bin</a> 2024-03-01 12:00 -\n</pre>`;
+}
+
+async function crawl(options: any) {
+  const log: Array<{ kind: string; path: string; start: number; end: number }> = [];
+  let inFlight = 0;
+  let peak = 0;
+  const originalFetch = globalThis.fetch;
+  globalThis.fetch = async (resource: any, init?: any) => {
+    const url = new URL(resource.toString());
+    const entry = { kind: init?.method === 'HEAD' ? 'head' : 'get', path: url.pathname, start: performance.now(), end: 0 };
+    log.push(entry);
+    peak = Math.max(peak, ++inFlight);
+    try {
+      await new Promise(r => setTimeout(r, 10));
+      if (entry.kind === 'head') return new Response('', { status: 200, headers: { 'content-type': 'application/x-test', 'content-length': '5' } });
+      const html = listingFor(url.pathname);
+      if (html == null) return new Response('', { status: 404 });
+      return new Response(html, { status: 200, headers: { 'content-type': 'text/html' } });
+    } finally {
+      inFlight--;
+      entry.end = performance.now();
+    }
+  };
+  try {
+    const res = await folderApiRequest('https://example.com/root/', { mode: 'fetch', maxDepth: 1, includeMime: true, ...options });
+    return { res, log, peak };
+  } finally {
+    globalThis.fetch = originalFetch;
+  }
+}
+
+describe('pipelined HEAD enrichment', () => {
+  it('starts HEADs while listings are still loading', async () => {
+    const { res, log } = await crawl({});
+    const firstHead = Math.min(...log.filter(e => e.kind === 'head').map(e => e.start));
+    const lastListingEnd = Math.max(...log.filter(e => e.kind === 'get').map(e => e.end));
+    expect(firstHead).toBeLessThan(lastListingEnd);
+    expect(res.stats.heads).toBe(8);
+    expect(res.files.every(f => f.mime === 'application/x-test' && f.size === 5)).toBe(true);
+    expect(res.files.map(f => f.name)).toEqual(['a0.bin', 'b0.bin', 'a1.bin', 'b1.bin', 'a2.bin', 'b2.bin', 'a3.bin', 'b3.bin']);
+  });
+
+  it('shares one per-origin budget between listings and HEADs', async () => {
+    const { res, peak } = await crawl({ originConcurrency: 2, directoryConcurrency: 4, headConcurrency: 4 });
+    expect(peak).toBeLessThanOrEqual(2);
+    expect(res.stats.heads).toBe(8);
+    expect(res.stats.fetches).toBe(5);
+  });
+});
@@ -0,0 +1,100 @@
+import { describe, it, expect } from 'vitest';
+import { folderApiRequest } from '../../src/folderApiRequest.js';
+import { folderApiStream } from '../../src/folderApiStream.js';
+
+// Directory path -> [folders, files]
+const SITE: Record<string, [string[], string[]]> = {
+  '/root/': [['videos', 'node_modules', '.git', 'docs'], ['intro.mp4', 'readme.md']],
+  '/root/videos/': [['2024', 'raw'], ['a.mp4', 'b.txt']],
+  '/root/videos/2024/': [[], ['c.mp4', 'd.mp4']],
+  '/root/videos/raw/': [[], ['e.mov']],
+  '/root/node_modules/': [['pkg'], ['x.js']],
+  '/root/node_modules/pkg/': [[], ['index.js']],
+  '/root/.git/': [[], ['config']],
+  '/root/docs/': [[], ['guide.md', 'demo.mp4']]
+};
+
+async function crawl(options: any) {
+  const originalFetch = globalThis.fetch;
+  const requested: string[] = [];
+  const aborted: string[] = [];
+  globalThis.fetch = async (resource: any, init?: any) => {
+    const path = new URL(resource.toString()).pathname;
+    requested.push(path);
+    await new Promise<void>((resolve, reject) => {
+      const timer = setTimeout(resolve, path === '/root/' ? 0 : 10);
+      init?.signal?.addEventListener('abort', () => {
+        clearTimeout(timer);
+        aborted.push(path);
+        reject(new DOMException('aborted', 'AbortError'));
+      }, { once: true });
+    });
+    const listing = SITE[path];
+    if (!listing) return new Response('', { status: 404 });
+    const rows = [...listing[0].map(d => `<a href="${d}/">${d}/</a> 2024-03-01 12:00 -`), ...listing[1].map(f => `<a href="${f}">${f}</a> 2024-03-01 12:00 1K`)];
+    return new Response(`<!doctype html><pre>\n${rows.join('\n')}\n</pre>`, { status: 200, headers: { 'content-type': 'text/html' } });
+  };
+  try {
+    const res = await folderApiRequest('https://example.com/root/', { mode: 'fetch', maxDepth: 5, ...options });
+    return { res, requested, aborted, files: res.files.map(f => new URL(f.url).pathname) };
+  } finally {
+    globalThis.fetch = originalFetch;
+  }
+}
+
+describe('traversal pruning', () => {
+  it('lists only folders that can hold an includeGlobs match', async () => {
+    const { res, requested, files } = await crawl({ includeGlobs: ['videos/**/*.mp4'] });
+    expect(files).toEqual(['/root/videos/a.mp4', '/root/videos/2024/c.mp4', '/root/videos/2024/d.mp4']);
+    expect(requested).toEqual(['/root/', '/root/videos/', '/root/videos/2024/', '/root/videos/raw/']);
+    expect(res.folders.filter(f => f.role === 'child').map(f => f.name)).toEqual(['videos', '2024', 'raw']);
+    expect(res.stats.pruned).toBe(3); // node_modules, .git, docs
+  });
+
+  it('skips excluded and hidden folders before fetching them', async () => {
+    const { res, requested, files } = await crawl({ excludeGlobs: ['node_modules/', '*.txt'], skipHidden: true });
+    expect(requested.sort()).toEqual(['/root/', '/root/docs/', '/root/videos/', '/root/videos/2024/', '/root/videos/raw/']);
+    expect(files).not.toContain('/root/videos/b.txt');
+    expect(files).toContain('/root/docs/demo.mp4');
+    expect(res.root.children.map(c => c.name)).toEqual(['videos', 'docs']);
+    expect(res.stats.pruned).toBe(2);
+  });
+
+  it('applies the entry predicate to folders and files', async () => {
+    const seen: string[] = [];
+    const { requested, files } = await crawl({
+      filter: (e: any) => {
+        seen.push(e.name);
+        return e.kind === 'folder' ? e.name !== 'videos' : e.name.endsWith('.md');
+      }
+    });
+    expect(requested).not.toContain('/root/videos/');
+    expect(files).toEqual(['/root/readme.md', '/root/docs/guide.md']);
+    expect(seen).not.toContain('..'); // root / parent entries are not filtered
+  });
+
+  it('stops at maxResults and cancels outstanding listing loads', async () => {
+    const { res, files, aborted } = await crawl({ includeGlobs: ['*.mp4'], maxResults: 2, directoryConcurrency: 4 });
+    expect(files).toEqual(['/root/intro.mp4', '/root/videos/a.mp4']);
+    expect(res.files).toHaveLength(2);
+    expect(aborted.length).toBeGreaterThan(0); // prefetched siblings that would no longer be used
+  });
+
+  it('reports pruned folders in stream progress', async () => {
+    const originalFetch = globalThis.fetch;
+    globalThis.fetch = async (resource: any) => {
+      const listing = SITE[new URL(resource.toString()).pathname];
+      const rows = [...listing[0].map(d => `<a href="${d}/">${d}/</a>`), ...listing[1].map(f => `<a href="${f}">${f}</a>`)];
+      return new Response(`<pre>\n${rows.join('\n')}\n</pre>`, { status: 200, headers: { 'content-type': 'text/html' } });
+    };
+    try {
+      const progress: number[] = [];
+      for await (const ev of folderApiStream('https://example.com/root/', { mode: 'fetch', maxDepth: 5, skipHidden: true })) {
+        if (ev.type === 'progress') progress.push(ev.pruned);
+      }
+      expect(progress[progress.length - 1]).toBe(1);
+    } finally {
+      globalThis.fetch = originalFetch;
+    }
+  });
+});
@@ -0,0 +1,104 @@
+import { describe, it, expect } from 'vitest';
+import { folderApiRequest } from '../../src/folderApiRequest.js';
+import { FolderApiSession } from '../../src/core/session.js';
+
+// Directory path -> [folders, files]
+const SITE: Record<string, [string[], string[]]> = {
+  '/root/': [['a', 'b'], ['top.txt']],
+  '/root/a/': [['deep'], ['one.txt']],
+  '/root/a/deep/': [[], ['two.txt']],
+  '/root/b/': [[], ['three.txt']]
+};
+
+async function withSite<T>(run: (requested: string[]) => Promise<T>): Promise<T> {
+  const originalFetch = globalThis.fetch;
+  const requested: string[] = [];
+  globalThis.fetch = async (resource: any, init?: any) => {
+    const path = new URL(resource.toString()).pathname;
+    requested.push(path);
+    await new Promise<void>((resolve, reject) => {
+      const timer = setTimeout(resolve, 10);
+      init?.signal?.addEventListener('abort', () => {
+        clearTimeout(timer);
+        reject(new DOMException('aborted', 'AbortError'));
+      }, { once: true });
+    });
+    const listing = SITE[path];
+    if (!listing) return new Response('', { status: 404 });
+    const rows = [...listing[0].map(d => `<a href="${d}/">${d}/</a> 2024-03-01 12:00 -`), ...listing[1].map(f => `<a href="${f}">${f}</a> 2024-03-01 12:00 1K`)];
+    return new Response(`<!doctype html><pre>\n${rows.join('\n')}\n</pre>`, { status: 200, headers: { 'content-type': 'text/html' } });
+  };
+  try {
+    return await run(requested);
+  } finally {
+    globalThis.fetch = originalFetch;
+  }
+}
+
+const paths = (res: any) => res.files.map((f: any) => new URL(f.url).pathname).sort();
+
+describe('FolderApiSession', () => {
+  it('fetches each listing once for concurrent calls in one session', async () => {
+    await withSite(async requested => {
+      const session = new FolderApiSession({ directoryConcurrency: 2 });
+      const [x, y] = await Promise.all([
+        folderApiRequest('https://example.com/root/', { mode: 'fetch', maxDepth: 5, session }),
+        folderApiRequest('https://example.com/root/', { mode: 'fetch', maxDepth: 5, session })
+      ]);
+      expect(requested.sort()).toEqual(['/root/', '/root/a/', '/root/a/deep/', '/root/b/']);
+      expect(paths(x)).toEqual(paths(y));
+      expect(paths(x)).toHaveLength(4);
+      expect(x.stats.coalesced + y.stats.coalesced).toBe(4);
+      expect(Object.keys(y.directories).sort()).toEqual(Object.keys(x.directories).sort());
+      expect(session.inFlight).toBe(0);
+    });
+  });
+
+  it('shares overlapping subtrees between calls with different start folders', async () => {
+    await withSite(async requested => {
+      const session = new FolderApiSession();
+      const [whole, sub] = await Promise.all([
+        folderApiRequest('https://example.com/root/', { mode: 'fetch', maxDepth: 5, session }),
+        folderApiRequest('https://example.com/root/a/', { mode: 'fetch', maxDepth: 5, session })
+      ]);
+      expect(requested.filter(p => p === '/root/a/')).toHaveLength(1);
+      expect(paths(sub)).toEqual(['/root/a/deep/two.txt', '/root/a/one.txt']);
+      expect(paths(whole)).toHaveLength(4);
+      expect(sub.folders.find(f => f.role === 'self')?.name).toBe('a'); // roles stay relative to each call's start
+    });
+  });
+
+  it('keeps a shared load running when only one of its callers aborts', async () => {
+    await withSite(async requested => {
+      const session = new FolderApiSession();
+      const controller = new AbortController();
+      const cancelled = folderApiRequest('https://example.com/root/', { mode: 'fetch', session, signal: controller.signal });
+      const kept = folderApiRequest('https://example.com/root/', { mode: 'fetch', session });
+      setTimeout(() => controller.abort(), 2);
+      await expect(cancelled).rejects.toThrow();
+      const res = await kept;
+      expect(res.files.map(f => f.name)).toEqual(['top.txt']);
+      expect(requested).toEqual(['/root/']);
+    });
+  });
+
+  it('uses the session limits instead of the call options', async () => {
+    await withSite(async () => {
+      const session = new FolderApiSession({ originConcurrency: 2, adaptiveConcurrency: false, directoryConcurrency: 4 });
+      const res = await folderApiRequest('https://example.com/root/', { mode: 'fetch', maxDepth: 5, originConcurrency: 16, session });
+      expect(res.stats.concurrency).toBe(2);
+      expect(res.stats.peakConcurrency).toBeLessThanOrEqual(2);
+    });
+  });
+
+  it('loads separately without a session', async () => {
+    await withSite(async requested => {
+      const [x] = await Promise.all([
+        folderApiRequest('https://example.com/root/', { mode: 'fetch' }),
+        folderApiRequest('https://example.com/root/', { mode: 'fetch' })
+      ]);
+      expect(requested).toEqual(['/root/', '/root/']);
+      expect(x.stats.coalesced).toBe(0);
+    });
+  });
+});
@@ -0,0 +1,74 @@
+import { describe, it, expect } from 'vitest';
+import { folderApiStream } from '../../src/folderApiStream.js';
+import { folderApiRequest } from '../../src/folderApiRequest.js';
+import { FolderApiStreamEvent } from '../../src/types.js';
+
+// root -> a/ b/ c/ -> x/ y/ -> one file each
+function listingFor(path: string): string | null {
+  const depth = path.split('/').filter(Boolean).length - 1;
+  if (depth > 2) return null;
+  const rows: string[] = [];
+  if (depth === 0) for (const d of ['a', 'b', 'c']) rows.push(`<a href="${d}/">${d}/</a> 2024-03-01 12:00 -`);
+  if (depth === 1) for (const d of ['x', 'y']) rows.push(`<a href="${d}/">${d}/</a> 2024-03-01 12:00 -`);
+  rows.push(`<a href="f${depth}.txt">f${depth}.txt</a> 2024-03-01 12:00 1K`);
+  if (depth === 2 && path.includes('/c/y/')) rows.push('<a href="bad%E0%A4%.txt">bad</a> 2024-03-01 12:00 1K');
+  return `<!doctype html><pre>\n${rows.join('\n')}\n</pre>`;
+}
+
+async function withSite<T>(fn: (counter: { fetches: number }) => Promise<T>): Promise<T> {
+  const originalFetch = globalThis.fetch;
+  const counter = { fetches: 0 };
+  globalThis.fetch = async (resource: any) => {
+    counter.fetches++;
+    await new Promise(r => setTimeout(r, 5));
+    const html = listingFor(new URL(resource.toString()).pathname);
+    if (html == null) return new Response('', { status: 404 });
+    return new Response(html, { status: 200, headers: { 'content-type': 'text/html' } });
+  };
+  try {
+    return await fn(counter);
+  } finally {
+    globalThis.fetch = originalFetch;
+  }
+}
+
+describe('folderApiStream', () => {
+  it('yields directory batches in traversal order with progress and errors', async () => {
+    await withSite(async () => {
+      const events: FolderApiStreamEvent[] = [];
+      for await (const ev of folderApiStream('https://example.com/root/', { mode: 'fetch', maxDepth: 2 })) events.push(ev);
+      const dirs = events.flatMap(e => e.type === 'directory' ? [e.url.replace('https://example.com', '')] : []);
+      expect(dirs).toEqual([
+        '/root/', '/root/a/', '/root/a/x/', '/root/a/y/', '/root/b/', '/root/b/x/', '/root/b/y/',
+        '/root/c/', '/root/c/x/', '/root/c/y/'
+      ]);
+      const last = events.filter(e => e.type === 'progress').pop();
+      expect(last).toMatchObject({ type: 'progress', directories: 10, fetches: 10 });
+      expect(events.some(e => e.type === 'error' && e.error.startsWith('decode:'))).toBe(true);
+    });
+  });
+
+  it('matches the entries collected by folderApiRequest', async () => {
+    await withSite(async () => {
+      const files: string[] = [];
+      for await (const ev of folderApiStream('https://example.com/root/', { mode: 'fetch', maxDepth: 2, directoryConcurrency: 3 })) {
+        if (ev.type === 'directory') files.push(...ev.files.map(f => f.url));
+      }
+      const res = await folderApiRequest('https://example.com/root/', { mode: 'fetch', maxDepth: 2 });
+      expect(files).toEqual(res.files.map(f => f.url));
+    });
+  });
+
+  it('does not schedule new fetches while the consumer is paused', async () => {
+    await withSite(async counter => {
+      const it = folderApiStream('https://example.com/root/', { mode: 'fetch', maxDepth: 2, directoryConcurrency: 4 })[Symbol.asyncIterator]();
+      const first = await it.next();
+      expect(first.value).toMatchObject({ type: 'directory', depth: 0 });
+      await new Promise(r => setTimeout(r, 50));
+      // root plus its three prefetched children; grandchildren wait for the consumer
+      expect(counter.fetches).toBe(4);
+      while (!(await it.next()).done) { /* drain */ }
+      expect(counter.fetches).toBe(10);
+    });
+  });
+});
@@ -0,0 +1,44 @@
+import { describe, it, expect } from 'vitest';
+import { folderApiRequest } from '../../src/folderApiRequest.js';
+
+// The first request for every URL (GET or HEAD, or HEAD only) is refused; the retry succeeds.
+async function crawlWithPushback(status: number, options: any = {}, refuse: 'all' | 'head' = 'all') {
+  const seen = new Map<string, number>();
+  const originalFetch = globalThis.fetch;
+  globalThis.fetch = async (resource: any, init?: any) => {
+    const url = resource.toString();
+    const key = `${init?.method ?? 'GET'} ${url}`;
+    const n = (seen.get(key) ?? 0) + 1;
+    seen.set(key, n);
+    if (n === 1 && (refuse === 'all' || init?.method === 'HEAD')) return new Response('busy', { status, headers: { 'retry-after': '0', 'content-type': 'text/html' } });
+    if (init?.method === 'HEAD') return new Response('', { status: 200, headers: { 'content-type': 'text/plain', 'content-length': '9' } });
+    const html = url.endsWith('/root/')
+      ? `<pre>\n<a href="sub/">sub/</a> 2024-03-01 12:00 -\n<a href="a.txt">a.txt</a> 2024-03-01 12:00 -\n</pre>`
+      : `<pre>\n<a href="b.txt">b.txt</a> 2024-03-01 12:00 -\n</pre>`;
+    return new Response(html, { status: 200, headers: { 'content-type': 'text/html' } });
+  };
+  try {
+    return await folderApiRequest('https://example.com/root/', { maxDepth: 1, includeMime: true, ...options });
+  } finally {
+    globalThis.fetch = originalFetch;
+  }
+}
+
+describe('429 / 503 handling', () => {
+  it('retries listings and HEADs after 429 instead of falling back or failing', async () => {
+    const res = await crawlWithPushback(429);
+    expect(res.errors).toEqual([]);
+    expect(res.stats.iframes).toBe(0);
+    expect(res.files.map(f => [f.name, f.mime, f.size])).toEqual([['a.txt', 'text/plain', 9], ['b.txt', 'text/plain', 9]]);
+    expect(res.stats.retries).toBe(4);
+    expect(res.stats.concurrency).toBeGreaterThanOrEqual(1);
+    expect(res.stats.peakConcurrency).toBeGreaterThanOrEqual(1);
+  });
+
+  it('reports a failed HEAD once the retry budget is exhausted', async () => {
+    const res = await crawlWithPushback(503, { retries: 0, maxDepth: 0 }, 'head');
+    expect(res.stats.retries).toBe(0);
+    expect(res.errors).toEqual(['mime: failed HEAD for https://example.com/root/a.txt']);
+    expect(res.files[0].mime).toBeUndefined();
+  });
+});
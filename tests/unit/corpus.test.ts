@@ -0,0 +1,117 @@
+import { describe, it, expect, beforeAll, afterAll } from 'vitest';
+import { spawnSync } from 'node:child_process';
+import { mkdtempSync, mkdirSync, writeFileSync, statSync, rmSync } from 'node:fs';
+import { tmpdir } from 'node:os';
+import { join } from 'node:path';
+import { fileURLToPath } from 'node:url';
+import { openCorpus } from '../corpus.js';
+
+// Round trip: scripts/corpus.py packs a listings/ tree, the TS loader reads it back.
+const PYTHON = process.env.FOLDER_API_PYTHON ?? 'python3';
+const SCRIPT = fileURLToPath(new URL('../../scripts/corpus.py', import.meta.url));
+const hasPython = spawnSync(PYTHON, ['--version']).status === 0;
+
+function pack(tree: string, corpus: string, ...flags: string[]) {
+  const res = spawnSync(PYTHON, [SCRIPT, 'pack', tree, corpus, ...flags], { encoding: 'utf8' });
+  if (res.status !== 0) throw new Error(res.stderr);
+  return res.stdout;
+}
+
+function write(root: string, rel: string, body: string) {
+  mkdirSync(join(root, rel, '..'), { recursive: true });
+  writeFileSync(join(root, rel), body);
+}
+
+describe.skipIf(!hasPython)('listing corpus', () => {
+  let dir = '';
+  let tree = '';
+  let file = '';
+  const same = '<pre><a href="a.txt">a.txt</a> 01-Mar-2024 12:00 1K</pre>';
+
+  beforeAll(() => {
+    dir = mkdtempSync(join(tmpdir(), 'folder-api-corpus-'));
+    tree = join(dir, 'listings');
+    file = join(dir, 'listings.corpus');
+    write(tree, 'nginx/listing.html', '<pre><a href="sub/">sub/</a></pre>');
+    write(tree, 'nginx/sub/listing.html', same);
+    write(tree, 'caddy/sub/listing.html', same);
+    write(tree, 'caddy/café/listing.error.txt', '404 Client Error');
+  });
+
+  afterAll(() => {
+    rmSync(dir, { recursive: true, force: true });
+  });
+
+  it('dedupes identical listings and reads entries lazily', async () => {
+    expect(pack(tree, file)).toContain('3 new blobs, 1 deduplicated');
+    const corpus = await openCorpus(file);
+    try {
+      expect(corpus.size).toBe(4);
+      expect(corpus.servers().sort()).toEqual(['caddy', 'nginx']);
+      expect(corpus.entries('caddy').map(e => [e.path, e.kind]).sort()).toEqual([['café/', 'error'], ['sub/', 'html']]);
+      expect(await corpus.read('nginx', 'sub/')).toBe(same);
+      expect(await corpus.read('nginx', '')).toContain('href="sub/"');
+      expect(await corpus.read('nginx', 'missing/')).toBeUndefined();
+      const bodies = [];
+      for await (const l of corpus.listings({ kind: 'html' })) bodies.push([l.server, l.path, l.body.length]);
+      expect(bodies).toHaveLength(3);
+    } finally {
+      await corpus.close();
+    }
+  });
+
+  it('updates in place, appending only changed listings', async () => {
+    pack(tree, file);
+    const before = statSync(file).size;
+    expect(pack(tree, file)).toContain('0 new blobs');
+    expect(statSync(file).size).toBe(before);
+
+    write(tree, 'nginx/sub/listing.html', same.replace('1K', '2K'));
+    expect(pack(tree, file)).toContain('1 new blobs');
+    const corpus = await openCorpus(file);
+    try {
+      expect(await corpus.read('nginx', 'sub/')).toContain('2K');
+      expect(await corpus.read('caddy', 'sub/')).toBe(same);
+    } finally {
+      await corpus.close();
+    }
+  });
+
+  it('stays readable when an update dies before writing its index', async () => {
+    pack(tree, file);
+    const before = statSync(file).size;
+    // a collector killed mid-run: new blobs appended, close() never reached
+    const crash = spawnSync(PYTHON, ['-c', [
+      'import os, sys',
+      `sys.path.insert(0, ${JSON.stringify(join(SCRIPT, '..'))})`,
+      'from corpus import CorpusWriter',
+      `w = CorpusWriter(${JSON.stringify(file)})`,
+      'w.put("nginx", "new/", "<pre>fresh</pre>")',
+      'w._file.flush()',
+      'os._exit(1)'
+    ].join('\n')], { encoding: 'utf8' });
+    expect(crash.status).toBe(1);
+    expect(statSync(file).size).toBeGreaterThan(before);
+
+    let corpus = await openCorpus(file);
+    try {
+      expect(corpus.has('nginx', 'new/')).toBe(false);
+      expect(await corpus.read('caddy', 'sub/')).toBe(same);
+    } finally {
+      await corpus.close();
+    }
+    const ls = spawnSync(PYTHON, [SCRIPT, 'ls', file], { encoding: 'utf8' });
+    expect(ls.status).toBe(0);
+    expect(ls.stdout).toContain('caddy\t/sub/');
+
+    write(tree, 'nginx/new/listing.html', '<pre>fresh</pre>');
+    expect(pack(tree, file)).toContain('1 new blobs');
+    corpus = await openCorpus(file);
+    try {
+      expect(await corpus.read('nginx', 'new/')).toBe('<pre>fresh</pre>');
+      expect(await corpus.read('caddy', 'sub/')).toBe(same);
+    } finally {
+      await corpus.close();
+    }
+  });
+});
@@ -18,5 +18,16 @@ describe('parseDateMeta', () => {
     const iso = parseDateMeta('1/2/2022 3:04 PM', errors)!;
     expect(iso.startsWith('2022-01-02T15:04:00')).toBe(true);
   });
+  it('parses IIS dates padded with a second space, and seconds', () => {
+    const errors: string[] = [];
+    expect(parseDateMeta('10/10/2000  6:07 AM          150', errors)).toBe('2000-10-10T06:07:00.000Z');
+    expect(parseDateMeta('9/29/2020 9:58:07 PM', errors)).toBe('2020-09-29T21:58:07.000Z');
+    expect(errors).toEqual([]);
+  });
+  it('reads numeric dates in the order it is given', () => {
+    const errors: string[] = [];
+    expect(parseDateMeta('03/04/2024 10:00', errors, 'dmy')).toBe('2024-04-03T10:00:00.000Z');
+    expect(parseDateMeta('03/04/2024 10:00', errors, 'mdy')).toBe('2024-03-04T10:00:00.000Z');
+    expect(errors).toEqual([]);
+  });
 });
-
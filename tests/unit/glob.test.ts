@@ -0,0 +1,50 @@
+import { describe, it, expect } from 'vitest';
+import { compileGlobs, relativeGlobPath } from '../../src/utils/glob.js';
+
+const matches = (patterns: string[], path: string, folder = false) => compileGlobs(patterns)!.some(g => g.matches(path, folder));
+const below = (patterns: string[], path: string) => compileGlobs(patterns)!.some(g => g.matchesBelow(path));
+
+describe('globs', () => {
+  it('matches names at any depth when the pattern has no slash', () => {
+    expect(matches(['*.mp4'], 'clip.mp4')).toBe(true);
+    expect(matches(['*.mp4'], 'videos/2024/clip.mp4')).toBe(true);
+    expect(matches(['*.mp4'], 'videos/clip.mp4.part')).toBe(false);
+    expect(matches(['node_modules/'], 'a/node_modules', true)).toBe(true);
+    expect(matches(['node_modules/'], 'a/node_modules', false)).toBe(false); // trailing slash: folders only
+  });
+
+  it('anchors patterns with a slash to the start folder', () => {
+    expect(matches(['videos/*.mp4'], 'videos/a.mp4')).toBe(true);
+    expect(matches(['videos/*.mp4'], 'x/videos/a.mp4')).toBe(false);
+    expect(matches(['/docs'], 'docs', true)).toBe(true);
+    expect(matches(['**/*.mp4'], 'a.mp4')).toBe(true);
+    expect(matches(['videos/**'], 'videos', true)).toBe(true); // ** also matches zero segments
+    expect(matches(['videos/**/raw/*'], 'videos/raw/x')).toBe(true);
+    expect(matches(['videos/**/raw/*'], 'videos/a/b/raw/x')).toBe(true);
+    expect(matches(['videos/**/raw/*'], 'videos/a/b/x')).toBe(false);
+  });
+
+  it('supports ?, character classes and braces', () => {
+    expect(matches(['img_??.{jpg,png}'], 'img_01.png')).toBe(true);
+    expect(matches(['img_??.{jpg,png}'], 'img_1.png')).toBe(false);
+    expect(matches(['[!.]*'], '.env')).toBe(false);
+    expect(matches(['[a-c]*.txt'], 'b.txt')).toBe(true);
+    expect(matches(['a+b (1).txt'], 'a+b (1).txt')).toBe(true);
+    expect(() => compileGlobs(['[z-a]'])).toThrow('invalid glob');
+    expect(compileGlobs([])).toBeNull();
+  });
+
+  it('tells whether a folder can hold a match', () => {
+    expect(below(['videos/**/*.mp4'], 'videos')).toBe(true);
+    expect(below(['videos/**/*.mp4'], 'videos/2024/raw')).toBe(true);
+    expect(below(['videos/**/*.mp4'], 'docs')).toBe(false);
+    expect(below(['videos/*.mp4'], 'videos/2024')).toBe(false);
+    expect(below(['*.mp4'], 'anything/at/all')).toBe(true);
+  });
+
+  it('builds decoded paths relative to the start folder', () => {
+    expect(relativeGlobPath('https://x.test/root/my%20videos/a%2Bb.mp4', '/root/')).toBe('my videos/a+b.mp4');
+    expect(relativeGlobPath('https://x.test/root/sub/', '/root/')).toBe('sub');
+    expect(relativeGlobPath('https://x.test/other/bad%E0.txt', '/root/')).toBe('other/bad%E0.txt');
+  });
+});
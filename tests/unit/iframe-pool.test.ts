@@ -0,0 +1,129 @@
+import { describe, it, expect } from 'vitest';
+import { IframePool } from '../../src/core/iframeDirectory.js';
+import { OverloadError, RequestScheduler } from '../../src/utils/scheduler.js';
+
+// Stand-in for a sandboxed iframe: navigations (src or location.replace) fire `load` after a delay with a
+// document whose URL is the target; 'hang' never loads.
+class FakeFrame extends EventTarget {
+  style: Record<string, string> = {};
+  tabIndex = 0;
+  removed = false;
+  navigations: string[] = [];
+  private doc: { URL: string } = { URL: 'about:blank' };
+  contentWindow = {
+    location: { replace: (url: string) => this.go(url, 'replace') },
+    performance: { getEntriesByType: () => [{ decodedBodySize: 42 }] }
+  };
+
+  setAttribute() {}
+  remove() {
+    this.removed = true;
+  }
+  get contentDocument() {
+    return this.doc;
+  }
+  set src(url: string) {
+    this.go(url, 'src');
+  }
+
+  private go(url: string, how: string) {
+    this.navigations.push(`${how} ${url}`);
+    if (url.endsWith('hang')) return;
+    setTimeout(() => {
+      this.doc = { URL: url };
+      this.dispatchEvent(new Event('load'));
+    }, url === 'about:blank' ? 0 : 5);
+  }
+}
+
+function fakeDocument() {
+  const frames: FakeFrame[] = [];
+  const doc = {
+    createElement: () => new FakeFrame(),
+    body: { appendChild: (f: FakeFrame) => frames.push(f) }
+  };
+  return { frames, doc: doc as any as Document };
+}
+
+describe('IframePool', () => {
+  it('reuses one frame for sequential loads without adding history entries', async () => {
+    const { frames, doc } = fakeDocument();
+    const pool = new IframePool(2, doc);
+    for (const name of ['a', 'b', 'c']) {
+      const listing = await pool.load(`https://x.test/${name}/`, 1000);
+      expect(listing.document.URL).toBe(`https://x.test/${name}/`);
+      expect(listing.bytes()).toBe(42);
+      listing.release();
+    }
+    expect(pool.created).toBe(1);
+    expect(frames[0].navigations).toEqual([
+      'src https://x.test/a/', 'replace about:blank',
+      'replace https://x.test/b/', 'replace about:blank',
+      'replace https://x.test/c/', 'replace about:blank'
+    ]);
+    pool.close();
+    expect(frames[0].removed).toBe(true);
+  });
+
+  it('bounds concurrent loads by the pool size', async () => {
+    const { doc } = fakeDocument();
+    const pool = new IframePool(2, doc);
+    let active = 0;
+    let peak = 0;
+    const urls = [1, 2, 3, 4, 5].map(i => `https://x.test/${i}/`);
+    const loaded = await Promise.all(urls.map(async url => {
+      const listing = await pool.load(url, 1000);
+      peak = Math.max(peak, ++active);
+      await new Promise(r => setTimeout(r, 2));
+      const got = listing.document.URL;
+      active--;
+      listing.release();
+      return got;
+    }));
+    expect(loaded).toEqual(urls);
+    expect(peak).toBe(2);
+    expect(pool.created).toBe(2);
+    pool.close();
+  });
+
+  it('replaces a frame whose load timed out', async () => {
+    const { frames, doc } = fakeDocument();
+    const pool = new IframePool(1, doc);
+    await expect(pool.load('https://x.test/hang', 20)).rejects.toThrow('timeout');
+    expect(frames[0].removed).toBe(true);
+    const listing = await pool.load('https://x.test/ok/', 1000);
+    expect(listing.document.URL).toBe('https://x.test/ok/');
+    listing.release();
+    expect(pool.created).toBe(2);
+    pool.close();
+  });
+
+  it('times out like a fetch: a plain timeout error the scheduler does not retry', async () => {
+    const { frames, doc } = fakeDocument();
+    const pool = new IframePool(1, doc);
+    const scheduler = new RequestScheduler({ perOrigin: 2, listing: 2, head: 2, retries: 2 });
+    const error = await scheduler.run('https://x.test/hang', 'listing', () => pool.load('https://x.test/hang', 20)).catch(e => e);
+    expect(error).toBeInstanceOf(Error);
+    expect(error).not.toBeInstanceOf(OverloadError);
+    expect(error.message).toBe('timeout');
+    expect(frames[0].navigations).toEqual(['src https://x.test/hang']);
+    expect(scheduler.retried).toBe(0);
+    pool.close();
+  });
+
+  it('stops waiting for a frame when the signal aborts', async () => {
+    const { doc } = fakeDocument();
+    const pool = new IframePool(1, doc);
+    const first = await pool.load('https://x.test/a/', 1000);
+    const controller = new AbortController();
+    const waiting = pool.load('https://x.test/b/', 1000, controller.signal);
+    controller.abort();
+    await expect(waiting).rejects.toThrow();
+    first.release();
+    const next = await pool.load('https://x.test/c/', 1000);
+    expect(next.document.URL).toBe('https://x.test/c/');
+    next.release();
+    expect(pool.created).toBe(1);
+    pool.close();
+  });
+});
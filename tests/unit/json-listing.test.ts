@@ -0,0 +1,64 @@
+import { describe, it, expect } from 'vitest';
+import { parseJsonListing } from '../../src/core/parseJson.js';
+import { parseDirectoryHtml } from '../../src/core/parseDirectory.js';
+import { normalizeOptions } from '../../src/options.js';
+
+const opts = normalizeOptions({ preferJson: true });
+const BASE = 'https://example.com/root/';
+
+const NGINX = JSON.stringify([
+  { name: 'sub', type: 'directory', mtime: 'Fri, 01 Mar 2024 12:00:00 GMT' },
+  { name: 'file1.txt', type: 'file', mtime: 'Fri, 01 Mar 2024 12:00:00 GMT', size: 123 },
+  { name: 'space name.txt', type: 'file', mtime: 'Fri, 01 Mar 2024 12:02:00 GMT', size: 1250000 },
+  { name: '.hidden', type: 'file', mtime: 'Fri, 01 Mar 2024 12:03:00 GMT', size: 10 },
+  { name: 'fifo', type: 'other', mtime: 'Fri, 01 Mar 2024 12:03:00 GMT' }
+]);
+
+const CADDY = JSON.stringify([
+  { name: 'sub/', size: 4096, url: './sub/', mod_time: '2024-03-01T12:00:00.123456789Z', mode: 2147484141, is_dir: true, is_symlink: false },
+  { name: 'file1.txt', size: 123, url: './file1.txt', mod_time: '2024-03-01T13:00:00+01:00', mode: 420, is_dir: false, is_symlink: false },
+  { name: 'space name.txt', size: 1250000, url: './space%20name.txt', mod_time: '2024-03-01T12:02:00Z', mode: 420, is_dir: false, is_symlink: false }
+]);
+
+describe('JSON listings', () => {
+  it('maps nginx autoindex_format json with exact sizes and dates', () => {
+    const parsed = parseJsonListing(BASE, NGINX, opts);
+    expect(parsed.folders).toEqual([
+      { kind: 'folder', url: 'https://example.com/root/sub/', rawName: 'sub', name: 'sub', hidden: false, date: '2024-03-01T12:00:00.000Z', size: null }
+    ]);
+    expect(parsed.files.map(f => [f.url, f.name, f.size, f.hidden])).toEqual([
+      ['https://example.com/root/file1.txt', 'file1.txt', 123, false],
+      ['https://example.com/root/space%20name.txt', 'space name.txt', 1250000, false],
+      ['https://example.com/root/.hidden', '.hidden', 10, true]
+    ]);
+    expect(parsed.files[1].rawName).toBe('space%20name.txt');
+    expect(parsed.errors).toEqual([]);
+  });
+
+  it('maps Caddy browse JSON, using its urls and RFC 3339 times', () => {
+    const parsed = parseJsonListing(BASE, CADDY, opts);
+    expect(parsed.folders.map(f => [f.url, f.name, f.size, f.date])).toEqual([['https://example.com/root/sub/', 'sub', null, '2024-03-01T12:00:00.123Z']]);
+    expect(parsed.files.map(f => [f.url, f.size, f.date])).toEqual([
+      ['https://example.com/root/file1.txt', 123, '2024-03-01T12:00:00.000Z'],
+      ['https://example.com/root/space%20name.txt', 1250000, '2024-03-01T12:02:00.000Z']
+    ]);
+  });
+
+  it('lists the same urls and names as the HTML listing', () => {
+    const html = '<pre><a href="../">../</a>\n<a href="sub/">sub/</a> 01-Mar-2024 12:00 -\n<a href="file1.txt">file1.txt</a> 01-Mar-2024 12:00 123\n'
+      + '<a href="space%20name.txt">space name.txt</a> 01-Mar-2024 12:02 1.2M\n<a href=".hidden">.hidden</a> 01-Mar-2024 12:03 10</pre>';
+    const fromHtml = parseDirectoryHtml(BASE, html, opts);
+    const fromJson = parseJsonListing(BASE, NGINX, opts);
+    const shape = (p: any) => [...p.folders, ...p.files].filter((e: any) => e.url.startsWith(BASE) && e.url !== BASE).map((e: any) => [e.kind, e.url, e.name, e.date]);
+    expect(shape(fromJson)).toEqual(shape(fromHtml));
+    expect(fromHtml.files.find(f => f.name === 'space name.txt')!.size).not.toBe(1250000); // rounded in HTML
+  });
+
+  it('rejects bodies that are not a listing and records unreadable dates', () => {
+    expect(() => parseJsonListing(BASE, '{"error":"nope"}', opts)).toThrow('unrecognized JSON listing');
+    expect(() => parseJsonListing(BASE, '<html>', opts)).toThrow('invalid JSON listing');
+    const parsed = parseJsonListing(BASE, JSON.stringify({ items: [{ name: 'a.txt', size: 1, mtime: 'yesterday' }] }), opts);
+    expect(parsed.files[0].date).toBeNull();
+    expect(parsed.errors[0]).toMatch(/^date: /);
+  });
+});
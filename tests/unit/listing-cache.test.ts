@@ -0,0 +1,64 @@
+import { describe, it, expect } from 'vitest';
+import { MemoryListingCache, estimateListingBytes } from '../../src/core/listingCache.js';
+import { IndexedDbListingCache } from '../../src/core/idbListingCache.js';
+import { CachedListing } from '../../src/types.js';
+
+function entry(bytes: number, etag = '"x"'): CachedListing {
+  return { etag, lastModified: null, variant: 'same-origin', parsed: { folders: [], files: [], errors: [] }, bytes };
+}
+
+describe('MemoryListingCache', () => {
+  it('evicts least recently used entries beyond maxEntries', () => {
+    const cache = new MemoryListingCache({ maxEntries: 2 });
+    cache.set('a', entry(10));
+    cache.set('b', entry(10));
+    cache.get('a'); // a is now most recent
+    cache.set('c', entry(10));
+    expect(cache.get('b')).toBeUndefined();
+    expect(cache.get('a')).toBeDefined();
+    expect(cache.get('c')).toBeDefined();
+    expect(cache.size).toBe(2);
+  });
+
+  it('evicts by total bytes and skips entries larger than the budget', () => {
+    const cache = new MemoryListingCache({ maxBytes: 100 });
+    cache.set('a', entry(40));
+    cache.set('b', entry(40));
+    cache.set('c', entry(40));
+    expect(cache.get('a')).toBeUndefined();
+    expect(cache.bytes).toBe(80);
+    cache.set('huge', entry(101));
+    expect(cache.get('huge')).toBeUndefined();
+    expect(cache.size).toBe(2);
+    cache.set('b', entry(10));
+    expect(cache.bytes).toBe(50);
+  });
+
+  it('estimates size from entry strings', () => {
+    const small = estimateListingBytes({ folders: [], files: [{ url: 'https://x/a' }], errors: [] });
+    const large = estimateListingBytes({ folders: [], files: [{ url: 'https://x/a' + 'a'.repeat(1000) }], errors: [] });
+    expect(large - small).toBe(2000);
+  });
+});
+
+const idbIt = typeof indexedDB === 'undefined' ? it.skip : it;
+
+describe('IndexedDbListingCache', () => {
+  idbIt('persists entries and evicts least recently used', async () => {
+    const dbName = `folder-api-test-${Date.now()}`;
+    const cache = new IndexedDbListingCache({ dbName, maxEntries: 2 });
+    await cache.set('a', entry(10, '"a"'));
+    await cache.set('b', entry(10, '"b"'));
+    expect((await cache.get('a'))?.etag).toBe('"a"');
+    await cache.set('c', entry(10, '"c"'));
+    expect(await cache.get('b')).toBeUndefined();
+    cache.close();
+    const reopened = new IndexedDbListingCache({ dbName, maxEntries: 2 });
+    expect((await reopened.get('a'))?.etag).toBe('"a"');
+    expect((await reopened.get('c'))?.etag).toBe('"c"');
+    await reopened.clear();
+    expect(await reopened.get('a')).toBeUndefined();
+    reopened.close();
+    indexedDB.deleteDatabase(dbName);
+  });
+});
@@ -0,0 +1,19 @@
+import { describe, it, expect } from 'vitest';
+import { fileExtension, inferMime, MIME_TYPES } from '../../src/utils/mimeTypes.js';
+
+describe('mime table', () => {
+  it('extracts lowercased extensions', () => {
+    expect(fileExtension('Photo.JPEG')).toBe('jpeg');
+    expect(fileExtension('archive.tar.gz')).toBe('gz');
+    expect(fileExtension('.bashrc')).toBe('');
+    expect(fileExtension('README')).toBe('');
+    expect(fileExtension('trailing.')).toBe('');
+  });
+
+  it('infers from the built-in or a supplied table', () => {
+    expect(inferMime('movie.mkv')).toBe('video/x-matroska');
+    expect(inferMime('unknown.xyz')).toBeNull();
+    expect(inferMime('x.constructor')).toBeNull();
+    expect(inferMime('a.xyz', { ...MIME_TYPES, xyz: 'chemical/x-xyz' })).toBe('chemical/x-xyz');
+  });
+});
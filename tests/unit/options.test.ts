@@ -1,5 +1,6 @@
 import { describe, it, expect } from 'vitest';
 import { normalizeOptions } from '../../src/options.js';
+import { MemoryListingCache } from '../../src/core/listingCache.js';
 
 describe('normalizeOptions', () => {
   it('applies defaults', () => {
@@ -7,15 +8,30 @@ describe('normalizeOptions', () => {
     expect(o.maxDepth).toBe(0);
     expect(o.mode).toBe('auto');
     expect(o.includeMime).toBe(false);
+    expect(o.mimeStrategy).toBe('head');
   expect(o.headConcurrency).toBe(4);
+    expect(o.directoryConcurrency).toBe(1);
+    expect(o.originConcurrency).toBe(6);
     expect(o.timeoutMs).toBe(15000);
     expect(o.sameOriginOnly).toBe(true);
+    expect(o.parser).toBe('auto');
+    expect(o.cache).toBeNull();
+    expect(o.hooks).toBeNull();
+    expect(o.timings).toBe(false);
+    expect(o.performanceMarks).toBe(false);
   });
   it('clamps values', () => {
-    const o = normalizeOptions({ maxDepth: -5, headConcurrency: 0, timeoutMs: 50 });
+    const o = normalizeOptions({ maxDepth: -5, headConcurrency: 0, directoryConcurrency: 0, timeoutMs: 50 });
     expect(o.maxDepth).toBe(0);
     expect(o.headConcurrency).toBe(1);
+    expect(o.directoryConcurrency).toBe(1);
     expect(o.timeoutMs).toBeGreaterThanOrEqual(100);
   });
+  it('resolves cache: true to the shared in-memory store', () => {
+    const a = normalizeOptions({ cache: true }).cache;
+    expect(a).toBeInstanceOf(MemoryListingCache);
+    expect(normalizeOptions({ cache: true }).cache).toBe(a);
+    expect(normalizeOptions({ cache: false }).cache).toBeNull();
+  });
 });
 
@@ -0,0 +1,29 @@
+import { describe, it, expect } from 'vitest';
+import { parseDirectoryHtml } from '../../src/core/parseDirectory.js';
+import { normalizeOptions } from '../../src/options.js';
+import iis from '../../server/iis/index.html?raw';
+
+const engines = ['dom', 'tokenizer'] as const;
+
+describe('<pre> line index', () => {
+  for (const parser of engines) {
+    it(`maps anchors to their own line when names overlap (${parser})`, () => {
+      const html = `<pre><a href="data.txt">data.txt</a>   01-Mar-2024 12:00   5K
+<a href="a.txt">a.txt</a>      02-Mar-2024 13:00   7K
+</pre>`;
+      const res = parseDirectoryHtml('https://example.com/root/', html, normalizeOptions({ parser }));
+      const a = res.files.find(f => f.name === 'a.txt')!;
+      expect(a.size).toBe(7 * 1024);
+      expect(a.date).toBe('2024-03-02T13:00:00.000Z');
+    });
+
+    it(`treats <br> as a line break in IIS listings (${parser})`, () => {
+      const res = parseDirectoryHtml('http://127.0.0.1:8080/server/', iis, normalizeOptions({ parser }));
+      const page = res.files.find(f => f.name === 'test - 123.html')!;
+      expect(page.size).toBe(696);
+      expect(page.date).toBe('2011-12-21T12:12:00.000Z');
+      const folder2 = res.folders.find(f => f.name === 'folder2')!;
+      expect(folder2.date).toBe('2020-09-30T12:43:00.000Z');
+    });
+  }
+});
@@ -0,0 +1,77 @@
+import { describe, it, expect } from 'vitest';
+import { inferRowSchema, parseRowMeta } from '../../src/core/rowSchema.js';
+import { parseDirectoryHtml } from '../../src/core/parseDirectory.js';
+import { normalizeOptions } from '../../src/options.js';
+import iis from '../../server/iis/index.html?raw';
+
+const engines = ['dom', 'tokenizer'] as const;
+
+function pre(lines: string[], parser: typeof engines[number]) {
+  return parseDirectoryHtml('https://example.com/root/', `<pre>${lines.join('\n')}</pre>`, normalizeOptions({ parser }));
+}
+
+describe('row schema', () => {
+  it('infers the date format, size column and unit style from the rows', () => {
+    const schema = inferRowSchema(['Name Last modified Size', '10/5/2020 11:59 PM        <dir> folder 1', '10/10/2000  6:07 AM          150 Red.png']);
+    expect([schema.date?.name, schema.size, schema.units]).toEqual(['numeric', 'after', 'bytes']);
+    const caddy = inferRowSchema(['doc.md 4K 2024-03-01 12:00', 'sub/ - 2024-03-01 12:01']);
+    expect([caddy.date?.name, caddy.size, caddy.units]).toEqual(['iso', 'before', 'suffixed']);
+    expect(inferRowSchema(['a.txt', 'b.txt']).date).toBeNull();
+  });
+
+  for (const parser of engines) {
+    it(`reads every IIS row, including hours padded with two spaces (${parser})`, () => {
+      const res = parseDirectoryHtml('http://127.0.0.1:8080/server/', iis, normalizeOptions({ parser }));
+      expect(res.errors).toEqual([]);
+      expect(res.files.map(f => [f.name, f.size, f.date])).toEqual([
+        ['long filename.jpg', 931, '1999-01-01T02:02:00.000Z'],
+        ['Red.png', 150, '2000-10-10T06:07:00.000Z'],
+        ['test - 123.html', 696, '2011-12-21T12:12:00.000Z'],
+        ['web.config', 168, '2000-02-29T13:13:00.000Z']
+      ]);
+    });
+
+    it(`takes sizes from the size column, not from numbers in names (${parser})`, () => {
+      const res = pre([
+        '<a href="backup%202048.tar">backup 2048.tar</a> 01-Mar-2024 12:00 12',
+        '<a href="v2/">v2/</a> 01-Mar-2024 12:01 -',
+        '<a href="big.iso">big.iso</a> 01-Mar-2024 12:02 4.5G'
+      ], parser);
+      expect(res.files.map(f => f.size)).toEqual([12, Math.floor(4.5 * 1024 ** 3)]);
+    });
+  }
+
+  it('resolves the day / month order of numeric dates once for the whole listing', () => {
+    const errors: string[] = [];
+    const meta = parseRowMeta(['03/04/2024 10:00 1K a.txt', '05/04/2024 10:00 2K b.txt', '25/04/2024 10:00 3K c.txt'], errors);
+    expect(meta.map(m => m.date)).toEqual(['2024-04-03T10:00:00.000Z', '2024-04-05T10:00:00.000Z', '2024-04-25T10:00:00.000Z']);
+    expect(meta.map(m => m.size)).toEqual([1024, 2048, 3072]);
+    expect(errors).toEqual([]);
+
+    // AM / PM means month first unless a row proves otherwise
+    const us = parseRowMeta(['3/4/2024 1:00 PM 1 a.txt', '3/14/2024 1:00 PM 1 b.txt'], []);
+    expect(us.map(m => m.date)).toEqual(['2024-03-04T13:00:00.000Z', '2024-03-14T13:00:00.000Z']);
+    const eu = parseRowMeta(['3/4/2024 1:00 PM 1 a.txt', '14/3/2024 1:00 PM 1 b.txt'], []);
+    expect(eu.map(m => m.date)).toEqual(['2024-04-03T13:00:00.000Z', '2024-03-14T13:00:00.000Z']);
+  });
+
+  it('leaves numeric dates unread when no row settles the order', () => {
+    const errors: string[] = [];
+    const meta = parseRowMeta(['03/04/2024 10:00 1K a.txt', '05/06/2024 10:00 2K b.txt'], errors);
+    expect(meta.map(m => m.date)).toEqual([null, null]);
+    expect(meta.map(m => m.size)).toEqual([1024, 2048]);
+    expect(errors.every(e => e.startsWith('date:'))).toBe(true);
+    expect(errors).toHaveLength(2);
+  });
+
+  it('falls back to the generic heuristics for rows that do not fit', () => {
+    const rows = [1, 2, 3, 4, 5].map(i => `f${i}.txt 01-Mar-2024 12:0${i} ${i}K`);
+    rows.push('c.txt 2024-03-01 12:06 6K'); // other date format
+    rows.push('d.txt 01-Mar-2024 12:07 n/a 7K'); // size cell is not a size
+    const meta = parseRowMeta(rows, []);
+    expect(meta.map(m => m.size)).toEqual([1, 2, 3, 4, 5, 6, 7].map(k => k * 1024));
+    expect(meta[5].date).toBe('2024-03-01T12:06:00.000Z');
+    expect(meta[6].date).toBe('2024-03-01T12:07:00.000Z');
+    expect(inferRowSchema(rows).size).toBe('after');
+  });
+});
@@ -0,0 +1,174 @@
+import { describe, it, expect } from 'vitest';
+import { OverloadError, RequestScheduler, parseRetryAfter } from '../../src/utils/scheduler.js';
+
+function deferred() {
+  let resolve!: () => void;
+  const promise = new Promise<void>(r => { resolve = r; });
+  return { promise, resolve };
+}
+
+const tick = () => new Promise(r => setTimeout(r, 0));
+
+describe('RequestScheduler', () => {
+  it('caps in-flight requests per origin and alternates kinds', async () => {
+    const scheduler = new RequestScheduler({ perOrigin: 1, listing: 10, head: 10 });
+    const started: string[] = [];
+    const gates: Array<() => void> = [];
+    const job = (name: string, kind: 'listing' | 'head') => scheduler.run('https://a.test/x', kind, async () => {
+      started.push(name);
+      const d = deferred();
+      gates.push(d.resolve);
+      await d.promise;
+    });
+    const all = [job('h1', 'head'), job('h2', 'head'), job('h3', 'head'), job('l1', 'listing'), job('l2', 'listing')];
+    for (let i = 0; i < 5; i++) {
+      await tick();
+      expect(scheduler.inFlight).toBe(1);
+      gates.shift()!();
+    }
+    await Promise.all(all);
+    expect(started).toEqual(['h1', 'l1', 'h2', 'l2', 'h3']);
+    expect(scheduler.peak).toBe(1);
+  });
+
+  it('keeps separate budgets per origin and global per-kind limits', async () => {
+    const scheduler = new RequestScheduler({ perOrigin: 2, listing: 3, head: 1 });
+    let heads = 0;
+    let peakHeads = 0;
+    const work = (url: string, kind: 'listing' | 'head') => scheduler.run(url, kind, async () => {
+      if (kind === 'head') peakHeads = Math.max(peakHeads, ++heads);
+      await new Promise(r => setTimeout(r, 5));
+      if (kind === 'head') heads--;
+    });
+    const jobs = [];
+    for (const host of ['a', 'b']) {
+      for (let i = 0; i < 3; i++) jobs.push(work(`https://${host}.test/${i}`, 'listing'), work(`https://${host}.test/f${i}`, 'head'));
+    }
+    await tick();
+    expect(scheduler.inFlight).toBe(4); // 2 per origin; listings capped at 3 overall, heads at 1
+    await Promise.all(jobs);
+    expect(peakHeads).toBe(1);
+    expect(scheduler.peak).toBe(4);
+  });
+
+  it('releases the slot when a task throws', async () => {
+    const scheduler = new RequestScheduler({ perOrigin: 1, listing: 1, head: 1 });
+    await expect(scheduler.run('https://a.test/', 'head', async () => { throw new Error('boom'); })).rejects.toThrow('boom');
+    expect(await scheduler.run('https://a.test/', 'head', async () => 42)).toBe(42);
+    expect(scheduler.inFlight).toBe(0);
+  });
+
+  it('starts small and grows additively while latency is flat', async () => {
+    const scheduler = new RequestScheduler({ perOrigin: 8, listing: 100, head: 100 });
+    expect(scheduler.concurrency).toBe(2);
+    const jobs = [];
+    for (let i = 0; i < 60; i++) jobs.push(scheduler.run('https://a.test/', 'head', () => new Promise(r => setTimeout(r, 2))));
+    await Promise.all(jobs);
+    expect(scheduler.concurrency).toBe(8);
+    expect(scheduler.peak).toBeGreaterThan(2);
+    expect(scheduler.peak).toBeLessThanOrEqual(8);
+  });
+
+  it('halves once per round of concurrent overloads and retries them', async () => {
+    const scheduler = new RequestScheduler({ perOrigin: 8, listing: 100, head: 100, retryBaseMs: 1 });
+    for (let i = 0; i < 40; i++) await scheduler.run('https://a.test/', 'head', async () => {});
+    expect(scheduler.concurrency).toBe(8);
+    let calls = 0;
+    let limitAfterRound = 0;
+    const overloaded = () => scheduler.run('https://a.test/', 'head', async () => {
+      calls++;
+      if (calls <= 4) {
+        await new Promise(r => setTimeout(r, 5));
+        throw new OverloadError('http 429');
+      }
+      if (!limitAfterRound) limitAfterRound = scheduler.concurrency;
+      return 'ok';
+    });
+    const results = await Promise.all([overloaded(), overloaded(), overloaded(), overloaded()]);
+    expect(results).toEqual(['ok', 'ok', 'ok', 'ok']);
+    expect(scheduler.retried).toBe(4);
+    expect(limitAfterRound).toBe(4); // four concurrent 429s count as one decrease
+  });
+
+  it('waits for Retry-After and gives up after the retry budget', async () => {
+    const scheduler = new RequestScheduler({ perOrigin: 2, listing: 2, head: 2, retries: 1, retryBaseMs: 1 });
+    const attempts: number[] = [];
+    const started = performance.now();
+    await expect(scheduler.run('https://a.test/', 'listing', async () => {
+      attempts.push(performance.now() - started);
+      throw new OverloadError('http 503', 60);
+    })).rejects.toThrow('http 503');
+    expect(attempts.length).toBe(2);
+    expect(attempts[1]).toBeGreaterThanOrEqual(55);
+  });
+
+  it('does not retry ordinary failures or when adaptation is off', async () => {
+    const scheduler = new RequestScheduler({ perOrigin: 4, listing: 4, head: 4, adaptive: false });
+    expect(scheduler.concurrency).toBe(4);
+    let calls = 0;
+    await expect(scheduler.run('https://a.test/', 'head', async () => { calls++; throw new Error('http 404'); })).rejects.toThrow('404');
+    expect(calls).toBe(1);
+    expect(scheduler.retried).toBe(0);
+  });
+
+  it('only keeps a Retry-After wake timer while requests wait for it', async () => {
+    const originalSetTimeout = globalThis.setTimeout;
+    const originalClearTimeout = globalThis.clearTimeout;
+    const pending = new Set<unknown>();
+    globalThis.setTimeout = ((fn: any, ms?: number) => {
+      const id = originalSetTimeout(() => { pending.delete(id); fn(); }, ms);
+      pending.add(id);
+      return id;
+    }) as any;
+    globalThis.clearTimeout = ((id: any) => { pending.delete(id); originalClearTimeout(id); }) as any;
+    try {
+      const scheduler = new RequestScheduler({ perOrigin: 1, listing: 10, head: 10, retries: 0, adaptive: false });
+      const overload = () => scheduler.run('https://a.test/1', 'listing', async () => { throw new OverloadError('http 429', 60_000); });
+      await expect(overload()).rejects.toThrow('429');
+      expect(pending.size).toBe(0); // paused, but nothing waits
+
+      const controller = new AbortController();
+      const queued = scheduler.run('https://a.test/2', 'listing', async () => {}, controller.signal);
+      expect(pending.size).toBe(1);
+      controller.abort();
+      await expect(queued).rejects.toBeDefined();
+      expect(pending.size).toBe(0);
+
+      const waiting = new AbortController();
+      const late = scheduler.run('https://a.test/3', 'head', async () => {}, waiting.signal);
+      expect(pending.size).toBe(1);
+      scheduler.dispose();
+      expect(pending.size).toBe(0);
+      waiting.abort();
+      await expect(late).rejects.toBeDefined();
+    } finally {
+      globalThis.setTimeout = originalSetTimeout;
+      globalThis.clearTimeout = originalClearTimeout;
+    }
+  });
+
+  it('drops queued requests whose signal aborts without giving them a slot', async () => {
+    const scheduler = new RequestScheduler({ perOrigin: 1, listing: 10, head: 10, adaptive: false });
+    const gate = deferred();
+    const started: string[] = [];
+    const first = scheduler.run('https://a.test/1', 'listing', async () => { started.push('1'); await gate.promise; });
+    const controller = new AbortController();
+    const queued = scheduler.run('https://a.test/2', 'listing', async () => { started.push('2'); }, controller.signal);
+    const last = scheduler.run('https://a.test/3', 'listing', async () => { started.push('3'); });
+    await tick();
+    controller.abort();
+    await expect(queued).rejects.toBeDefined();
+    gate.resolve();
+    await Promise.all([first, last]);
+    expect(started).toEqual(['1', '3']);
+    expect(scheduler.inFlight).toBe(0);
+    await expect(scheduler.run('https://a.test/4', 'head', async () => {}, controller.signal)).rejects.toBeDefined();
+  });
+
+  it('parses Retry-After seconds and dates', () => {
+    expect(parseRetryAfter('3')).toBe(3000);
+    expect(parseRetryAfter('Wed, 21 Oct 2015 07:28:05 GMT', Date.parse('Wed, 21 Oct 2015 07:28:00 GMT'))).toBe(5000);
+    expect(parseRetryAfter('soon')).toBeNull();
+    expect(parseRetryAfter(null)).toBeNull();
+  });
+});
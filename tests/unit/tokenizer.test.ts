@@ -0,0 +1,64 @@
+import { describe, it, expect } from 'vitest';
+import { parseDirectoryHtml } from '../../src/core/parseDirectory.js';
+import { normalizeOptions } from '../../src/options.js';
+import apacheFancy from '../../server/apache-fancy/index.html?raw';
+import apacheStd from '../../server/apache-std/index.html?raw';
+import deno from '../../server/deno/index.html?raw';
+import glitch from '../../server/glitch/index.html?raw';
+import iis from '../../server/iis/index.html?raw';
+import nginx from '../../server/nginx/index.html?raw';
+
+const base = 'http://127.0.0.1:8080/server/';
+
+function both(html: string, baseUrl = base) {
+  const dom = parseDirectoryHtml(baseUrl, html, normalizeOptions({ parser: 'dom' }));
+  const tokenizer = parseDirectoryHtml(baseUrl, html, normalizeOptions({ parser: 'tokenizer' }));
+  return { dom, tokenizer };
+}
+
+describe('tokenizer parser engine', () => {
+  const fixtures: Record<string, [string, string]> = {
+    apacheFancy: [apacheFancy, base],
+    apacheStd: [apacheStd, base],
+    deno: [deno, 'http://127.0.0.1:4000/'],
+    glitch: [glitch, base],
+    iis: [iis, base],
+    nginx: [nginx, base]
+  };
+  for (const [name, [html, baseUrl]] of Object.entries(fixtures)) {
+    it(`matches DOMParser output for server/${name}`, () => {
+      const { dom, tokenizer } = both(html, baseUrl);
+      expect(dom.folders.length + dom.files.length).toBeGreaterThan(0);
+      expect(tokenizer).toEqual(dom);
+    });
+  }
+
+  it('handles implied end tags, entities and raw text', () => {
+    const html = `<!doctype html><html><head><title>a &amp; b</title><script>var s = "<a href='x.js'>";</script></head><body>
+    <table>
+      <tr><th>Name<th>Size
+      <tr><td><a href="one&amp;two.txt">one &amp; two</a><td>2K
+      <tr><td><A HREF='sub/'>sub</A><td>&lt;dir&gt;
+    </table>
+    <ul><li><a href="x.txt">x.txt</a> 12 KB<li><a href="y.txt">y.txt</a> 3 KB</ul>
+    </body></html>`;
+    const { dom, tokenizer } = both(html, 'https://example.com/root/');
+    expect(tokenizer).toEqual(dom);
+    expect(tokenizer.files.map(f => f.url)).toEqual([
+      'https://example.com/root/one&two.txt', 'https://example.com/root/x.txt', 'https://example.com/root/y.txt'
+    ]);
+    expect(tokenizer.files[0].size).toBe(2048);
+  });
+
+  it('parses without DOMParser in auto mode', () => {
+    const original = (globalThis as any).DOMParser;
+    (globalThis as any).DOMParser = undefined;
+    try {
+      const res = parseDirectoryHtml('https://example.com/root/', nginx, normalizeOptions(undefined));
+      expect(res.files.length).toBe(4);
+      expect(res.folders.length).toBe(3);
+    } finally {
+      (globalThis as any).DOMParser = original;
+    }
+  });
+});
@@ -7,6 +7,9 @@ export default defineConfig({
       provider: 'v8',
       reporter: ['text', 'lcov'],
       exclude: ['mock_servers/**']
+    },
+    benchmark: {
+      include: ['tests/bench/**/*.bench.ts']
     }
   }
 });